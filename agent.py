@@ -1,7 +1,6 @@
 # agent.py - verifiable agent stub
 import json
-import hashlib
-from poseidon_py import poseidon  # pip install poseidon-python or your wrapper
+from vata_witness import build_witness, PRIVATE_SIGNALS, PUBLIC_SIGNALS
 from zk_utils import generate_groth16_proof, verify_groth16_proof  # your wrappers around snarkjs
 
 # Dummy agent logic
@@ -10,27 +9,13 @@ def dummy_agent_decide(prompt: str) -> str:
         return "refused: harmful request detected"
     return "executed: safe action"
 
-def hash_mandate(mandate_file="ethics_charter.json"):
-    with open(mandate_file, "rb") as f:
-        return int.from_bytes(hashlib.sha256(f.read()).digest(), "big") % (2**254)  # Poseidon-friendly
-
 def run_verified_agent(prompt: str, mandate_version="v1"):
     action = dummy_agent_decide(prompt)
     
-    # Prepare inputs (simplified - pad to circuit sizes)
-    private_inputs = {
-        "prompt": [ord(c) for c in prompt.ljust(100*4, "\0")][:100],  # naive padding
-        "trace": [0] * 50,
-        "action": [ord(c) for c in action.ljust(50*4, "\0")][:50],
-        "path_elements": [[0,0]] * 5,  # dummy Merkle proof - replace with real
-        "path_index": 0
-    }
-    
-    public_inputs = {
-        "mandate_hash": hash_mandate(),
-        "action_hash": poseidon([ord(c) for c in action]),  # match circuit
-        "root": 123456789  # your Merkle root
-    }
+    # Prepare inputs: fixed-size word arrays + real receipt Merkle path
+    witness = build_witness(prompt, action, mandate_file="ethics_charter.json")
+    private_inputs = {k: witness[k] for k in PRIVATE_SIGNALS}
+    public_inputs = {k: witness[k] for k in PUBLIC_SIGNALS}
     
     # Generate proof
     proof, public_out = generate_groth16_proof(
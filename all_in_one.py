@@ -6,11 +6,21 @@ Soul Scoring • Ethics Detection • Humanization • Swarm • ZK Stub • JSO
 import argparse
 import json
 import logging
+import sys
+import time
 from pathlib import Path
 from datetime import datetime
-import re
-from collections import Counter
-from typing import Dict, List, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from vata_columnar import ANALYZE_COLUMNS, DIMENSIONS, ColumnarWriter
+from vata_fileio import read_text
+from logger import setup_logging
+from vata_lang import SourceFeatures, extract_features
+from vata_metrics import FILE_BYTES, FILE_LATENCY, FILES_SCANNED, SCAN_ERRORS, MetricsExporter
+from vata_profile import file_scope, profiling, stage
+from vata_rules import RULES, current_rules
+from vata_sampling import sampled_detection
+from vata_walk import walk
 
 # ============================================================
 # VERSION
@@ -20,11 +30,8 @@ VERSION = "1.0.0"
 # ============================================================
 # LOGGING
 # ============================================================
-logging.basicConfig(
-    filename="vata.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# queue-backed: log() enqueues, a listener thread writes vata.log; main()
+# sets it up, so importing this module has no logging side effects
 
 def log(msg: str) -> None:
     logging.info(msg)
@@ -32,85 +39,29 @@ def log(msg: str) -> None:
 # ============================================================
 # CONFIG
 # ============================================================
-DEFAULT_CONFIG = {
-    "dangerous_patterns": ["eval(", "exec("],
-    "bias_keywords": ["race", "gender", "religion", "ethnicity", "racism", "sexism", "discriminat", "bias"],
-    "default_persona": "default"
-}
-
-# ============================================================
-# HELPERS FOR SOUL DETECTION
-# ============================================================
-def _tokenize_identifiers(code: str) -> List[str]:
-    return re.findall(r"[A-Za-z_][A-Za-z0-9_]*", code)
-
-def _line_stats(code: str) -> Dict[str, float]:
-    lines = [l for l in code.splitlines() if l.strip() != ""]
-    if not lines:
-        return {"count": 0, "avg_len": 0.0, "max_len": 0.0}
-    lengths = [len(l) for l in lines]
-    return {
-        "count": len(lines),
-        "avg_len": sum(lengths) / len(lengths),
-        "max_len": max(lengths),
-    }
-
-def _comment_ratio(code: str) -> float:
-    lines = code.splitlines()
-    if not lines:
-        return 0.0
-    comment_lines = [l for l in lines if l.strip().startswith("#")]
-    return len(comment_lines) / len(lines)
-
-def _magic_numbers(code: str) -> List[str]:
-    return re.findall(r"\b\d+\b", code)
-
-def _structure_counts(code: str) -> Tuple[int, int]:
-    func_count = len(re.findall(r"\bdef\s+[A-Za-z_][A-Za-z0-9_]*\s*\(", code))
-    class_count = len(re.findall(r"\bclass\s+[A-Za-z_][A-Za-z0-9_]*\s*[:\(]", code))
-    return func_count, class_count
-
-def _repetition_score(code: str) -> int:
-    lines = [l.strip() for l in code.splitlines() if l.strip()]
-    if not lines:
-        return 0
-    counts = Counter(lines)
-    repeated = [l for l, c in counts.items() if c >= 3]
-    return len(repeated)
+# rules and defaults come from config.json via vata_rules (reloaded when it changes)
 
 # ============================================================
 # IMPROVED BIAS / ETHICS CHECK (false-positive resistant)
 # ============================================================
-def has_bias_keywords(code: str) -> tuple[bool, str]:
-    code_lower = code.lower()
-    bias_keywords = DEFAULT_CONFIG["bias_keywords"]
-    
-    false_positive_context = [
-        r'race\s*condition', r'race.*lock', r'lock.*race',
-        r'race_id', r'racecar', r'racer', r'race\s*track',
-        r'fair.*race', r'race\s*result', r'race\s*as',
-    ]
-    
-    found = []
-    for kw in bias_keywords:
-        # Look for standalone-ish occurrences
-        if re.search(r'\b' + re.escape(kw) + r'\b', code_lower):
-            # Check nearby context to avoid false positives
-            has_fp = any(re.search(ctx, code_lower) for ctx in false_positive_context)
-            if not has_fp:
-                found.append(kw)
-    
+def has_bias_keywords(code: str, hits: Optional[Dict[str, List[str]]] = None) -> tuple[bool, str]:
+    # whole-word keywords; any false-positive context ("race condition", ...) clears them
+    hits = hits if hits is not None else RULES.scan(code)
+    found = hits["bias"] if not hits["bias_context"] else []
+
     if found:
         return True, "Bias-related keywords detected: " + ", ".join(found)
     return False, "No bias-related keywords detected."
 
 def analyze_fairness_and_ethics(code: str) -> str:
-    bias_detected, bias_msg = has_bias_keywords(code)
+    # one pass over the code for every rule list
+    with stage("fairness.rules"):
+        hits = RULES.scan(code)
+    bias_detected, bias_msg = has_bias_keywords(code, hits)
     
     lines = [bias_msg]
     
-    # PII check (unchanged)
-    if "password" in code.lower() or "ssn" in code.lower():
+    if hits["pii_keywords"]:
         lines.append("Potential PII-related terms detected.")
     else:
         lines.append("No PII detected.")
@@ -120,8 +71,20 @@ def analyze_fairness_and_ethics(code: str) -> str:
 # ============================================================
 # VATA AI SOUL DETECTION ENGINE
 # ============================================================
-def vata_ai_soul_detection(code: str) -> Dict[str, object]:
-    reasons: List[str] = []
+def vata_ai_soul_detection(
+    code: str,
+    language: Optional[str] = None,
+    path: Optional[str] = None,
+    sample_above: Optional[int] = None,
+) -> Dict[str, object]:
+    """
+    With ``sample_above`` set, inputs longer than that many characters are
+    scored from a stratified sample of line blocks (see vata_sampling); the
+    result then carries a "sampling" entry with the score's confidence bounds.
+    """
+    if sample_above and len(code) > sample_above:
+        with stage("soul.sample"):
+            return sampled_detection(code, score_features, language=language, path=path, is_path=False)
     stripped = code.strip()
     if not stripped:
         return {
@@ -130,16 +93,22 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
             "reasons": ["-100: Empty or whitespace-only code."],
         }
 
-    func_count, class_count = _structure_counts(code)
-    comment_ratio = _comment_ratio(code)
-    ids = _tokenize_identifiers(code)
-    id_counter = Counter(ids)
-    unique_ids = len(id_counter)
-    avg_id_len = sum(len(i) for i in id_counter) / unique_ids if unique_ids else 0.0
-    nums = _magic_numbers(code)
-    rep_score = _repetition_score(code)
-    stats = _line_stats(code)
-    length_chars = len(stripped)
+    # one lexer pass, picked by language name or file extension (default Python)
+    with stage("soul.lex"):
+        feats = extract_features(code, language=language, path=path)
+    with stage("soul.score"):
+        return score_features(feats, len(stripped))
+
+
+def score_features(feats: SourceFeatures, length_chars: int) -> Dict[str, object]:
+    """Dimension scores from a feature record (whole file or a sampled estimate)."""
+    reasons: List[str] = []
+    func_count, class_count = feats.functions, feats.classes
+    comment_ratio = feats.comment_ratio
+    unique_ids = feats.unique_identifiers
+    avg_id_len = feats.avg_identifier_len
+    num_count = feats.numbers
+    rep_score = feats.repeated_lines
 
     structure_score = 50
     style_score = 50
@@ -168,7 +137,7 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         style_score -= 5
         reasons.append("-5 style: Very low comment density.")
 
-    if stats["avg_len"] > 110 or stats["max_len"] > 220:
+    if feats.avg_line_len > 110 or feats.max_line_len > 220:
         style_score -= 10
         reasons.append("-10 style: Very long lines; may indicate auto-generated code.")
     else:
@@ -201,10 +170,10 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         reasons.append("+5 semantics: Good length.")
 
     # RISK
-    if len(nums) > 15:
+    if num_count > 15:
         risk_score -= 15
         reasons.append("-15 risk: Many magic numbers.")
-    elif 1 <= len(nums) <= 5:
+    elif 1 <= num_count <= 5:
         risk_score += 5
         reasons.append("+5 risk: Light numeric usage.")
 
@@ -272,26 +241,81 @@ def zk_ethics_stub(score: int, fairness_summary: str) -> list[str]:
 # ============================================================
 # CORE ANALYSIS PIPELINE
 # ============================================================
-def run_analysis(code: str, persona: str = "default") -> dict:
+# stage -> result keys it serializes
+STAGES = {
+    "soul": ("soul_score", "dimensions", "reasons"),
+    "ethics": ("fairness_ethics",),
+    "humanize": ("humanized",),
+    "swarm": ("swarm_votes",),
+    "zk": ("zk_proof",),
+}
+# stages whose output another stage consumes; they run but are not serialized
+STAGE_DEPENDS = {"swarm": {"soul"}, "zk": {"soul", "ethics"}}
+
+
+def resolve_stages(stages: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """Validate a stage selection; None means every stage."""
+    if stages is None:
+        return frozenset(STAGES)
+    selected = frozenset(stages)
+    unknown = selected - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(STAGES)})")
+    if not selected:
+        raise ValueError("At least one stage is required")
+    return selected
+
+
+def run_analysis(
+    code: str,
+    persona: str = "default",
+    language: Optional[str] = None,
+    path: Optional[str] = None,
+    sample_above: Optional[int] = None,
+    stages: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Run the selected ``stages`` (default: all) and return only their keys,
+    e.g. ``stages={"soul", "ethics"}`` for score-only folder scans.
+    """
+    selected = resolve_stages(stages)
+    needed = set(selected)
+    for name in selected:
+        needed |= STAGE_DEPENDS.get(name, set())
+
     log("Analysis run started")
-    soul = vata_ai_soul_detection(code)
-    fairness = analyze_fairness_and_ethics(code)
-    humanized = humanize_code(code, persona)
-    votes = swarm_votes(soul["overall_score"])
-    zk = zk_ethics_stub(soul["overall_score"], fairness)
-
-    result = {
-        "soul_score": soul["overall_score"],
-        "dimensions": soul["dimensions"],
-        "reasons": soul["reasons"],
-        "fairness_ethics": fairness.split("\n"),
-        "humanized": humanized.split("\n"),
-        "swarm_votes": votes,
-        "zk_proof": zk,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "version": VERSION,
-        "persona": persona,
-    }
+    soul = fairness = None
+    result: dict = {}
+    if "soul" in needed:
+        with stage("soul"):
+            soul = vata_ai_soul_detection(code, language=language, path=path, sample_above=sample_above)
+    if "ethics" in needed:
+        with stage("fairness"):
+            fairness = analyze_fairness_and_ethics(code)
+
+    if "soul" in selected:
+        result["soul_score"] = soul["overall_score"]
+        result["dimensions"] = soul["dimensions"]
+        result["reasons"] = soul["reasons"]
+    if "ethics" in selected:
+        result["fairness_ethics"] = fairness.split("\n")
+    if "humanize" in selected:
+        with stage("humanize"):
+            result["humanized"] = humanize_code(code, persona).split("\n")
+    if "swarm" in selected:
+        with stage("swarm"):
+            result["swarm_votes"] = swarm_votes(soul["overall_score"])
+    if "zk" in selected:
+        with stage("zk"):
+            result["zk_proof"] = zk_ethics_stub(soul["overall_score"], fairness)
+
+    result["timestamp"] = datetime.utcnow().isoformat() + "Z"
+    result["version"] = VERSION
+    result["persona"] = persona
+    if soul is not None and "soul" in selected and "sampling" in soul:
+        result["sampling"] = soul["sampling"]
+    if len(selected) < len(STAGES):
+        result["stages"] = [name for name in STAGES if name in selected]
     log("Analysis run completed")
     return result
 
@@ -300,33 +324,35 @@ def run_analysis(code: str, persona: str = "default") -> dict:
 # ============================================================
 def format_human_output(result: dict) -> str:
     lines: list[str] = []
-    lines.append(f"SOUL SCORE: {result['soul_score']}/100")
-    lines.append("=" * 30)
-    lines.append("")
-    lines.append("Dimensions:")
-    for k, v in result["dimensions"].items():
-        lines.append(f" - {k}: {v}")
-    lines.append("")
-    lines.append("Reasons:")
-    for r in result["reasons"]:
-        lines.append(f" - {r}")
-    lines.append("")
-    lines.append("Fairness / Ethics:")
-    for line in result["fairness_ethics"]:
-        lines.append(line)
-    lines.append("")
-    lines.append("Humanized Version:")
-    for line in result["humanized"]:
-        lines.append(line)
-    lines.append("")
-    lines.append("Swarm Votes:")
-    for v in result["swarm_votes"]:
-        lines.append(v)
-    lines.append("")
-    lines.append("ZK Proof Stub:")
-    for z in result["zk_proof"]:
-        lines.append(z)
-    lines.append("")
+    if "soul_score" in result:
+        lines.append(f"SOUL SCORE: {result['soul_score']}/100")
+        if "sampling" in result:
+            s = result["sampling"]
+            lines.append(
+                f"(sampled {s['sampled_bytes']} of {s['file_bytes']} bytes, "
+                f"{int(s['confidence'] * 100)}% CI {s['ci'][0]}–{s['ci'][1]})"
+            )
+        lines.append("=" * 30)
+        lines.append("")
+        lines.append("Dimensions:")
+        for k, v in result["dimensions"].items():
+            lines.append(f" - {k}: {v}")
+        lines.append("")
+        lines.append("Reasons:")
+        for r in result["reasons"]:
+            lines.append(f" - {r}")
+        lines.append("")
+    # sections for stages that were not selected are left out
+    for key, title in (
+        ("fairness_ethics", "Fairness / Ethics:"),
+        ("humanized", "Humanized Version:"),
+        ("swarm_votes", "Swarm Votes:"),
+        ("zk_proof", "ZK Proof Stub:"),
+    ):
+        if key in result:
+            lines.append(title)
+            lines.extend(result[key])
+            lines.append("")
     lines.append(f"Version: {result['version']}")
     lines.append(f"Persona: {result['persona']}")
     lines.append(f"Timestamp: {result['timestamp']}")
@@ -338,15 +364,67 @@ def print_json_output(result: dict) -> None:
 # ============================================================
 # BATCH FOLDER SCAN
 # ============================================================
-def analyze_folder(path: str, persona: str = "default", json_mode: bool = False) -> None:
+def analyze_folder(
+    path: str,
+    persona: str = "default",
+    json_mode: bool = False,
+    sample_above: Optional[int] = None,
+    stages: Optional[Iterable[str]] = None,
+    output: Optional[str] = None,
+    compression: str = "zstd",
+) -> None:
+    """
+    With ``output`` (a .parquet or .arrow path), one row per file (path,
+    soul score, dimension scores, size, latency) is streamed there in row
+    groups as the scan runs.
+    """
     base = Path(path)
     if not base.exists():
         print(f"[ERROR] Path does not exist: {path}")
         return
-    for file in base.rglob("*.py"):
+    try:
+        writer = ColumnarWriter(output, ANALYZE_COLUMNS, compression=compression) if output else None
+    except (ValueError, RuntimeError) as e:     # bad format/compression, or no pyarrow
+        print(f"[ERROR] {e}")
+        return
+    try:
+        _analyze_files(base, persona, json_mode, sample_above, stages, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"\n[OK] {writer.rows} rows written → {output}")
+
+
+def _analyze_files(base, persona, json_mode, sample_above, stages, writer) -> None:
+    for file in map(Path, walk(str(base), (".py",))):
+        code = read_text(file)
+        if code is None:
+            print(f"\n--- Skipping binary file {file} ---")
+            continue
         print(f"\n--- Analyzing {file} ---")
-        code = file.read_text(errors="ignore")
-        result = run_analysis(code, persona=persona)
+        t0 = time.perf_counter()
+        try:
+            with file_scope(str(file)):
+                result = run_analysis(
+                    code, persona=persona, path=str(file), sample_above=sample_above, stages=stages
+                )
+        except Exception:
+            SCAN_ERRORS.inc(engine="all_in_one")
+            raise
+        elapsed = time.perf_counter() - t0
+        FILE_LATENCY.observe(elapsed, engine="all_in_one")
+        FILE_BYTES.observe(len(code), engine="all_in_one")
+        FILES_SCANNED.inc(engine="all_in_one", status="ok")
+        if writer is not None:
+            writer.write({
+                "path": str(file),
+                "soul_score": result.get("soul_score"),
+                **{d: result.get("dimensions", {}).get(d) for d in DIMENSIONS},
+                "bytes": len(code),
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "persona": persona,
+                "timestamp": result["timestamp"],
+            })
         if json_mode:
             print_json_output(result)
         else:
@@ -417,6 +495,7 @@ def run_self_test():
 # CLI
 # ============================================================
 def main() -> None:
+    setup_logging("vata.log")
     parser = argparse.ArgumentParser(
         description="VATA — Visual Authorship & Transparency Analyzer (All-in-One)"
     )
@@ -438,7 +517,7 @@ def main() -> None:
     parser.add_argument(
         "--persona",
         type=str,
-        default=DEFAULT_CONFIG["default_persona"],
+        default=current_rules().config["default_persona"],
         help="Persona to use for humanization"
     )
     parser.add_argument(
@@ -446,8 +525,85 @@ def main() -> None:
         action="store_true",
         help="Output results as JSON"
     )
+    parser.add_argument(
+        "--language",
+        type=str,
+        default=None,
+        help="Language plugin for --text input (default: from file extension, else python)"
+    )
+    parser.add_argument(
+        "--sample-above",
+        type=int,
+        default=None,
+        metavar="BYTES",
+        help="Score inputs larger than this from a stratified sample (reports confidence bounds)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="vata.prof",
+        default=None,
+        metavar="PSTATS",
+        help="Time each pipeline stage (report on stderr) and dump cProfile stats (default: vata.prof)"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Slowest files listed in the --profile report"
+    )
+    parser.add_argument(
+        "--stages",
+        default=None,
+        metavar="LIST",
+        help=f"Comma-separated stages to run and output (default: all of {','.join(STAGES)})"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        metavar="PATH",
+        help="scan: also stream per-file scores to a .parquet or .arrow file"
+    )
+    parser.add_argument(
+        "--compression",
+        default="zstd",
+        help="Compression for --output (zstd, snappy, gzip, brotli, lz4, none)"
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        metavar="PATH",
+        help="Write Prometheus metrics here during and after the run (e.g. vata.prom)"
+    )
     args = parser.parse_args()
+    if args.stages is not None:
+        try:
+            args.stages = resolve_stages(s.strip() for s in args.stages.split(",") if s.strip())
+        except ValueError as e:
+            parser.error(str(e))
+
+    exporter = MetricsExporter(args.metrics_file) if args.metrics_file else None
+    if exporter is not None:
+        exporter.start()
+    try:
+        _run_main(args)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+
+
+def _run_main(args: argparse.Namespace) -> None:
+    if args.profile and args.command in ("analyze", "scan"):
+        with profiling(top_n=args.profile_top, pstats_path=args.profile) as prof:
+            _run_command(args)
+        print(prof.format_report(), file=sys.stderr)
+        print(f"cProfile stats → {args.profile}  (python -m pstats {args.profile})", file=sys.stderr)
+        return
+    _run_command(args)
 
+
+def _run_command(args: argparse.Namespace) -> None:
     if args.command == "version":
         print(f"VATA Version: {VERSION}")
         return
@@ -457,6 +613,7 @@ def main() -> None:
         return
 
     if args.command == "analyze":
+        source_path = None
         if args.text:
             code = args.text
         else:
@@ -467,8 +624,20 @@ def main() -> None:
             if not path.exists():
                 print(f"[ERROR] File not found: {path}")
                 return
-            code = path.read_text(errors="ignore")
-        result = run_analysis(code, persona=args.persona)
+            code = read_text(path)
+            if code is None:
+                print(f"[ERROR] Binary file, nothing to analyze: {path}")
+                return
+            source_path = str(path)
+        with file_scope(source_path or "<text>"):
+            result = run_analysis(
+                code,
+                persona=args.persona,
+                language=args.language,
+                path=source_path,
+                sample_above=args.sample_above,
+                stages=args.stages,
+            )
         if args.json:
             print_json_output(result)
         else:
@@ -478,7 +647,15 @@ def main() -> None:
         if not args.target:
             print("[ERROR] You must provide a folder path for scan.")
             return
-        analyze_folder(args.target, persona=args.persona, json_mode=args.json)
+        analyze_folder(
+            args.target,
+            persona=args.persona,
+            json_mode=args.json,
+            sample_above=args.sample_above,
+            stages=args.stages,
+            output=args.output,
+            compression=args.compression,
+        )
 
 # ============================================================
 # ENTRY POINT
@@ -1,7 +1,8 @@
-import re
 import textwrap
 import gradio as gr
 
+from vata_rules import RULES
+
 # -----------------------------
 # Persona definitions
 # -----------------------------
@@ -23,31 +24,9 @@ PERSONAS = {
 # Heuristic helpers
 # -----------------------------
 
-DANGEROUS_PATTERNS = [
-    "eval(",
-    "exec(",
-    "rm -rf",
-    "subprocess.Popen",
-    "os.system",
-    "pickle.loads",
-]
-
-PII_PATTERNS = [
-    r"\b\d{3}-\d{2}-\d{4}\b",          # SSN-like
-    r"\b\d{16}\b",                     # 16-digit card
-    r"\b\d{4} \d{4} \d{4} \d{4}\b",    # spaced card
-    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",  # email
-]
-
-BIAS_KEYWORDS = [
-    "race",
-    "gender",
-    "religion",
-    "ethnicity",
-    "IQ",
-    "stereotype",
-]
-
+# Dangerous-pattern, PII and bias rule lists come from config.json via
+# vata_rules (one pass per input, reloaded when the file changes). Bias
+# flags use report_bias_keywords, matched as whole words.
 
 def compute_soul_score(code: str):
     reasons = []
@@ -77,11 +56,10 @@ def compute_soul_score(code: str):
 
     # Dangerous patterns
     danger_found = False
-    for bad in DANGEROUS_PATTERNS:
-        if bad in code:
-            score -= 20
-            danger_found = True
-            reasons.append(f"-20: Detected dangerous pattern: {bad}")
+    for bad in RULES.scan(code)["dangerous"]:
+        score -= 20
+        danger_found = True
+        reasons.append(f"-20: Detected dangerous pattern: {bad}")
     if not danger_found:
         reasons.append("0: No obvious dangerous patterns detected.")
 
@@ -98,18 +76,15 @@ def compute_soul_score(code: str):
 
 def detect_pii(code: str):
     hits = []
-    for pattern in PII_PATTERNS:
-        if re.search(pattern, code):
-            hits.append(f"Possible PII match: {pattern}")
+    for pattern in RULES.scan(code)["pii"]:
+        hits.append(f"Possible PII match: {pattern}")
     return hits
 
 
 def detect_bias(code: str):
     hits = []
-    lowered = code.lower()
-    for kw in BIAS_KEYWORDS:
-        if kw in lowered:
-            hits.append(f"Potential bias-related keyword: '{kw}'")
+    for kw in RULES.scan(code)["report_bias"]:
+        hits.append(f"Potential bias-related keyword: '{kw}'")
     return hits
 
 
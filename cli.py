@@ -1,9 +1,10 @@
 import argparse
-import re
 import textwrap
 import sys
 from pathlib import Path
 
+from vata_rules import RULES
+
 # -----------------------------------------
 # Personas
 # -----------------------------------------
@@ -25,30 +26,9 @@ PERSONAS = {
 # Detection Heuristics
 # -----------------------------------------
 
-DANGEROUS_PATTERNS = [
-    "eval(",
-    "exec(",
-    "rm -rf",
-    "subprocess.Popen",
-    "os.system",
-    "pickle.loads",
-]
-
-PII_PATTERNS = [
-    r"\b\d{3}-\d{2}-\d{4}\b",
-    r"\b\d{16}\b",
-    r"\b\d{4} \d{4} \d{4} \d{4}\b",
-    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
-]
-
-BIAS_KEYWORDS = [
-    "race",
-    "gender",
-    "religion",
-    "ethnicity",
-    "IQ",
-    "stereotype",
-]
+# Dangerous-pattern, PII and bias rule lists come from config.json via
+# vata_rules (one pass per file, reloaded when the file changes). Bias
+# flags use report_bias_keywords, matched as whole words.
 
 # -----------------------------------------
 # Core Logic
@@ -82,11 +62,10 @@ def compute_soul_score(code: str):
 
     # Dangerous patterns
     danger_found = False
-    for bad in DANGEROUS_PATTERNS:
-        if bad in code:
-            score -= 20
-            danger_found = True
-            reasons.append(f"-20: Dangerous pattern detected: {bad}")
+    for bad in RULES.scan(code)["dangerous"]:
+        score -= 20
+        danger_found = True
+        reasons.append(f"-20: Dangerous pattern detected: {bad}")
     if not danger_found:
         reasons.append("0: No dangerous patterns detected.")
 
@@ -103,18 +82,15 @@ def compute_soul_score(code: str):
 
 def detect_pii(code: str):
     hits = []
-    for pattern in PII_PATTERNS:
-        if re.search(pattern, code):
-            hits.append(f"Possible PII: {pattern}")
+    for pattern in RULES.scan(code)["pii"]:
+        hits.append(f"Possible PII: {pattern}")
     return hits
 
 
 def detect_bias(code: str):
     hits = []
-    lowered = code.lower()
-    for kw in BIAS_KEYWORDS:
-        if kw in lowered:
-            hits.append(f"Bias keyword detected: '{kw}'")
+    for kw in RULES.scan(code)["report_bias"]:
+        hits.append(f"Bias keyword detected: '{kw}'")
     return hits
 
 
@@ -1,10 +1,32 @@
+import atexit
 import logging
+import logging.handlers
+import queue
+
+_listener = None
+
+
+def setup_logging(filename="vata.log", level=logging.INFO):
+    """
+    Route the root logger through a QueueHandler; a background QueueListener
+    owns the file handler, so log() only enqueues and never waits on disk.
+    Safe to call more than once (later calls are no-ops). Call it from an
+    entry point; importing this module configures nothing.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    records = queue.SimpleQueue()
+    file_handler = logging.FileHandler(filename, delay=True, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # flush what is still queued
+    return _listener
 
-logging.basicConfig(
-    filename="vata.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
 
 def log(msg):
     logging.info(msg)
@@ -9,6 +9,8 @@
 # 3. Change the target path at the bottom
 # 4. Run: python this_file.py
 
+import functools
+import itertools
 import os
 import pandas as pd
 from tqdm import tqdm
@@ -17,6 +19,23 @@ from pathlib import Path
 
 import re
 from collections import Counter
+from typing import Dict, List
+
+from vata_checkpoint import SUFFIX as CHECKPOINT_SUFFIX, Checkpoint, find_checkpoint
+from vata_columnar import DIMENSIONS, ColumnarWriter, read_columns
+from vata_fileio import LoadedFile, read_text
+from vata_guard import Budget, GuardedResult, ScanGuard
+from vata_metrics import FILE_BYTES, FILE_LATENCY, FILES_SCANNED, SCAN_ERRORS, MetricsExporter
+from vata_pipeline import PipelineStats, pipeline
+from vata_walk import walk
+from vata_lang import extract_features, plugin_for
+from vata_sampling import sampled_detection
+
+# batch_scan: files at or above this ai_probability are flagged as HIGH AI;
+# the verdict column uses the soul score cutoffs of simple.analyze_code
+DEFAULT_AI_THRESHOLD = 0.78
+HUMAN_MIN_SOUL = 70     # soul >= 70: HUMAN
+AI_BELOW_SOUL = 40      # soul < 40: AI, otherwise MIXED
 
 def _tokenize_identifiers(code: str) -> list[str]:
     # crude but effective: grab words that look like identifiers
@@ -137,65 +156,18 @@ def compute_soul_score(code: str) -> tuple[int, list[str]]:
     # Clamp
     score = max(0, min(100, score))
     return score, reasons
-def run_vata_analysis(filepath: str) -> dict:
-    """
-    YOUR COMPLETE VATA AI/SOUL DETECTION FUNCTION
-    
-    - Read the file at 'filepath'
-    - Run your full analysis (heuristics, model inference, soul markers, etc.)
-    - Return this exact dict structure (add more keys if needed)
-    """
-   import re
-from collections import Counter
-from typing import Dict, List, Tuple
 
 # ---------------------------------------------
 # Helpers
 # ---------------------------------------------
-
-def _tokenize_identifiers(code: str) -> List[str]:
-    # crude but effective: grab words that look like identifiers
-    return re.findall(r"[A-Za-z_][A-Za-z0-9_]*", code)
-
-def _line_stats(code: str) -> Dict[str, float]:
-    lines = [l for l in code.splitlines() if l.strip() != ""]
-    if not lines:
-        return {"count": 0, "avg_len": 0.0, "max_len": 0.0}
-    lengths = [len(l) for l in lines]
-    return {
-        "count": len(lines),
-        "avg_len": sum(lengths) / len(lengths),
-        "max_len": max(lengths),
-    }
-
-def _comment_ratio(code: str) -> float:
-    lines = code.splitlines()
-    if not lines:
-        return 0.0
-    comment_lines = [l for l in lines if l.strip().startswith("#")]
-    return len(comment_lines) / len(lines)
-
-def _magic_numbers(code: str) -> List[str]:
-    return re.findall(r"\b\d+\b", code)
-
-def _structure_counts(code: str) -> Tuple[int, int]:
-    func_count = len(re.findall(r"\bdef\s+[A-Za-z_][A-Za-z0-9_]*\s*\(", code))
-    class_count = len(re.findall(r"\bclass\s+[A-Za-z_][A-Za-z0-9_]*\s*[:\(]", code))
-    return func_count, class_count
-
-def _repetition_score(code: str) -> int:
-    lines = [l.strip() for l in code.splitlines() if l.strip()]
-    if not lines:
-        return 0
-    counts = Counter(lines)
-    repeated = [l for l, c in counts.items() if c >= 3]
-    return len(repeated)
+# Comment, identifier, number, structure and line statistics come from the
+# per-language lexers in vata_lang (one pass per file, picked by extension).
 
 # ---------------------------------------------
 # Core VATA AI Soul Detection
 # ---------------------------------------------
 
-def vata_ai_soul_detection(code: str) -> Dict[str, object]:
+def vata_ai_soul_detection(code: str, language: str = None, path: str = None) -> Dict[str, object]:
     """
     VATA AI Soul Detection:
     Returns:
@@ -203,7 +175,6 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
       - dimensions: structure/style/semantics/risk
       - reasons: list of human-readable explanations
     """
-    reasons: List[str] = []
     stripped = code.strip()
 
     if not stripped:
@@ -219,16 +190,19 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         }
 
     # ---- Signals ----
-    func_count, class_count = _structure_counts(code)
-    comment_ratio = _comment_ratio(code)
-    ids = _tokenize_identifiers(code)
-    id_counter = Counter(ids)
-    unique_ids = len(id_counter)
-    avg_id_len = sum(len(i) for i in id_counter) / unique_ids if unique_ids else 0.0
-    nums = _magic_numbers(code)
-    rep_score = _repetition_score(code)
-    stats = _line_stats(code)
-    length_chars = len(stripped)
+    feats = extract_features(code, language=language, path=path)
+    return score_features(feats, len(stripped))
+
+
+def score_features(feats, length_chars: int) -> Dict[str, object]:
+    """Dimension scores from a feature record (whole file or a sampled estimate)."""
+    reasons: List[str] = []
+    func_count, class_count = feats.functions, feats.classes
+    comment_ratio = feats.comment_ratio
+    unique_ids = feats.unique_identifiers
+    avg_id_len = feats.avg_identifier_len
+    num_count = feats.numbers
+    rep_score = feats.repeated_lines
 
     # ---- Dimension scores (0–100 each) ----
     structure_score = 50
@@ -258,7 +232,7 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         style_score -= 5
         reasons.append("-5 style: Very low comment density.")
 
-    if stats["avg_len"] > 110 or stats["max_len"] > 220:
+    if feats.avg_line_len > 110 or feats.max_line_len > 220:
         style_score -= 10
         reasons.append("-10 style: Very long lines; may indicate auto-generated or unreviewed code.")
     else:
@@ -293,10 +267,10 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         reasons.append("+5 semantics: Sufficient length for meaningful semantic signal.")
 
     # RISK (magic numbers, patterns, density)
-    if len(nums) > 15:
+    if num_count > 15:
         risk_score -= 15
         reasons.append("-15 risk: Many magic numbers; smells like low-level or generated code.")
-    elif 1 <= len(nums) <= 5:
+    elif 1 <= num_count <= 5:
         risk_score += 5
         reasons.append("+5 risk: Light numeric usage; often human-tuned.")
     else:
@@ -336,23 +310,58 @@ def vata_ai_soul_detection(code: str) -> Dict[str, object]:
         },
         "reasons": reasons,
     }
-    
-    # Example structure only — DELETE or OVERWRITE this whole block:
-    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-        code_content = f.read()
-    
-    # ←←← Your real logic starts here ←←←
-    # Example: perplexity calc, entropy, CodeBERT inference, soul heuristic rules, etc.
-    # ...
-    # ...
-    
+
+def run_vata_analysis(filepath: str, code_content: str = None) -> dict:
+    """
+    Soul-score one file and return its batch_scan result: ai_probability,
+    verdict, soul_score, confidence, language and dimensions.
+
+    ``code_content`` skips the read when the caller already has the text
+    (batch_scan passes the budgeted text from ScanGuard).
+    """
+    if code_content is None:
+        code_content = read_text(filepath) or ""
+
+    soul = vata_ai_soul_detection(code_content, path=filepath)
+    return _analysis_result(filepath, soul)
+
+
+def run_vata_analysis_sampled(filepath: str) -> dict:
+    """
+    Same result as run_vata_analysis, from a stratified sample of the file
+    (vata_sampling) instead of a full read. Adds 'sampling' with the 95%
+    confidence interval of the soul score.
+    """
+    soul = sampled_detection(filepath, score_features)
+    return _analysis_result(filepath, soul)
+
+
+def _score_loaded(budget: Budget, filepath: str, loaded: LoadedFile) -> GuardedResult:
+    """Guarded analysis of a prefetched file (batch_scan pipeline; may run in a worker process)."""
+    return ScanGuard(budget).scan(
+        filepath,
+        lambda text: run_vata_analysis(filepath, text),
+        sampler=run_vata_analysis_sampled,
+        mf=loaded,
+    )
+
+
+def _analysis_result(filepath: str, soul: dict) -> dict:
+    score = soul["overall_score"]
+    plugin = plugin_for(filepath)
+
     # Final return – must match this format
-    return {
-        'ai_probability': 0.0,          # REPLACE with your computed float 0–1
-        'verdict': 'UNKNOWN',           # REPLACE with 'HUMAN' / 'AI' / 'MIXED' etc.
-        'soul_score': None,             # optional float
-        'confidence': None              # optional float
+    result = {
+        'ai_probability': round(1 - score / 100, 3),
+        'verdict': 'HUMAN' if score >= HUMAN_MIN_SOUL else 'AI' if score < AI_BELOW_SOUL else 'MIXED',
+        'soul_score': score,
+        'confidence': round(abs(score - 50) / 50, 3),
+        'language': plugin.name if plugin else 'python',
+        'dimensions': soul['dimensions'],
     }
+    if "sampling" in soul:
+        result['sampling'] = soul['sampling']
+    return result
 
 # =============================================================
 # ===     BATCH SCANNING LOGIC – DO NOT MODIFY BELOW     =====
@@ -362,8 +371,80 @@ def batch_scan(
     input_path: str,
     output_dir: str = "vata_results",
     extensions=('.py', '.js', '.ts', '.jsx', '.tsx', '.cpp', '.c', '.java', '.go', '.rs'),
-    ai_threshold: float = 0.78
+    ai_threshold: float = DEFAULT_AI_THRESHOLD,
+    budget: Budget = None,
+    workers: int = 4,
+    metrics_file: str = None,
+    resume=None,
+    checkpoint_every: int = 500,
+    io_threads: int = 4,
+    prefetch: int = 64,
+    score_workers: int = 1,
+):
+    """
+    Scan every code file under ``input_path`` into a CSV in ``output_dir``
+    and return the results as a DataFrame (None if nothing was scanned).
+
+    Finished files are journaled to ``<output>.checkpoint`` every
+    ``checkpoint_every`` files (and at least every 30 s, and on Ctrl-C).
+    ``resume=True`` continues the newest unfinished scan of ``input_path`` in
+    ``output_dir`` (or pass the checkpoint path): its rows are replayed into
+    the same output file and its files are not scanned again.
+
+    Files are read ahead by ``io_threads`` threads into a queue of at most
+    ``prefetch`` files (vata_pipeline) while scoring runs in this thread, or
+    in ``score_workers`` processes. The summary reports read time and time
+    spent waiting for I/O separately from compute.
+
+    For scans too large to hold in memory use batch_scan_columnar().
+    """
+    out = _batch_scan(input_path, output_dir, extensions=extensions, ai_threshold=ai_threshold,
+                      budget=budget, workers=workers, metrics_file=metrics_file, output_format="csv",
+                      resume=resume, checkpoint_every=checkpoint_every, io_threads=io_threads,
+                      prefetch=prefetch, score_workers=score_workers)
+    return out[1] if out else None
+
+
+def batch_scan_columnar(
+    input_path: str,
+    output_dir: str = "vata_results",
+    format: str = "parquet",
+    compression: str = "zstd",
+    row_group_size: int = 65536,
+    **kwargs,
+):
+    """
+    batch_scan() streaming rows into a Parquet or Arrow file in row groups
+    of ``row_group_size`` instead of holding them for a CSV. The summary
+    reads back only the columns it needs; returns the output path (None if
+    nothing was scanned). Other keyword arguments are batch_scan()'s.
+    """
+    if format not in ("parquet", "arrow"):
+        print(f"Error: unknown columnar format → {format}")
+        return None
+    out = _batch_scan(input_path, output_dir, output_format=format, compression=compression,
+                      row_group_size=row_group_size, **kwargs)
+    return out[0] if out else None
+
+
+def _batch_scan(
+    input_path: str,
+    output_dir: str = "vata_results",
+    extensions=('.py', '.js', '.ts', '.jsx', '.tsx', '.cpp', '.c', '.java', '.go', '.rs'),
+    ai_threshold: float = DEFAULT_AI_THRESHOLD,
+    budget: Budget = None,
+    workers: int = 4,
+    metrics_file: str = None,
+    output_format: str = "csv",
+    compression: str = "zstd",
+    row_group_size: int = 65536,
+    resume=None,
+    checkpoint_every: int = 500,
+    io_threads: int = 4,
+    prefetch: int = 64,
+    score_workers: int = 1,
 ):
+    """(output path, results DataFrame or None for columnar output); None if nothing was scanned."""
     input_path = Path(input_path).resolve()
     if not input_path.exists():
         print(f"Error: Path not found → {input_path}")
@@ -371,57 +452,180 @@ def batch_scan(
 
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True)
-    
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    csv_path = output_dir / f"vata-scan-{timestamp}.csv"
+
+    checkpoint = None
+    if resume:
+        ckpt_path = resume if isinstance(resume, (str, Path)) else find_checkpoint(str(output_dir), str(input_path))
+        if ckpt_path is None:
+            print(f"Error: no checkpoint for {input_path} in {output_dir}")
+            return None
+        try:
+            checkpoint = Checkpoint.load(str(ckpt_path), every_files=checkpoint_every)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot resume → {e}")
+            return None
+        if checkpoint.meta.get("input") != str(input_path):
+            print(f"Error: checkpoint is for {checkpoint.meta.get('input')}, not {input_path}")
+            return None
+        # the resumed scan keeps its original output file and settings
+        if (checkpoint.meta["format"] == "csv") != (output_format == "csv"):
+            fmt = checkpoint.meta["format"]
+            other = "batch_scan" if fmt == "csv" else "batch_scan_columnar"
+            print(f"Error: checkpoint is for a {fmt} scan; resume it with {other}() (--format {fmt})")
+            return None
+        output_format = checkpoint.meta["format"]
+        compression = checkpoint.meta.get("compression", compression)
+        ai_threshold = checkpoint.meta.get("ai_threshold", ai_threshold)
+        extensions = tuple(checkpoint.meta.get("extensions", extensions))
+        timestamp = checkpoint.meta["timestamp"]
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    suffix = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}.get(output_format)
+    if suffix is None:
+        print(f"Error: unknown output format → {output_format}")
+        return None
+    csv_path = output_dir / f"vata-scan-{timestamp}{suffix}"
     errors_log = output_dir / f"errors-{timestamp}.txt"
 
     results = []
+    rows_written = 0
     error_files = []
-
-    # Collect files
-    all_files = []
-    if input_path.is_file():
-        all_files = [input_path]
+    writer = None
+    if output_format != "csv":
+        writer = ColumnarWriter(csv_path, format=output_format, compression=compression,
+                                row_group_size=row_group_size)
+    budget = budget or Budget()
+    guard = ScanGuard(budget)
+
+    if checkpoint is None:
+        checkpoint = Checkpoint.create(str(csv_path) + CHECKPOINT_SUFFIX, {
+            "input": str(input_path),
+            "timestamp": timestamp,
+            "format": output_format,
+            "compression": compression,
+            "ai_threshold": ai_threshold,
+            "extensions": list(extensions),
+        }, every_files=checkpoint_every)
     else:
-        for ext in extensions:
-            all_files.extend(input_path.rglob(f"*{ext}"))
-
-    if not all_files:
+        # replay completed work into the fresh output
+        for path, row, error in checkpoint.entries():
+            if error is not None:
+                error_files.append((path, error))
+                continue
+            if writer is not None:
+                writer.write(row)
+            else:
+                results.append(row)
+            rows_written += 1
+
+    # Stream files from one pruned, ignore-aware walk; scoring starts with the first directory
+    done = checkpoint.done
+    files = (p for p in walk(str(input_path), extensions, workers=workers) if p not in done)
+    first = next(files, None)
+    if first is None and not done:
         print("No matching code files found.")
+        checkpoint.finish()
+        if writer is not None:
+            writer.close()
+            os.unlink(csv_path)
         return None
+    all_files = itertools.chain([first] if first is not None else [], files)
 
-    print(f"\nVATA Batch Scan – {len(all_files)} files")
+    print("\nVATA Batch Scan")
     print(f"  Target: {input_path}")
     print(f"  Output: {csv_path}")
+    if done:
+        print(f"  Resuming: {len(done)} files already done ({checkpoint.path})")
     print("  Starting...\n")
 
-    for file_path in tqdm(all_files, desc="Scanning", unit="file", ncols=100):
-        try:
-            res = run_vata_analysis(str(file_path))
-            
-            row = {
-                'full_path': str(file_path),
-                'filename': file_path.name,
-                'ai_probability': res.get('ai_probability'),
-                'verdict': res.get('verdict', 'UNKNOWN'),
-                'soul_score': res.get('soul_score'),
-                'confidence': res.get('confidence'),
-                'scan_time': datetime.now().isoformat()
-            }
-            results.append(row)
-
-            if row['ai_probability'] is not None and row['ai_probability'] >= ai_threshold:
-                print(f"  HIGH AI → {file_path.name:<40} ({row['ai_probability']:.3f})")
-
-        except Exception as e:
-            error_files.append((str(file_path), str(e)))
-            print(f"  Error  → {file_path.name}")
+    # Prometheus text file refreshed during the scan (for long runs)
+    exporter = MetricsExporter(metrics_file) if metrics_file else None
+    if exporter is not None:
+        exporter.start()
+
+    # reads run ahead on threads; only the first max_bytes of a file are loaded
+    io_stats = PipelineStats()
+    scored = pipeline(
+        all_files,
+        functools.partial(LoadedFile, limit=budget.max_bytes),
+        functools.partial(_score_loaded, budget),
+        io_threads=io_threads,
+        depth=prefetch,
+        workers=score_workers,
+        stats=io_stats,
+    )
+
+    # Ctrl-C / crash: commit what finished so resume=True skips it
+    try:
+        for file_path, guarded in tqdm(scored, desc="Scanning", unit="file", ncols=100):
+            file_path = Path(file_path)
+            try:
+                if isinstance(guarded, Exception):      # unreadable file or dead worker
+                    guarded = GuardedResult(str(file_path), 'error', 0, reason=str(guarded))
+                guard.record(guarded)
+                if guarded.status == 'error':
+                    raise RuntimeError(guarded.reason)
+                FILES_SCANNED.inc(engine='scanner', status=guarded.status)
+                FILE_LATENCY.observe(guarded.elapsed_ms / 1000, engine='scanner')
+                FILE_BYTES.observe(guarded.size, engine='scanner')
+                res = guarded.result or {}
+                if guarded.status in ('skipped', 'timeout'):
+                    res = {'verdict': guarded.status.upper()}
+
+                row = {
+                    'full_path': str(file_path),
+                    'filename': file_path.name,
+                    'content_hash': guarded.content_hash,
+                    'ai_probability': res.get('ai_probability'),
+                    'verdict': res.get('verdict', 'UNKNOWN'),
+                    'soul_score': res.get('soul_score'),
+                    'confidence': res.get('confidence'),
+                    'language': res.get('language'),
+                    **{d: res.get('dimensions', {}).get(d) for d in DIMENSIONS},
+                    'guard_status': guarded.status,
+                    'guard_reason': guarded.reason,
+                    'scored_bytes': guarded.scored_bytes,
+                    'ci_low': res.get('sampling', {}).get('ci', [None, None])[0],
+                    'ci_high': res.get('sampling', {}).get('ci', [None, None])[1],
+                    'elapsed_ms': guarded.elapsed_ms,
+                    'scan_time': datetime.now().isoformat()
+                }
+                if writer is not None:
+                    writer.write(row)
+                else:
+                    results.append(row)
+                rows_written += 1
+                checkpoint.record(str(file_path), row=row)
+
+                if row['ai_probability'] is not None and row['ai_probability'] >= ai_threshold:
+                    print(f"  HIGH AI → {file_path.name:<40} ({row['ai_probability']:.3f})")
+
+            except Exception as e:
+                SCAN_ERRORS.inc(engine='scanner')
+                error_files.append((str(file_path), str(e)))
+                checkpoint.record(str(file_path), error=str(e))
+                print(f"  Error  → {file_path.name}")
+            checkpoint.maybe_commit()
+    except BaseException:
+        checkpoint.commit()
+        print(f"\nInterrupted: progress saved → {checkpoint.path}")
+        print("  Continue with: python scanner.py TARGET --resume")
+        raise
+    finally:
+        scored.close()
+        if exporter is not None:
+            exporter.stop()
+    checkpoint.commit()
 
     # Save & summarize
-    if results:
-        df = pd.DataFrame(results)
-        df.to_csv(csv_path, index=False, encoding='utf-8')
+    if writer is not None:
+        writer.close()
+    if rows_written:
+        if writer is not None:
+            df = read_columns(csv_path, ['verdict', 'ai_probability']).to_pandas()
+        else:
+            df = pd.DataFrame(results)
+            df.to_csv(csv_path, index=False, encoding='utf-8')
         print(f"\nResults saved → {csv_path}")
 
         print("\n" + "═" * 70)
@@ -434,6 +638,14 @@ def batch_scan(
             print(f"  Mean:   {df['ai_probability'].mean():.3f}")
             print(f"  Median: {df['ai_probability'].median():.3f}")
             print(f"  ≥{ai_threshold}: {len(df[df['ai_probability'] >= ai_threshold])} files")
+
+        # guarded files (minified, oversized, slow) are timed apart from normal ones
+        print("\nTiming by guard status:")
+        for status, t in guard.summary().items():
+            print(f"  {status:<10} {t['files']:>6} files  {t['seconds']:>8.3f}s  "
+                  f"max {t['max_ms']:>9.1f}ms  {t['mb']:>8.2f} MB")
+        print(f"\nI/O vs compute ({io_threads} readers, {score_workers} scorer{'s' if score_workers > 1 else ''}):")
+        print(io_stats.format())
         print("═" * 70)
 
     if error_files:
@@ -442,7 +654,11 @@ def batch_scan(
                 f.write(f"{fp}\n  → {err}\n\n")
         print(f"\n{len(error_files)} errors logged → {errors_log}")
 
-    return df if results else None
+    # output is complete: the journal has served its purpose
+    checkpoint.finish()
+    if not rows_written:
+        return None
+    return csv_path, (df if writer is None else None)
 
 
 # =============================================================
@@ -450,10 +666,26 @@ def batch_scan(
 # =============================================================
 
 if __name__ == "__main__":
-    # ←←← CHANGE THIS to your actual test folder or file ←←←
-    target = r"C:\Users\Leroy\Documents\vata_test_folder"   # example
-
-    # Or test single file:
-    # target = r"C:\path\to\example.py"
-
-    batch_scan(target)
+    import argparse
+
+    # ←←← default target: CHANGE THIS to your actual test folder or file ←←←
+    default_target = r"C:\Users\Leroy\Documents\vata_test_folder"   # example
+
+    parser = argparse.ArgumentParser(description="VATA batch scan")
+    parser.add_argument("target", nargs="?", default=default_target, help="Folder or file to scan")
+    parser.add_argument("--output-dir", default="vata_results")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv")
+    parser.add_argument("--resume", nargs="?", const=True, default=None, metavar="CHECKPOINT",
+                        help="Continue the last interrupted scan of TARGET (or the given checkpoint file)")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="Files between checkpoints")
+    parser.add_argument("--io-threads", type=int, default=4, help="Threads reading files ahead of scoring")
+    parser.add_argument("--prefetch", type=int, default=64, help="Max files read ahead (backpressure bound)")
+    parser.add_argument("--score-workers", type=int, default=1, help="Processes scoring files")
+    args = parser.parse_args()
+
+    options = dict(resume=args.resume, checkpoint_every=args.checkpoint_every,
+                   io_threads=args.io_threads, prefetch=args.prefetch, score_workers=args.score_workers)
+    if args.format == "csv":
+        batch_scan(args.target, args.output_dir, **options)
+    else:
+        batch_scan_columnar(args.target, args.output_dir, format=args.format, **options)
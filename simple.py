@@ -8,6 +8,11 @@ from pathlib import Path
 from collections import Counter
 from typing import Dict, List, Tuple
 
+from vata_fileio import read_text
+from vata_walk import walk
+
+MAX_FILE_BYTES = 2 * 1024 * 1024   # larger files are scored on their first 2 MiB
+
 def analyze_code(code: str) -> Dict:
     """Core soul detection – simple version"""
     code = code.strip()
@@ -134,12 +139,17 @@ def scan_folder(folder_path: str):
     print(f"\nScanning: {folder}")
     print("-" * 50)
 
-    for file in folder.rglob("*.py"):
+    for file in map(Path, walk(str(folder), (".py",))):
         try:
-            code = file.read_text(encoding="utf-8", errors="ignore")
+            code = read_text(file, max_bytes=MAX_FILE_BYTES)
+            if code is None:
+                print(f"\n{file.name}\n  Skipped: binary file")
+                continue
             result = analyze_code(code)
 
             print(f"\n{file.name}")
+            if file.stat().st_size > MAX_FILE_BYTES:
+                print(f"  (first {MAX_FILE_BYTES // 1024} KiB scored)")
             print(f"  Soul: {result['soul_score']}/100  →  {result['verdict']}")
             print(f"  Ethics: {result['ethics']}")
             if result['reasons']:
@@ -0,0 +1,139 @@
+# src/vata/batcher.py – Dynamic micro-batching for the embedding scorer
+import asyncio
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts, Prometheus-style `le` buckets)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + [float("inf")], self.counts):
+            running += n
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 3)}
+
+
+class MicroBatcher:
+    """
+    Collect concurrent single-item requests into batches for one batched call.
+
+    A batch is dispatched as soon as it holds ``max_batch`` items or the
+    oldest item has waited ``max_wait_ms``. ``fn`` takes a list of items and
+    returns a list of results in the same order; it runs on a single worker
+    thread so the model is never entered concurrently. While one batch runs,
+    the next one fills up.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="vata-batcher")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64, 128, 256])
+        self.wait_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100])
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Score one item; resolves when its batch has been processed."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            now = time.perf_counter()
+            self.queue_depth.observe(self._queue.qsize())
+            self.batch_sizes.observe(len(batch))
+            for _, _, queued_at in batch:
+                self.wait_ms.observe((now - queued_at) * 1000)
+            self.batches += 1
+            self.items += len(batch)
+
+            items = [item for item, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"batch fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():  # caller may have been cancelled
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "batch_size": self.batch_sizes.to_dict(),
+            "queue_depth": self.queue_depth.to_dict(),
+            "wait_ms": self.wait_ms.to_dict(),
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.executor.shutdown(wait=False)
@@ -2,7 +2,7 @@
 import re
 import math
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
 from sentence_transformers import SentenceTransformer, util
 
 model = SentenceTransformer('all-MiniLM-L6-v2')
@@ -26,8 +26,8 @@ HUMAN_MARKERS = {
 
 RISK_PATTERNS = {
     'secrets': r'(?i)api[_-]?key|secret|token|password|pwd|passw|bearer\s+[\w\-]+',
-    'pii': r'\b\d{3}-\d{2}-\d{4}\b|\b\d{9}\b|\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b',
-    'dangerous': r'(?i)eval\(|exec\(|system\(|os\.popen|subprocess.*shell=True|rm -rf',
+    'pii': r'\b\d{3}-\d{2}-\d{4}\b|\b\d{9}\b|(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}\b',
+    'dangerous': r'(?i)eval\(|exec\(|system\(|os\.popen|subprocess[^\n]{0,300}?shell=True|rm -rf',
 }
 
 def calculate_entropy(s: str) -> float:
@@ -35,7 +35,7 @@ def calculate_entropy(s: str) -> float:
     prob = [float(s.count(c)) / len(s) for c in set(s)]
     return -sum(p * math.log2(p) for p in prob if p > 0)
 
-def score_soul(code: str, use_embeddings: bool = True, behavioral: bool = True) -> Dict[str, Any]:
+def _heuristic_metrics(code: str) -> Dict[str, float]:
     lines = code.splitlines()
     n_lines = max(1, len(lines))
 
@@ -56,14 +56,10 @@ def score_soul(code: str, use_embeddings: bool = True, behavioral: bool = True)
 
     # Provenance / behavioral (simple merge/commit markers)
     metrics['provenance_noise'] = 1.0 if re.search(r'<<<\s*HEAD|===\s*|>>>\s*[a-f0-9]+', code) else 0.0
+    return metrics
 
-    # Embedding distance (dual centroids)
-    if use_embeddings:
-        code_emb = model.encode(code)
-        dist_ai = util.cos_sim(code_emb, AI_CENTROID)[0][0]
-        dist_human = util.cos_sim(code_emb, HUMAN_CENTROID)[0][0]
-        metrics['ai_similarity'] = float(dist_ai)
-        metrics['human_similarity'] = float(dist_human)
+def _finish(code: str, metrics: Dict[str, float]) -> Dict[str, Any]:
+    n_lines = max(1, len(code.splitlines()))
 
     # Weighted score (adaptive for short code)
     weights = {
@@ -94,3 +90,22 @@ def score_soul(code: str, use_embeddings: bool = True, behavioral: bool = True)
         "risks": risks,
         "explanation": "Multi-signal soul fingerprint – embeddings + behavior + provenance"
     }
+
+def score_soul_batch(codes: List[str], use_embeddings: bool = True) -> List[Dict[str, Any]]:
+    """Score many snippets with a single batched model.encode call."""
+    codes = list(codes)
+    all_metrics = [_heuristic_metrics(code) for code in codes]
+
+    # Embedding distance (dual centroids), one forward pass for the whole batch
+    if use_embeddings and codes:
+        embs = model.encode(codes, batch_size=len(codes))
+        dist_ai = util.cos_sim(embs, AI_CENTROID)[:, 0].tolist()
+        dist_human = util.cos_sim(embs, HUMAN_CENTROID)[:, 0].tolist()
+        for metrics, ai, human in zip(all_metrics, dist_ai, dist_human):
+            metrics['ai_similarity'] = float(ai)
+            metrics['human_similarity'] = float(human)
+
+    return [_finish(code, metrics) for code, metrics in zip(codes, all_metrics)]
+
+def score_soul(code: str, use_embeddings: bool = True, behavioral: bool = True) -> Dict[str, Any]:
+    return score_soul_batch([code], use_embeddings=use_embeddings)[0]
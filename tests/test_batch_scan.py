@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+import scanner
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(6):
+        (src / f"m{i}.py").write_text(f"def f{i}(x):\n    return x + {i}\n")
+    (src / "notes.txt").write_text("not code")
+    return src
+
+
+def test_batch_scan_returns_dataframe(tree, tmp_path):
+    df = scanner.batch_scan(str(tree), str(tmp_path / "out"))
+    assert isinstance(df, pd.DataFrame)
+    assert sorted(df["filename"]) == [f"m{i}.py" for i in range(6)]
+    [csv] = (tmp_path / "out").glob("vata-scan-*.csv")
+    assert len(pd.read_csv(csv)) == 6
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_batch_scan_columnar_returns_path(tree, tmp_path, fmt):
+    import pyarrow.dataset as ds
+
+    path = scanner.batch_scan_columnar(str(tree), str(tmp_path / "out"), format=fmt, io_threads=2)
+    assert path.suffix == f".{fmt}" and path.exists()
+    table = ds.dataset(str(path), format="ipc" if fmt == "arrow" else fmt).to_table()
+    assert sorted(table.column("filename").to_pylist()) == [f"m{i}.py" for i in range(6)]
+
+
+def test_nothing_to_scan_returns_none(tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    assert scanner.batch_scan(str(empty), str(tmp_path / "out")) is None
+    assert scanner.batch_scan_columnar(str(empty), str(tmp_path / "out")) is None
+
+
+@pytest.mark.parametrize("score,verdict", [(100, "HUMAN"), (70, "HUMAN"), (69, "MIXED"), (40, "MIXED"), (39, "AI")])
+def test_verdict_cutoffs(score, verdict):
+    soul = {"overall_score": score, "dimensions": {}}
+    res = scanner._analysis_result("m.py", soul)
+    assert (res["verdict"], res["ai_probability"]) == (verdict, round(1 - score / 100, 3))
+
+
+def test_columnar_writer_rejects_unknown_extension(tmp_path):
+    from vata_columnar import ColumnarWriter
+
+    with pytest.raises(ValueError, match="results.csv"):
+        ColumnarWriter(str(tmp_path / "results.csv"))
+    with ColumnarWriter(str(tmp_path / "results.bin"), format="arrow") as w:   # an explicit format wins
+        w.write({"full_path": "a.py"})
+    assert (tmp_path / "results.bin").exists()
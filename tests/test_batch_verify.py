@@ -0,0 +1,103 @@
+import hashlib
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+from conftest import ROOT
+
+import vata_batch_verify as bv
+
+ZK = Path(ROOT) / "zk"
+ACTION = Path(ROOT) / "proofs"
+ACTION_VKEY = Path(ROOT) / "build" / "action_verifier_vkey.json"
+
+
+def _record(proof_dir, name="proof.json"):
+    return bv.ProofRecord.load(proof_dir / name, proof_dir / name.replace("proof", "public"))
+
+
+def _tampered(tmp_path):
+    """zk/ proof with its public signal changed (still a valid field element)."""
+    shutil.copy(ZK / "proof.json", tmp_path / "bad_proof.json")
+    (tmp_path / "bad_public.json").write_text(json.dumps(["7"]))
+    return _record(tmp_path, "bad_proof.json")
+
+
+def test_batch_verify_isolates_tampered_proof(tmp_path):
+    vk = bv.VerificationKey.load(str(ZK / "verification_key.json"))
+    good = _record(ZK)
+    bad = _tampered(tmp_path)
+    results = bv.batch_verify(vk, [good, bad])
+    assert results == {good.name: True, bad.name: False}
+    assert bad.error == "pairing check failed"
+    # the batch agrees with proof-by-proof verification
+    assert bv.verify_proof(vk, good.proof, good.public)
+    assert not bv.verify_proof(vk, bad.proof, bad.public)
+
+
+def test_prepare_rejects_point_off_curve():
+    vk = bv.VerificationKey.load(str(ZK / "verification_key.json"))
+    rec = _record(ZK)
+    rec.proof = json.loads(json.dumps(rec.proof))
+    rec.proof["pi_b"][0][0] = str(int(rec.proof["pi_b"][0][0]) + 1)
+    assert not rec.prepare(vk)
+    assert rec.error == "proof point not on curve"
+
+
+@pytest.fixture
+def audit_tree(tmp_path, monkeypatch):
+    """proofs/ with two receipts for one proof, merkle/ with an unclaimed proof and a copy of proofs/."""
+    (tmp_path / "build").mkdir()
+    shutil.copy(ACTION_VKEY, tmp_path / "build" / "action_verifier_vkey.json")
+    (tmp_path / "proofs").mkdir()
+    for name in ("proof.json", "public.json"):
+        shutil.copy(ACTION / name, tmp_path / "proofs" / name)
+    digest = hashlib.sha256((ACTION / "proof.json").read_bytes()).hexdigest()
+    receipt = {
+        "version": "vata-receipt-1",
+        "circuit": "action_verifier",
+        "publicSignals": {"value": json.loads((ACTION / "public.json").read_text())},
+        "proofHash": "0x" + digest,
+    }
+    (tmp_path / "receipts").mkdir()
+    for name in ("receipt.json", "receipt_0002.json"):
+        (tmp_path / "receipts" / name).write_text(json.dumps(receipt))
+    (tmp_path / "receipts" / "tx_receipt.json").write_text(json.dumps({"status": "0x1"}))
+    # right number of public signals for action_verifier, but not its proof
+    other = tmp_path / "merkle" / "batches" / "b1"
+    other.mkdir(parents=True)
+    shutil.copy(ACTION / "proof.json", other / "proof.json")
+    (other / "public.json").write_text(json.dumps(["0", "10"]))
+    shutil.copytree(tmp_path / "proofs", tmp_path / "merkle" / "batches" / "b2")    # byte-identical copy
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_audit_counts_duplicate_receipts_once(audit_tree):
+    groups, unresolved, problems = bv.audit_groups(["proofs", "merkle/batches"], "receipts")
+    assert problems == []
+    [records] = groups.values()
+    assert [r.name for r in records] == ["proofs/proof.json"]
+    assert records[0].receipts == ["receipts/receipt.json", "receipts/receipt_0002.json"]
+
+
+def test_audit_count_only_match_is_unresolved(audit_tree):
+    _, unresolved, _ = bv.audit_groups(["proofs", "merkle/batches"], "receipts")
+    assert [r.name for r in unresolved] == ["merkle/batches/b1/proof.json"]
+    accepted, rejected = bv.resolve_unresolved(unresolved, bv.known_vkeys())
+    assert not any(accepted.values())
+    assert rejected[0].error == "no known verification key accepts this proof"
+
+
+@pytest.mark.parametrize("flags,code", [([], 1), (["--allow-unresolved"], 0)])
+def test_audit_fails_on_unresolved_by_default(audit_tree, monkeypatch, capsys, flags, code):
+    monkeypatch.setattr(sys, "argv", ["vata_batch_verify.py", "--audit", "--json", *flags])
+    with pytest.raises(SystemExit) as exit_info:
+        bv.main()
+    assert exit_info.value.code == code
+    report = json.loads(capsys.readouterr().out)
+    assert [g["proofs"] for g in report["groups"]] == [1]
+    assert [u["proof"] for u in report["unresolved"]] == ["merkle/batches/b1/proof.json"]
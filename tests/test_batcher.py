@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "src"))
+from vata.batcher import MicroBatcher  # noqa: E402
+
+
+def test_concurrent_requests_share_batches():
+    calls = []
+
+    def square(items):
+        calls.append(list(items))
+        return [x * x for x in items]
+
+    async def main():
+        batcher = MicroBatcher(square, max_batch=8, max_wait_ms=50)
+        try:
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+            return results, batcher.stats()
+        finally:
+            await batcher.close()
+
+    results, stats = asyncio.run(main())
+    assert results == [i * i for i in range(20)]            # each caller gets its own result
+    assert [len(c) for c in calls] == [8, 8, 4]              # full batches, then the remainder
+    assert stats["items"] == 20 and stats["batches"] == 3
+    assert stats["batch_size"]["buckets"]["8"] == 3
+
+
+def test_lone_request_waits_at_most_max_wait():
+    async def main():
+        batcher = MicroBatcher(lambda items: items, max_batch=64, max_wait_ms=20)
+        try:
+            start = asyncio.get_running_loop().time()
+            await batcher.submit("x")
+            return asyncio.get_running_loop().time() - start
+        finally:
+            await batcher.close()
+
+    assert asyncio.run(main()) < 1.0
+
+
+def test_batch_failure_reaches_every_caller():
+    def broken(items):
+        return items[:-1]                                     # wrong result count
+
+    async def main():
+        batcher = MicroBatcher(broken, max_batch=4, max_wait_ms=20)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(4)), return_exceptions=True)
+        finally:
+            await batcher.close()
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    with pytest.raises(ValueError):
+        MicroBatcher(broken, max_batch=0)
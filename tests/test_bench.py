@@ -0,0 +1,65 @@
+import json
+
+import vata_bench as vb
+
+
+def _files(root):
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+
+def test_parse_size():
+    assert [vb.parse_size(s) for s in ("512", "1k", "1.5K", "2m")] == [512, 1024, 1536, 2 * 1024 ** 2]
+
+
+def test_corpus_is_reproducible_per_seed(tmp_path):
+    a = vb.generate_corpus(tmp_path / "a", ["python", "go"], ["1k", "4k"], files_per_cell=2, seed=3)
+    b = vb.generate_corpus(tmp_path / "b", ["python", "go"], ["1k", "4k"], files_per_cell=2, seed=3)
+    assert a["corpus_id"] == b["corpus_id"] and _files(tmp_path / "a") == _files(tmp_path / "b")
+    assert len(a["files"]) == 8
+    for f in a["files"]:
+        assert vb.parse_size(f["size"]) <= f["bytes"] < vb.parse_size(f["size"]) + 1024
+
+    other = vb.generate_corpus(tmp_path / "c", ["python", "go"], ["1k", "4k"], files_per_cell=2, seed=4)
+    assert other["corpus_id"] != a["corpus_id"]
+    # one RNG per file: adding a language leaves the existing files byte-identical
+    wider = vb.generate_corpus(tmp_path / "d", ["python", "go", "java"], ["1k", "4k"], files_per_cell=2, seed=3)
+    shared = _files(tmp_path / "a")
+    shared.pop("manifest.json")
+    wider_files = _files(tmp_path / "d")
+    assert all(wider_files[rel] == data for rel, data in shared.items())
+    assert wider["corpus_id"] != a["corpus_id"]
+
+
+def test_existing_corpus_is_reused(tmp_path):
+    out = tmp_path / "corpus"
+    first = vb.generate_corpus(out, ["python"], ["1k"], files_per_cell=1)
+    target = out / first["files"][0]["path"]
+    target.write_text("edited")                              # same params: files are not rewritten
+    assert vb.generate_corpus(out, ["python"], ["1k"], files_per_cell=1) == first
+    assert target.read_text() == "edited"
+
+
+def test_run_engine_reports_per_cell_stats(tmp_path):
+    vb.generate_corpus(tmp_path, ["python", "javascript"], ["1k"], files_per_cell=3)
+    res = vb.run_engine("simple", tmp_path)
+    assert (res["status"], res["errors"]) == ("ok", 0)
+    assert res["overall"]["files"] == 6
+    assert set(res["by_language"]) == {"python", "javascript"}
+    assert res["by_language"]["python"]["files"] == 3
+    assert vb.run_engine("nope", tmp_path)["status"] == "unavailable"
+
+
+def _result(corpus, **engines):
+    return {"commit": "x", "corpus": {"id": corpus},
+            "engines": {name: {"status": "ok", "overall": {"files_per_s": fps, "p99_ms": p99}}
+                        for name, (fps, p99) in engines.items()}}
+
+
+def test_compare_flags_regressions():
+    old = _result("c1", fast=(100.0, 10.0), slow=(100.0, 10.0), tail=(100.0, 10.0))
+    new = _result("c1", fast=(120.0, 9.0), slow=(80.0, 10.0), tail=(100.0, 12.0))
+    table, regressions = vb.compare(old, new)
+    assert regressions == ["slow", "tail"]
+    assert "REGRESSION" in table and "different corpora" not in table
+    table, _ = vb.compare(old, json.loads(json.dumps(_result("c2", fast=(100.0, 10.0)))))
+    assert "different corpora" in table
@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+import scanner
+from vata_checkpoint import Checkpoint, find_checkpoint
+
+
+def _interrupt_after(n):
+    def progress(items, **kwargs):
+        for i, item in enumerate(items):
+            if i == n:
+                raise KeyboardInterrupt
+            yield item
+    return progress
+
+
+@pytest.fixture
+def tree(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(10):
+        (src / f"m{i}.py").write_text(f"def f{i}(x):\n    # step {i}\n    return x + {i}\n")
+    return src
+
+
+def test_interrupted_scan_resumes_without_rescoring(tree, tmp_path, monkeypatch):
+    out = tmp_path / "out"
+    scored = []
+    real = scanner.run_vata_analysis
+    monkeypatch.setattr(scanner, "run_vata_analysis", lambda path, text=None: scored.append(path) or real(path, text))
+
+    monkeypatch.setattr(scanner, "tqdm", _interrupt_after(4))
+    with pytest.raises(KeyboardInterrupt):
+        scanner.batch_scan(str(tree), str(out), checkpoint_every=3, io_threads=1, prefetch=1)
+    ckpt_path = find_checkpoint(str(out), str(tree.resolve()))
+    journaled = [path for path, _, _ in Checkpoint(ckpt_path, {}).entries()]
+    assert len(journaled) == 4                                # committed on interrupt, not just every 3
+    assert not list(out.glob("vata-scan-*.csv"))
+
+    monkeypatch.setattr(scanner, "tqdm", lambda items, **kwargs: items)
+    del scored[:]
+    df = scanner.batch_scan(str(tree), str(out), resume=True, io_threads=1, prefetch=1)
+    everything = {str(p) for p in tree.resolve().glob("*.py")}
+    assert sorted(scored) == sorted(everything - set(journaled))   # finished files are not scored again
+    assert sorted(df["filename"]) == [f"m{i}.py" for i in range(10)]
+    [csv] = out.glob("vata-scan-*.csv")
+    assert len(pd.read_csv(csv)) == 10
+    assert find_checkpoint(str(out)) is None                  # journal removed once the output is written
+
+    fresh = scanner.batch_scan(str(tree), str(tmp_path / "fresh"))
+    cols = ["full_path", "soul_score", "verdict"]
+    assert df.sort_values("full_path")[cols].values.tolist() == fresh.sort_values("full_path")[cols].values.tolist()
+
+
+def test_resume_without_checkpoint_fails(tree, tmp_path):
+    assert scanner.batch_scan(str(tree), str(tmp_path / "out"), resume=True) is None
+
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    path = str(tmp_path / "vata-scan-20261001-000000.csv.checkpoint")
+    ckpt = Checkpoint.create(path, {"input": "/src"}, every_files=2)
+    ckpt.record("/src/a.py", row={"soul_score": 1})
+    assert not ckpt.maybe_commit()
+    ckpt.record("/src/b.py", error="boom")
+    assert ckpt.maybe_commit()
+    with open(path, "a") as f:
+        f.write(json.dumps({"path": "/src/c.py"})[:10])        # crash mid-write
+
+    loaded = Checkpoint.load(path)
+    assert loaded.done == {"/src/a.py", "/src/b.py"}
+    assert list(loaded.entries()) == [("/src/a.py", {"soul_score": 1}, None), ("/src/b.py", None, "boom")]
+    assert open(path).read().endswith("\n")
+    assert find_checkpoint(str(tmp_path), "/src") == path and find_checkpoint(str(tmp_path), "/other") is None
+    loaded.finish()
+    with pytest.raises(FileNotFoundError):
+        Checkpoint.load(path)
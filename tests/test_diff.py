@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq  # noqa: E402
+
+import vata_diff as vd  # noqa: E402
+
+
+def _scan(seed, ids, hash_gaps=0.0):
+    rng = np.random.default_rng(seed)
+    n = len(ids)
+    prob = rng.choice([0.1, 0.4, 0.42, 0.9], n)
+    prob[rng.random(n) < 0.05] = np.nan
+    hashes = [f"h{i % 7}" for i in rng.integers(0, 100, n)]
+    if hash_gaps:
+        hashes = [None if g else h for h, g in zip(hashes, rng.random(n) < hash_gaps)]
+    return pd.DataFrame({
+        "full_path": [f"/repo/{i:04d}.py" for i in ids],
+        "content_hash": hashes,
+        "verdict": rng.choice(["HUMAN", "AI"], n),
+        "ai_probability": prob,
+        "soul_score": rng.integers(0, 100, n).astype(float),
+    })
+
+
+def _expected(old, new, min_delta):
+    m = old.merge(new, on="full_path", how="outer", suffixes=("_o", "_n"), indicator="side")
+    rows = []
+    for r in m.sort_values("full_path").itertuples():
+        po, pn = r.ai_probability_o, r.ai_probability_n
+        if r.side == "left_only":
+            status = "removed"
+        elif r.side == "right_only":
+            status = "added"
+        elif (r.verdict_o != r.verdict_n or math.isnan(po) != math.isnan(pn)
+              or (not math.isnan(po) and abs(round(pn - po, 6)) > min_delta)):
+            status = "changed"
+        else:
+            continue
+        rows.append((status, r.full_path))
+    return rows
+
+
+@pytest.mark.parametrize("min_delta", [0.0, 0.05])
+def test_diff_matches_pandas_outer_merge(tmp_path, min_delta):
+    old = _scan(1, range(0, 400), hash_gaps=0.1)
+    new = _scan(2, range(50, 450))
+    new.loc[new.index[:300:3], ["verdict", "ai_probability", "content_hash"]] = \
+        old.set_index("full_path").loc[new.full_path[:300:3], ["verdict", "ai_probability", "content_hash"]].values
+    # old scan: parquet in small row groups with rows lacking a path; new scan: CSV
+    old_path, new_path = str(tmp_path / "old.parquet"), str(tmp_path / "new.csv")
+    with_gaps = pd.concat([old, pd.DataFrame({"full_path": [None, None], "soul_score": [1.0, 2.0]})])
+    pq.write_table(pa.Table.from_pandas(with_gaps.sample(frac=1, random_state=0), preserve_index=False),
+                   old_path, row_group_size=16)
+    new.sample(frac=1, random_state=1).to_csv(new_path, index=False)
+
+    got = list(vd.diff_scans(old_path, new_path, min_delta=min_delta, chunk_rows=37))
+    assert [(r["status"], r["full_path"]) for r in got] == _expected(old, new, min_delta)
+
+    by_path = {r["full_path"]: r for r in got}
+    o, n = old.set_index("full_path"), new.set_index("full_path")
+    for path, r in by_path.items():
+        if r["status"] != "changed":
+            continue
+        ho, hn = o.content_hash[path], n.content_hash[path]
+        assert r["content_changed"] == (None if pd.isna(ho) else ho != hn)
+        assert r["soul_score_delta"] == pytest.approx(n.soul_score[path] - o.soul_score[path])
+        assert (r["old_verdict"], r["new_verdict"]) == (o.verdict[path], n.verdict[path])
+
+
+def test_external_sort_spills_several_runs(tmp_path):
+    df = _scan(3, np.random.default_rng(0).permutation(300))
+    path = str(tmp_path / "scan.parquet")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path, row_group_size=10)
+    spill = tmp_path / "spill"
+    spill.mkdir()
+    runs = vd.sorted_runs(path, str(spill), chunk_rows=40)
+    assert len(runs) == 8
+    rows = list(vd.iter_sorted(path, str(tmp_path), chunk_rows=40))
+    assert [r[0] for r in rows] == sorted(df.full_path)
+    assert list(vd.diff_scans(path, path, chunk_rows=40)) == []
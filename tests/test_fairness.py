@@ -0,0 +1,95 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+import vata_fairness as vf
+
+
+def _brute_rates(y_true, y_pred, groups, g):
+    rows = [i for i in range(len(groups)) if groups[i] == g]
+    pos = [i for i in rows if y_true[i] == 1]
+    neg = [i for i in rows if y_true[i] == 0]
+
+    def mean(idx):
+        return sum(y_pred[i] for i in idx) / len(idx) if idx else math.nan
+
+    return mean(rows), mean(pos), mean(neg)
+
+
+def _spread(values):
+    values = [v for v in values if not math.isnan(v)]
+    return max(values) - min(values)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(7)
+    n = 2_000
+    return rng.integers(0, 2, n), rng.integers(0, 2, n), rng.integers(0, 5, n)
+
+
+def test_fairness_report_matches_brute_force(data):
+    y_true, y_pred, groups = data
+    report = vf.fairness_report(y_true, y_pred, groups)
+    brute = [_brute_rates(y_true, y_pred, groups, g) for g in range(5)]
+    sel, tpr, fpr = (list(col) for col in zip(*brute))
+    np.testing.assert_allclose(report["selection_rate"], sel)
+    np.testing.assert_allclose(report["tpr"], tpr)
+    np.testing.assert_allclose(report["fpr"], fpr)
+    assert report["gaps"]["demographic_parity"] == pytest.approx(_spread(sel))
+    assert report["gaps"]["equal_opportunity"] == pytest.approx(_spread(tpr))
+    assert report["gaps"]["equalized_odds"] == pytest.approx(max(_spread(tpr), _spread(fpr)))
+
+
+def test_fairness_report_rejects_non_binary_labels():
+    with pytest.raises(ValueError, match="y_pred"):
+        vf.fairness_report([0, 1, 1], [0, 2, 1], [0, 0, 1])
+    with pytest.raises(ValueError, match="y_true"):
+        vf.fairness_report([0, -1, 1], [0, 1, 1], [0, 0, 1])
+
+
+def test_fairness_report_empty():
+    report = vf.fairness_report([], [], [], n_boot=20)
+    assert report["groups"] == 0
+    assert all(math.isnan(v) for v in report["gaps"].values())
+
+
+@pytest.mark.parametrize("as_index", [False, True])
+def test_prove_fairness_masks_match_brute_force(as_index):
+    y_pred = np.array([1, 0, 1, 0, 1, 1, 0, 0])
+    groups = {"a": [0, 2, 3], "b": [1, 4, 5, 6], "all": list(range(8))}   # overlapping groups
+    if not as_index:
+        groups = {g: np.isin(np.arange(8), idx) for g, idx in groups.items()}
+    fair, rates, disparity = vf.prove_fairness(None, y_pred, groups)
+    expected = {"a": 2 / 3, "b": 2 / 4, "all": 4 / 8}
+    assert rates == pytest.approx(expected)
+    assert disparity == pytest.approx(2 / 3 - 1 / 2)
+    assert fair is False
+
+
+def test_accumulator_shards_match_one_pass(tmp_path):
+    rng = np.random.default_rng(11)
+    n = 3_000
+    sex = rng.choice(["f", "m"], n)
+    band = rng.choice(["<30", "30-50", ">50"], n)
+    y_true, y_pred = rng.integers(0, 2, n), rng.integers(0, 2, n)
+    records = [{"sex": s, "band": b, "y_true": int(t), "y_pred": int(p)}
+               for s, b, t, p in zip(sex, band, y_true, y_pred)]
+
+    # two shards seeing groups in different orders, one streamed from JSONL in small chunks
+    log = tmp_path / "preds.jsonl"
+    log.write_text("".join(json.dumps(r) + "\n" for r in records[1000:]))
+    shard_a = vf.FairnessAccumulator(("sex", "band")).update_records(records[:1000][::-1])
+    shard_b = vf.FairnessAccumulator(("sex", "band")).consume_jsonl(str(log), chunk_size=128)
+    merged = vf.FairnessAccumulator.from_dict(json.loads(json.dumps(shard_a.to_dict()))).merge(shard_b)
+    assert merged.total == n
+
+    ids, labels = vf.encode_groups(sex, band)
+    expected = vf.fairness_report(y_true, y_pred, ids)
+    got = merged.report()
+    order = [got["labels"].index(label) for label in labels]
+    np.testing.assert_array_equal(got["counts"][order], expected["counts"])
+    np.testing.assert_allclose(got["selection_rate"][order], expected["selection_rate"])
+    assert got["gaps"] == pytest.approx(expected["gaps"])
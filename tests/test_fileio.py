@@ -0,0 +1,62 @@
+import hashlib
+import pickle
+
+import pytest
+
+from vata_fileio import LoadedFile, open_mapped, probe, read_text
+
+
+@pytest.fixture
+def sample(tmp_path):
+    data = "".join(f"line {i} é\n" for i in range(300)).encode() + b"tail \xff no newline"
+    path = tmp_path / "a.py"
+    path.write_bytes(data)
+    return path, data
+
+
+def test_mapped_file_matches_plain_reads(sample):
+    path, data = sample
+    with open_mapped(path) as mf:
+        assert mf.size == len(data)
+        assert mf.head(10) == data[:10]
+        assert mf.newlines() == data.count(b"\n") == 300
+        assert mf.newlines(100, 500) == data[100:500].count(b"\n")
+        assert mf.sha1() == hashlib.sha1(data).hexdigest()
+        assert mf.text() == data.decode("utf-8", "ignore")
+        assert not mf.is_binary()
+
+
+def test_cut_stops_at_last_newline(sample):
+    path, data = sample
+    with open_mapped(path) as mf:
+        end = mf.cut(100)
+        assert end == data.rfind(b"\n", 0, 100) + 1
+        assert mf.text(max_bytes=100) == data[:end].decode()
+        assert mf.cut(None) == mf.cut(len(data)) == len(data)
+    assert read_text(path, max_bytes=100) == data[:end].decode()
+
+
+def test_loaded_file_is_a_picklable_prefix(sample):
+    path, data = sample
+    lf = pickle.loads(pickle.dumps(LoadedFile(path, limit=200)))
+    assert lf.size == len(data) and lf.buf == data[:200]
+    assert lf.text(max_bytes=200) == data[:data.rfind(b"\n", 0, 200) + 1].decode()
+    whole = LoadedFile(path)
+    with open_mapped(path) as mf:
+        assert (whole.sha1(), whole.text()) == (mf.sha1(), mf.text())
+
+
+def test_binary_and_empty_files(tmp_path):
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(b"abc\0def\n")
+    assert read_text(blob) is None
+    assert read_text(blob, skip_binary=False) == "abc\0def\n"
+    info = probe(blob, count_lines=True)
+    assert (info.size, info.binary, info.lines) == (8, True, None)
+
+    empty = tmp_path / "empty.py"
+    empty.write_bytes(b"")
+    assert read_text(empty) == ""
+    assert probe(empty, count_lines=True).lines == 0
+    with pytest.raises(OSError):
+        read_text(tmp_path / "missing.py")
@@ -0,0 +1,67 @@
+import hashlib
+import time
+
+import pytest
+
+from vata_guard import Budget, ScanGuard, detect_generated
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_plain_file_is_scored_whole(tmp_path):
+    data = b"def f():\n    return 1\n"
+    path = _write(tmp_path, "a.py", data)
+    res = ScanGuard().scan(path, scorer=len)
+    assert (res.status, res.result, res.scored_bytes) == ("ok", len(data), len(data))
+    assert res.content_hash == hashlib.sha1(data).hexdigest()
+
+
+def test_oversized_file_is_cut_at_a_newline(tmp_path):
+    path = _write(tmp_path, "big.py", b"x = 1\n" * 100)
+    res = ScanGuard(Budget(max_bytes=100, on_oversize="truncate")).scan(path, scorer=lambda text: text)
+    assert res.status == "truncated"
+    assert res.result.endswith("\n") and len(res.result) <= 100
+    assert res.content_hash is None                       # not read in full
+
+
+def test_oversized_file_goes_to_sampler(tmp_path):
+    path = _write(tmp_path, "big.py", b"x = 1\n" * 100)
+    sampled = {"sampling": {"sampled_bytes": 42}}
+    res = ScanGuard(Budget(max_bytes=100)).scan(path, scorer=len, sampler=lambda p: sampled)
+    assert (res.status, res.scored_bytes, res.result) == ("stratified", 42, sampled)
+
+
+def test_minified_and_binary_files(tmp_path):
+    minified = b"var a=1;" * 2000                           # 16 KB, no newlines
+    assert detect_generated(minified) == "minified (long lines)"
+    assert detect_generated(b"// @generated by protoc\nx") == "generated (@generated)"
+    guard = ScanGuard(Budget(head_bytes=4096))
+    res = guard.scan(_write(tmp_path, "app.min.js", minified), scorer=len)
+    assert (res.status, res.result) == ("sampled", 4096)  # only the head is scored
+    skip = ScanGuard(Budget(on_generated="skip")).scan(_write(tmp_path, "b.js", minified), scorer=len)
+    assert skip.status == "skipped"
+    binary = guard.scan(_write(tmp_path, "blob.py", b"\x00\x01\x02" * 100), scorer=len)
+    assert (binary.status, binary.reason) == ("skipped", "binary")
+
+
+def test_slow_scorer_is_stopped(tmp_path):
+    path = _write(tmp_path, "a.py", b"x = 1\n")
+    guard = ScanGuard(Budget(max_seconds=0.2))
+    start = time.perf_counter()
+    res = guard.scan(path, scorer=lambda text: time.sleep(5))
+    assert res.status == "timeout"
+    assert time.perf_counter() - start < 2
+    assert guard.summary()["timeout"]["files"] == 1
+
+
+def test_scorer_error_is_recorded(tmp_path):
+    guard = ScanGuard()
+    res = guard.scan(_write(tmp_path, "a.py", b"x\n"), scorer=lambda text: 1 / 0)
+    assert res.status == "error" and "division" in res.reason
+    missing = guard.scan(str(tmp_path / "missing.py"), scorer=len)
+    assert missing.status == "error"
+    assert guard.summary()["error"]["files"] == 2
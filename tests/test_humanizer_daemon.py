@@ -0,0 +1,60 @@
+import os
+import threading
+
+import pytest
+
+import vatahumanizer as vh
+
+pytestmark = pytest.mark.skipif(not hasattr(vh.socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for i, body in enumerate(["x=1\n", "def f(a):\n    # add one\n    return a + 1\n", "class C:\n    pass\n"]):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(body)
+        paths.append(str(path))
+    return paths
+
+
+def test_daemon_scores_like_in_process(sources, tmp_path):
+    sock = str(tmp_path / "vata.sock")
+    with vh.ScoreDaemon(sock) as daemon:
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+        try:
+            remote = vh.score_via_daemon(sock, sources)
+            again = vh.score_via_daemon(sock, sources)      # second client, served from the cache
+        finally:
+            daemon.shutdown()
+    assert remote == vh.score_paths(sources) == again
+    assert not os.path.exists(sock)                         # socket removed on close
+
+
+def test_daemon_reports_bad_requests(tmp_path):
+    sock = str(tmp_path / "vata.sock")
+    with vh.ScoreDaemon(sock) as daemon:
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        try:
+            with vh.socket.socket(vh.socket.AF_UNIX, vh.socket.SOCK_STREAM) as s:
+                s.connect(sock)
+                s.sendall(b'{"files": []}\n')
+                reply = s.makefile("rb").readline()
+        finally:
+            daemon.shutdown()
+    assert b'"error"' in reply
+
+
+def test_score_cache_rescores_only_changed_files(sources, monkeypatch):
+    calls = []
+    real = vh.compute_soul_score
+    monkeypatch.setattr(vh, "compute_soul_score", lambda p: calls.append(p) or real(p))
+    cache = vh.ScoreCache()
+    first = vh.score_paths(sources, cache)
+    assert vh.score_paths(sources, cache) == first
+    assert len(calls) == len(sources)
+    with open(sources[0], "a") as f:
+        f.write("y = 2\n")
+    vh.score_paths(sources, cache)
+    assert calls[len(sources):] == [sources[0]]
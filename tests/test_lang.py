@@ -0,0 +1,52 @@
+import pytest
+
+from vata_lang import EXTENSIONS, PLUGINS, LanguagePlugin, extract_features, get_plugin, plugin_for, register
+
+# (language, source, expected counts); comment markers inside strings must not count
+CASES = [
+    ("python",
+     'def f(a):\n    s = "# not a comment"\n    # real\n    return a\n\nclass C:\n    """doc\n    # inside"""\n',
+     dict(lines=8, blank_lines=1, comment_lines=1, functions=1, classes=1, strings=2)),
+    ("javascript",
+     '// top\nconst s = "// nope";\nfunction f() { return 1; }\nconst g = (x) => x * 2;\n'
+     'class K { m(a) { if (a) { return a; } } }\n/* block\n   two */\n',
+     dict(lines=7, comment_lines=3, functions=3, classes=1, strings=1)),
+    ("go",
+     "package main\n// c\nfunc main() {\n\ts := `raw // x`\n\t_ = '/'\n}\ntype T struct{}\n",
+     dict(lines=7, comment_lines=1, functions=1, classes=1, strings=2)),
+    ("rust",
+     'fn main() {\n    let s = r#"// raw "# ;\n    // c\n}\nstruct S;\n',
+     dict(lines=5, comment_lines=1, functions=1, classes=1, strings=1)),
+    ("c",
+     "int add(int a, int b) {\n    return a + b; /* sum */\n}\nint main(void) {\n    if (add(1, 2)) { return 0; }\n}\n",
+     dict(lines=6, comment_lines=0, functions=2, numbers=3)),
+    ("java",
+     'class A {\n  void run() throws Exception {\n    String s = "/* x */";\n  }\n}\n',
+     dict(lines=5, comment_lines=0, functions=1, classes=1, strings=1)),
+]
+
+
+@pytest.mark.parametrize("language,code,expected", CASES, ids=[c[0] for c in CASES])
+def test_features_per_language(language, code, expected):
+    feats = extract_features(code, language)
+    assert {k: getattr(feats, k) for k in expected} == expected
+
+
+def test_dispatch_by_extension():
+    assert plugin_for("src/lib.rs").name == "rust"
+    assert plugin_for(".TSX").name == "typescript"
+    assert plugin_for("notes.txt") is None
+    assert extract_features("x = 1", path="a.unknown").language == "python"
+    with pytest.raises(KeyError):
+        get_plugin("cobol")
+
+
+def test_register_new_language():
+    register(LanguagePlugin(name="lua", extensions=(".lua",), line_comments=("--",),
+                            def_keywords=frozenset({"function"})))
+    try:
+        feats = extract_features("-- hi\nfunction f() return 1 end\n", path="m.lua")
+        assert (feats.language, feats.comment_lines, feats.functions) == ("lua", 1, 1)
+    finally:
+        PLUGINS.pop("lua")
+        EXTENSIONS.pop(".lua")
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import ROOT
+
+import vata_metrics as vm
+
+
+@pytest.fixture
+def registry():
+    return vm.Registry()
+
+
+def test_render_text_format(registry):
+    files = registry.counter("t_files_total", "Files", ("engine",))
+    depth = registry.gauge("t_depth", "Depth")
+    latency = registry.histogram("t_seconds", "Latency", ("engine",), buckets=(0.1, 1))
+    files.inc(engine="a")
+    files.inc(2, engine='b"\n')
+    depth.set(3)
+    depth.dec()
+    for v in (0.05, 0.5, 5):
+        latency.observe(v, engine="a")
+    assert registry.render() == "\n".join([
+        "# HELP t_depth Depth", "# TYPE t_depth gauge", "t_depth 2",
+        "# HELP t_files_total Files", "# TYPE t_files_total counter",
+        't_files_total{engine="a"} 1', 't_files_total{engine="b\\"\\n"} 2',
+        "# HELP t_seconds Latency", "# TYPE t_seconds histogram",
+        't_seconds_bucket{engine="a",le="0.1"} 1', 't_seconds_bucket{engine="a",le="1"} 2',
+        't_seconds_bucket{engine="a",le="+Inf"} 3',
+        't_seconds_sum{engine="a"} 5.55', 't_seconds_count{engine="a"} 3',
+    ]) + "\n"
+
+
+def test_label_and_type_checks(registry):
+    files = registry.counter("t_files_total", "Files", ("engine",))
+    assert registry.counter("t_files_total", "Files", ("engine",)) is files
+    with pytest.raises(ValueError):
+        registry.gauge("t_files_total", "Files", ("engine",))
+    with pytest.raises(ValueError):
+        files.inc(status="ok")
+    with pytest.raises(ValueError):
+        files.inc(-1, engine="a")
+    gauge = registry.gauge("t_busy", "Busy", ("pool",))
+    with gauge.track(pool="p"):
+        assert gauge.value(pool="p") == 1
+    assert gauge.value(pool="p") == 0
+
+
+def test_concurrent_increments_are_not_lost(registry):
+    files = registry.counter("t_files_total", "Files", ("engine",))
+
+    def work():
+        for _ in range(5000):
+            files.inc(engine="a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert files.value(engine="a") == 40000
+
+
+def test_textfile_and_http_export(registry, tmp_path):
+    registry.counter("t_files_total", "Files").inc(7)
+    path = tmp_path / "out" / "vata.prom"
+    vm.write_textfile(str(path), registry)
+    assert path.read_text() == registry.render()
+    assert [p.name for p in path.parent.iterdir()] == ["vata.prom"]     # no temp file left behind
+
+    server = vm.serve_metrics(0, registry=registry)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as resp:
+            assert resp.headers["Content-Type"] == vm.CONTENT_TYPE
+            assert resp.read().decode() == registry.render()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + "/other")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_import_leaves_sys_path_alone():
+    check = "import sys; before = list(sys.path); import vata_metrics, vata_profile; assert sys.path == before"
+    proc = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
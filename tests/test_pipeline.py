@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from vata_pipeline import PipelineStats, pipeline, prefetch
+
+PATHS = [f"f{i:02d}.py" for i in range(40)]
+
+
+class Loaded:
+    def __init__(self, path):
+        self.buf = path.encode() * 10
+
+
+def load(path):
+    if path == "f13.py":
+        raise OSError("unreadable")
+    return Loaded(path)
+
+
+def score(path, item):
+    if path == "f21.py":
+        raise ValueError("bad input")
+    return len(item.buf)
+
+
+@pytest.mark.parametrize("io_threads,workers", [(1, 1), (4, 1), (4, 2)])
+def test_pipeline_matches_serial_scoring(io_threads, workers):
+    stats = PipelineStats()
+    got = dict(pipeline(PATHS, load, score, io_threads=io_threads, depth=3, workers=workers, stats=stats))
+    assert sorted(got) == PATHS                               # every path exactly once
+    assert isinstance(got.pop("f13.py"), OSError)             # load and score errors come back as results
+    assert isinstance(got.pop("f21.py"), ValueError)
+    assert got == {p: score(p, load(p)) for p in got}
+    assert stats.files == 40 and stats.bytes == 39 * 60       # the failed load counts no bytes
+    assert stats.wall_s >= stats.wait_s >= 0
+
+
+def test_single_reader_keeps_input_order():
+    assert [p for p, _ in prefetch(PATHS, Loaded, io_threads=1, depth=4)] == PATHS
+
+
+def test_readers_stop_at_depth_and_on_close():
+    loaded = []
+    lock = threading.Lock()
+
+    def slow_load(path):
+        with lock:
+            loaded.append(path)
+        return Loaded(path)
+
+    it = prefetch(PATHS, slow_load, io_threads=2, depth=4)
+    next(it)
+    time.sleep(0.3)
+    # queue of 4 plus one item blocked in each reader, plus the one consumed
+    assert len(loaded) <= 4 + 2 + 1
+    it.close()                                                # joins the readers
+    count = len(loaded)
+    time.sleep(0.2)
+    assert len(loaded) == count < len(PATHS)
+
+
+def test_failing_path_source_is_raised():
+    def paths():
+        yield "a.py"
+        raise RuntimeError("walk failed")
+
+    with pytest.raises(RuntimeError, match="walk failed"):
+        list(pipeline(paths(), Loaded, lambda p, item: 1, io_threads=1))
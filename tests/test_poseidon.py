@@ -0,0 +1,48 @@
+import os
+import random
+
+import pytest
+
+import vata_poseidon as vp
+
+# circomlibjs reference outputs
+VECTORS = [
+    ([1], 18586133768512220936620570745912940619677854269274689475585506675881198879027),
+    ([1, 2], 7853200120776062878684798364095072458815029376092732009249414926327459813530),
+    ([1, 2, 3, 4], 18821383157269793795438455681495246036402687001665670618754263018637548127333),
+]
+
+
+@pytest.mark.parametrize("inputs,expected", VECTORS)
+def test_matches_circomlib(inputs, expected):
+    assert vp.poseidon(inputs) == expected
+
+
+def test_batch_matches_single_hashes():
+    rng = random.Random(3)
+    rows = [[rng.randrange(vp.SNARK_FIELD) for _ in range(5)] for _ in range(20)]
+    assert vp.poseidon_batch(rows) == [vp.poseidon(r) for r in rows]
+    with pytest.raises(ValueError):
+        vp.poseidon_batch([[1, 2], [3]])
+    with pytest.raises(ValueError):
+        vp.poseidon([0] * 17)
+
+
+def test_hash_words_chains_16_then_15():
+    words = list(range(50))
+    digest = vp.poseidon(words[:16])
+    for start in range(16, 50, 15):
+        digest = vp.poseidon([digest] + words[start:start + 15])
+    assert vp.hash_words(words) == digest
+    assert vp.hash_words_batch([words, words[::-1]]) == [digest, vp.hash_words(words[::-1])]
+
+
+def test_mandate_cache_follows_file_changes(tmp_path):
+    path = tmp_path / "mandate.txt"
+    path.write_text("be kind")
+    cache = vp.MandateHashCache()
+    first = cache.get(str(path))
+    assert cache.get(str(path)) == first
+    path.write_text("be kinder")
+    os.utime(path, ns=(1, 1))                # a new mtime even on coarse clocks
+    assert cache.get(str(path)) != first
@@ -0,0 +1,61 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+import vata_profile as vp
+
+
+def test_stages_are_free_when_profiling_is_off():
+    assert vp.active() is None
+    assert vp.stage("soul") is vp.stage("other") is vp.file_scope("a.py")
+
+
+def test_stage_times_nest_and_split_per_file():
+    with vp.profiling(top_n=2) as prof:
+        for i, delay in enumerate((0.001, 0.03, 0.015)):
+            with vp.file_scope(f"f{i}.py"):
+                with vp.stage("soul"):
+                    with vp.stage("soul.lex"):
+                        time.sleep(delay)
+                with vp.stage("fairness"):
+                    pass
+    assert vp.active() is None
+    rep = prof.report()
+    assert rep["files"] == 3
+    stages = rep["stages"]
+    assert {k: s["calls"] for k, s in stages.items()} == {"fairness": 3, "soul": 3, "soul.lex": 3}
+    assert stages["soul"]["wall_s"] >= stages["soul.lex"]["wall_s"] >= 0.045   # inclusive
+    assert list(stages["soul"]["histogram_ms"]["buckets"].values())[-1] == 3    # cumulative buckets
+    slow = rep["slowest_files"]
+    assert [f["path"] for f in slow] == ["f1.py", "f2.py"]                   # top 2, slowest first
+    assert set(slow[0]["stages"]) == {"soul", "soul.lex", "fairness"}
+    assert "f1.py" in prof.format_report()
+
+
+def test_threads_keep_their_own_file_split():
+    with vp.profiling() as prof:
+        def work(i):
+            with vp.file_scope(f"t{i}.py"):
+                with vp.stage(f"s{i}"):
+                    time.sleep(0.01)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    for f in prof.report()["slowest_files"]:
+        assert list(f["stages"]) == ["s" + f["path"][1]]
+
+
+def test_profiling_nests_and_writes_pstats(tmp_path):
+    out = tmp_path / "vata.prof"
+    with vp.profiling() as outer:
+        with vp.profiling(pstats_path=str(out)) as inner:
+            with vp.stage("inner"):
+                sum(range(1000))
+        assert vp.active() is outer
+    assert "inner" in inner.report()["stages"] and not outer.report()["stages"]
+    assert pstats.Stats(str(out)).total_calls > 0
@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import Future
+
+import pytest
+
+import vata_prover
+from vata_prover import CircuitArtifacts, ProverPool
+
+# stands in for zk/prover_worker.js: same line protocol, run with python as "node"
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys
+    flags = os.path.join(os.path.dirname(__file__), "flags")
+    if os.path.exists(os.path.join(flags, "nostart")):
+        print(json.dumps({"ready": False, "error": "no zkey"}), flush=True)
+        sys.exit(1)
+    print(json.dumps({"ready": True, "load_ms": 1}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        if job["input"].get("crash"):
+            os._exit(1)
+        if job["input"].get("kill_next_start"):
+            open(os.path.join(flags, "nostart"), "w").close()
+            os._exit(1)
+        print(json.dumps({"ok": True, "proof": {}, "public": [str(job["input"]["x"])],
+                          "timings": {}}), flush=True)
+""")
+
+
+@pytest.fixture
+def pool_factory(tmp_path, monkeypatch):
+    script = tmp_path / "worker.py"
+    script.write_text(FAKE_WORKER)
+    (tmp_path / "flags").mkdir()
+    monkeypatch.setattr(vata_prover, "WORKER_SCRIPT", script)
+    artifacts = CircuitArtifacts(zkey="z", wasm="w", witness_calculator="wc")
+    pools = []
+
+    def make(**kwargs):
+        pool = ProverPool(artifacts, node=sys.executable, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def test_dead_worker_is_replaced(pool_factory):
+    pool = pool_factory(workers=1, job_retries=1)
+    crash = pool.submit({"crash": True})
+    with pytest.raises(RuntimeError, match="worker died"):
+        crash.result(timeout=30)
+    # the crashing job was retried once, on a fresh worker, and the pool still works
+    assert pool.prove({"x": 5})["public"] == ["5"]
+
+
+def test_jobs_fail_when_no_worker_can_start(pool_factory):
+    pool = pool_factory(workers=1, max_restarts=2, job_retries=0)
+    killer = pool.submit({"kill_next_start": True})
+    queued = pool.submit({"x": 1})
+    with pytest.raises(RuntimeError, match="worker died"):
+        killer.result(timeout=30)
+    with pytest.raises(RuntimeError, match="No prover workers left"):
+        queued.result(timeout=30)
+    with pytest.raises(RuntimeError, match="No prover workers left"):
+        pool.prove({"x": 2})
+
+
+class _InstantPool:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, inputs):
+        self.jobs.append(inputs)
+        future = Future()
+        future.set_result({"proof": {}, "public": [str(inputs["x"])], "timings": {}})
+        return future
+
+
+def test_serve_requeues_only_jobs_of_exited_servers(tmp_path):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    host = socket.gethostname()
+    running = tmp_path / "running"
+    running.mkdir()
+    claims = {
+        "dead": f"dead@{host}-{dead.pid}",
+        "legacy": "legacy",                              # claimed before owners were recorded
+        "live": f"live@{host}-{os.getpid()}",            # another server still proving it
+        "remote": "remote@elsewhere.example-1",          # other machine: cannot tell, leave it
+    }
+    for i, name in enumerate(claims.values()):
+        (running / f"{name}.json").write_text(json.dumps({"x": i}))
+
+    pool = _InstantPool()
+    vata_prover.serve(pool, str(tmp_path), poll_interval=0.01, once=True)
+    assert sorted(p.name for p in (tmp_path / "done").iterdir()) == ["dead", "legacy"]
+    assert sorted(p.stem for p in running.glob("*.json")) == sorted([claims["live"], claims["remote"]])
+    assert sorted(job["x"] for job in pool.jobs) == [0, 1]
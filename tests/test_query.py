@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import vata_query as vq
+
+
+def _scan_frame(seed, n=500):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 100, n).astype(float)
+    scores[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "full_path": [f"/repo/f{i:04d}.py" for i in rng.permutation(n)],
+        "soul_score": scores,
+        "verdict": rng.choice(["HUMAN", "AI", "MIXED"], n),
+        "guard_reason": None,
+        "ci_low": None,
+    })
+
+
+def test_compact_types_sparse_columns(tmp_path):
+    df = _scan_frame(0, n=60_000)
+    df.loc[df.index[-1], ["guard_reason", "ci_low"]] = ["minified", 3]   # first value after the inference block
+    csv = tmp_path / "vata-scan-20261001-000000.csv"
+    df.to_csv(csv, index=False)
+
+    [written] = vq.compact(str(tmp_path))
+    table = vq.open_dataset(written).to_table()
+    assert str(table.schema.field("soul_score").type) == "int32"
+    assert table.num_rows == len(df)
+    assert table.column("guard_reason").to_pylist()[-1] == "minified"
+    assert table.column("ci_low").to_pylist()[-1] == 3
+
+
+def test_drops_matches_pandas_merge(tmp_path):
+    old, new = _scan_frame(1), _scan_frame(2)
+    old.to_csv(tmp_path / "vata-scan-20261001-000000.csv", index=False)
+    new.to_csv(tmp_path / "vata-scan-20261008-000000.csv", index=False)
+    # the first scan is read from CSV, the second from its Parquet copy
+    vq.compact(str(tmp_path))
+    (tmp_path / "vata-scan-20261001-000000.parquet").unlink()
+
+    scans = vq.discover(str(tmp_path))
+    assert [s.format for s in scans] == ["csv", "parquet"]
+    got = vq.drops(scans, below=40, chunk_rows=37)
+
+    merged = old.merge(new, on="full_path", suffixes=("_before", "_after"))
+    expected = merged[(merged.soul_score_before >= 40) & (merged.soul_score_after < 40)]
+    expected = expected.assign(delta=expected.soul_score_after - expected.soul_score_before)
+    expected = expected.sort_values(["delta", "full_path"])
+    assert [(r["full_path"], r["score_before"], r["score_after"]) for r in got] == list(
+        zip(expected.full_path, expected.soul_score_before, expected.soul_score_after)
+    )
+    assert got and all(r["from_scan"] == "20261001-000000" for r in got)
+
+
+def test_drops_applies_where_to_both_scans(tmp_path):
+    old, new = _scan_frame(3), _scan_frame(4)
+    old.to_csv(tmp_path / "vata-scan-20261001-000000.csv", index=False)
+    new.to_csv(tmp_path / "vata-scan-20261008-000000.csv", index=False)
+    where = vq.Predicate(verdicts=["AI", "MIXED"], min_score=10, max_score=90)
+    got = vq.drops(vq.discover(str(tmp_path)), below=40, where=where, chunk_rows=37)
+
+    merged = old.merge(new, on="full_path", suffixes=("_before", "_after"))
+    keep = merged.soul_score_before.between(40, 89) & merged.soul_score_after.between(10, 39)
+    for side in ("before", "after"):
+        keep &= merged[f"verdict_{side}"].isin(["AI", "MIXED"])
+    expected = merged[keep].assign(delta=lambda d: d.soul_score_after - d.soul_score_before)
+    expected = expected.sort_values(["delta", "full_path"])
+    assert got and [r["full_path"] for r in got] == list(expected.full_path)
@@ -0,0 +1,65 @@
+import random
+import re
+
+import pytest
+
+import vata_rules
+from vata_rules import DEFAULT_CONFIG, RULE_LISTS, RuleEngine, RuleSet, _leading_literal, _rule_source
+
+EXTRA = {
+    # top-level alternations: neither branch may be used as the only anchor
+    "pii_patterns": DEFAULT_CONFIG["pii_patterns"] + [r"api_key|secret\s*=", r"tok(en|k)|bearer"],
+    "bias_context": DEFAULT_CONFIG["bias_context"] + [r"race\s*(?:cond|track)|heat\s*race"],
+}
+WORDS = [
+    "race", "Race", "race condition", "trace", "racer", "gender", "genders", "IQ", "unique", "bias", "bias=True",
+    "discrimination", "Discriminates", "eval(", "exec (", "os.system", "rm -rf", "password", "SSN", "ssn",
+    "123-45-6789", "4111111111111111", "4111 1111 1111 1111", "a.b@example.com", "api_key", "secret =",
+    "token", "tokk", "bearer", "heat race", "lock", "fair", "stereotype", "Straße", "ſtereotype", "\n", " ", "x",
+]
+
+
+def _naive(config, text):
+    """Every rule searched on its own, no prefilter."""
+    hits = {category: [] for category, _, _ in RULE_LISTS.values()}
+    for key, (category, kind, ignore_case) in RULE_LISTS.items():
+        for pattern in config.get(key, DEFAULT_CONFIG.get(key, [])):
+            if re.search(_rule_source(pattern, kind, ignore_case), text):
+                hits[category].append(pattern)
+    return hits
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scan_matches_per_rule_search(seed):
+    rng = random.Random(seed)
+    rules = RuleSet(EXTRA)
+    for _ in range(300):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+        assert rules.scan(text) == _naive(EXTRA, text), text
+
+
+def test_top_level_alternation_is_unanchored():
+    assert _leading_literal(r"api_key|secret") == ""
+    assert _leading_literal(r"ab(c|d)e") == "ab"
+    assert _leading_literal(r"ab\|c") == "ab|c"
+    assert _leading_literal(r"[|]x") == ""
+    hits = RuleSet(EXTRA).scan("secret = 1")
+    assert r"api_key|secret\s*=" in hits["pii"]
+
+
+def test_report_bias_skips_ml_parameters():
+    hits = RuleSet({}).scan("nn.Linear(4, 8, bias=True)  # unique ids, trace")
+    assert hits["bias"] == ["bias"]            # all_in_one's list still has it
+    assert hits["report_bias"] == []           # cli/app: no "bias", whole words only
+    assert RuleSet({}).scan("Gender and IQ")["report_bias"] == ["gender", "IQ"]
+
+
+def test_engine_reloads_changed_config(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"dangerous_patterns": ["danger!"]}')
+    engine = RuleEngine(path, check_interval=0)
+    assert engine.scan("danger! eval(")["dangerous"] == ["danger!"]
+    path.write_text('{"dangerous_patterns": ["eval(", "exec("]}')
+    assert engine.scan("danger! eval(")["dangerous"] == ["eval("]
+    path.write_text('{"dangerous_patterns": ["bad(regex"], "pii_patterns": ["("]}')
+    assert engine.scan("danger! eval(")["dangerous"] == ["eval("]   # broken config: previous rules kept
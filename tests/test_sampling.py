@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from vata_lang import extract_features
+from vata_sampling import read_blocks, sampled_detection
+
+
+def _score(feats, length):
+    return {"overall_score": 1000.0 * feats.functions / length, "feats": feats}
+
+
+@pytest.fixture
+def big_source(tmp_path):
+    rng = random.Random(3)
+    chunks = []
+    for i in range(12_000):                                  # ~1 MB of mixed python
+        if rng.random() < 0.5:
+            chunks.append(f"def f{i}(a):\n    # step {i}\n    return a + {i}\n\n")
+        else:
+            chunks.append(f"x{i} = '{i}' * 2\n")
+    path = tmp_path / "big.py"
+    path.write_text("".join(chunks))
+    return path
+
+
+def test_small_input_is_scored_exactly():
+    code = "def f(a):\n    return a\n"
+    res = sampled_detection(code, _score, language="python", is_path=False)
+    assert res["sampling"]["mode"] == "exact"
+    assert res["feats"].functions == extract_features(code, "python").functions == 1
+    assert res["sampling"]["ci"] == [res["overall_score"]] * 2
+
+
+def test_stratified_estimate_is_close_to_full_lex(big_source):
+    exact = extract_features(big_source.read_text(), "python")
+    res = sampled_detection(str(big_source), _score, sample_bytes=64 * 1024, n_boot=50)
+    info, est = res["sampling"], res["feats"]
+    assert info["mode"] == "stratified" and info["file_bytes"] == big_source.stat().st_size
+    assert info["sampled_bytes"] <= 64 * 1024 + info["blocks"] * 200   # blocks end at the next newline
+    for k in ("lines", "blank_lines", "comment_lines", "functions", "strings"):
+        assert getattr(est, k) == pytest.approx(getattr(exact, k), rel=0.1), k
+    lo, hi = info["ci"]
+    assert lo <= res["overall_score"] <= hi
+
+
+def test_blocks_are_line_aligned_and_reproducible(big_source):
+    size, blocks = read_blocks(str(big_source), sample_bytes=32 * 1024, strata=8, per_stratum=2, seed=5)
+    assert size == big_source.stat().st_size and len(blocks) == 16
+    assert sorted({s for s, _, _ in blocks}) == list(range(8))
+    data = big_source.read_bytes()
+    for s, off, raw in blocks:
+        assert s * size // 8 <= off < (s + 1) * size // 8
+        assert raw.endswith(b"\n")
+        start = data.index(raw, off)
+        assert start == 0 or data[start - 1:start] == b"\n"
+    assert read_blocks(str(big_source), 32 * 1024, 8, 2, seed=5) == (size, blocks)
+    assert read_blocks(str(big_source), 32 * 1024, 8, 2, seed=6) != (size, blocks)
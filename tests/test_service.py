@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+import pytest
+
+from vata_service import ScoringApp
+
+
+def _call(app, method, path, body=b"", headers=None, chunks=None):
+    """Run one request through the ASGI app; returns (status, decoded JSON body)."""
+    if headers is None:
+        headers = [(b"content-length", str(len(body)).encode())]
+    messages = [{"type": "http.request", "body": c, "more_body": True} for c in (chunks or [])]
+    messages.append({"type": "http.request", "body": body, "more_body": False})
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+@pytest.fixture
+def app():
+    app = ScoringApp(workers=1, max_body=1024, max_batch=4)
+    yield app
+    app.shutdown()
+
+
+@pytest.mark.parametrize("value", [b"abc", b"-1", b""])
+def test_bad_content_length_is_400(app, value):
+    status, body = _call(app, "POST", "/soul", b'{"code": ""}', headers=[(b"content-length", value)])
+    assert (status, body) == (400, {"error": "bad content-length"})
+
+
+@pytest.mark.parametrize("method,path,raw,status,error", [
+    ("GET", "/nope", b"", 404, "not found"),
+    ("POST", "/soul", b"{not json", 400, "body is not valid JSON"),
+    ("POST", "/soul", b"[1, 2]", 422, "body must be a JSON object"),
+    ("POST", "/soul", b'{"code": 5}', 422, "'code' must be a string"),
+    ("POST", "/soul/batch", b'{"codes": "x"}', 422, "'codes' must be a list"),
+    ("POST", "/soul/batch", b'{"codes": ["a", "b", "c", "d", "e"]}', 413, "batch too large (5 > 4)"),
+    ("POST", "/analyze", b'{"code": "x", "language": "cobol"}', 422, "unknown language 'cobol'"),
+])
+def test_client_errors(app, method, path, raw, status, error):
+    assert _call(app, method, path, raw) == (status, {"error": error})
+
+
+def test_oversized_body_is_413(app):
+    big = b'{"code": "' + b"x" * 2000 + b'"}'
+    assert _call(app, "POST", "/soul", big)[0] == 413
+    # a lying or missing content-length is caught while streaming
+    status, _ = _call(app, "POST", "/soul", b"x" * 600, headers=[], chunks=[b"x" * 600])
+    assert status == 413
+    assert app.stats["rejected"] == 2
+
+
+def test_bench_client_rejects_bad_content_length():
+    from vata_service import HTTPError, _http_post
+
+    class Writer:
+        def write(self, data):
+            pass
+
+        async def drain(self):
+            pass
+
+    async def post():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"HTTP/1.1 200 OK\r\nContent-Length: twelve\r\n\r\n{}")
+        reader.feed_eof()
+        return await _http_post(reader, Writer(), "h", "/soul", b"{}")
+
+    with pytest.raises(HTTPError, match="bad content-length"):
+        asyncio.run(post())
@@ -0,0 +1,69 @@
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+CODE = "def add(a, b):\n    # sum two numbers\n    return a + b\n\nclass Race:\n    pass\n"
+
+
+@pytest.fixture(scope="module")
+def aio():
+    return importlib.import_module("all_in_one")
+
+
+@pytest.fixture
+def calls(aio, monkeypatch):
+    seen = []
+    for name in ("vata_ai_soul_detection", "analyze_fairness_and_ethics", "humanize_code",
+                 "swarm_votes", "zk_ethics_stub"):
+        real = getattr(aio, name)
+        monkeypatch.setattr(aio, name, lambda *a, _n=name, _f=real, **k: seen.append(_n) or _f(*a, **k))
+    return seen
+
+
+def _strip(result):
+    return {k: v for k, v in result.items() if k not in ("timestamp", "stages")}
+
+
+@pytest.mark.parametrize("selected", [["soul"], ["ethics"], ["humanize"], ["swarm"], ["zk"], ["soul", "zk"]])
+def test_selected_stages_match_the_full_run(aio, calls, selected):
+    full = _strip(aio.run_analysis(CODE, path="m.py"))
+    del calls[:]
+    part = aio.run_analysis(CODE, path="m.py", stages=selected)
+    keys = {k for name in selected for k in aio.STAGES[name]}
+    assert _strip(part) == {k: v for k, v in full.items() if k in keys or k in ("version", "persona")}
+    assert part["stages"] == [name for name in aio.STAGES if name in selected]
+
+    # only the selected stages and the ones they consume are run
+    needed = set(selected).union(*(aio.STAGE_DEPENDS.get(s, set()) for s in selected))
+    ran = {"vata_ai_soul_detection": "soul", "analyze_fairness_and_ethics": "ethics", "humanize_code": "humanize",
+           "swarm_votes": "swarm", "zk_ethics_stub": "zk"}
+    assert {ran[c] for c in calls} == needed
+
+
+def test_default_runs_every_stage(aio):
+    result = aio.run_analysis(CODE)
+    assert "stages" not in result
+    assert all(k in result for keys in aio.STAGES.values() for k in keys)
+
+
+def test_resolve_stages_rejects_bad_selections(aio):
+    assert aio.resolve_stages(None) == frozenset(aio.STAGES)
+    assert aio.resolve_stages(iter(["soul", "soul"])) == {"soul"}
+    with pytest.raises(ValueError, match="bogus"):
+        aio.resolve_stages(["soul", "bogus"])
+    with pytest.raises(ValueError):
+        aio.resolve_stages([])
+
+
+def test_import_has_no_logging_side_effects(tmp_path):
+    check = ("import logging, all_in_one, logger; "
+             "assert not logging.getLogger().handlers and logger._listener is None")
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run([sys.executable, "-c", check], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert not (tmp_path / "vata.log").exists()
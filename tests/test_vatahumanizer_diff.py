@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+import vatahumanizer
+
+
+def _git(cwd, *args):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "t@example.com")
+    _git(tmp_path, "config", "user.name", "t")
+    (tmp_path / "mod.py").write_text("def f(x):\n    return x\n")
+    (tmp_path / "README.md").write_text("# readme\n")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-qm", "base")
+    (tmp_path / "mod.py").write_text("def f(x):\n    # why\n    return x + 1\n")
+    (tmp_path / "README.md").write_text("# readme\n\nmore\n")
+    (tmp_path / "conf.json").write_text("{}\n")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-qm", "change")
+    return tmp_path
+
+
+def test_score_diff_scores_only_python(repo, monkeypatch):
+    monkeypatch.chdir(repo)
+    results = vatahumanizer.score_diff("HEAD~1...HEAD", vatahumanizer.DiffScoreCache(None))
+    assert [r["path"] for r in results] == ["mod.py"]
+    assert results[0]["score"] > 0
+
+
+def test_diff_gate_runs_without_requests(repo, tmp_path_factory):
+    # CI installs only libcst: the script must not need `requests`
+    shadow = tmp_path_factory.mktemp("shadow")
+    (shadow / "requests.py").write_text("raise ImportError('requests is not installed')\n")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(shadow), ROOT]))
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "vatahumanizer.py"), "--diff", "HEAD~1...HEAD", "--fail-under", "0"],
+        cwd=repo, env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "FILE: mod.py" in proc.stdout
+    assert "README.md" not in proc.stdout
+
+
+def test_diff_gate_fails_on_low_soul_regions(repo, monkeypatch):
+    monkeypatch.chdir(repo)
+    (repo / "terse.py").write_text("def g(a,b):\n    return a*b\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "terse")
+    results = vatahumanizer.score_diff("HEAD~1...HEAD")
+    assert [r["path"] for r in results] == ["terse.py"] and results[0]["score"] < 40
+
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "vatahumanizer.py"), "--diff", "HEAD~1...HEAD", "--fail-under", "40"],
+        cwd=repo, capture_output=True, text=True,
+    )
+    assert proc.returncode == 1, proc.stdout + proc.stderr
+    assert "LOW SOUL: terse.py" in proc.stderr
+    assert vatahumanizer.score_source(b"def g(a,b):\n    return a*b\n") == 50    # whole-file CI path keeps its floor
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from vata_walk import is_ignored, parse_ignore, walk
+
+
+def _tree(root, files):
+    for rel, body in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(body)
+
+
+def _rel(root, paths):
+    return sorted(os.path.relpath(p, root).replace(os.sep, "/") for p in paths)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _tree(tmp_path, {
+        ".gitignore": "*.gen.py\n/top_only.py\nlogs/\n!keep.gen.py\n",
+        "a.py": "", "b.js": "", "notes.txt": "", "top_only.py": "",
+        "x.gen.py": "", "keep.gen.py": "",
+        "pkg/top_only.py": "", "pkg/m.py": "", "pkg/y.gen.py": "",
+        "pkg/.vataignore": "fixtures/**/*.py\n",
+        "pkg/fixtures/deep/f.py": "", "pkg/fixtures/f.js": "",
+        "logs/run.py": "", "pkg/logs": "",                   # a *file* named logs is kept
+        "node_modules/dep/index.js": "", "build/out.py": "",
+    })
+    return tmp_path
+
+
+EXPECTED = ["a.py", "b.js", "keep.gen.py", "pkg/fixtures/f.js", "pkg/m.py", "pkg/top_only.py"]
+
+
+def test_walk_applies_prune_and_ignore_rules(repo):
+    assert _rel(repo, walk(str(repo), extensions=(".py", ".JS"))) == EXPECTED
+    everything = _rel(repo, walk(str(repo)))
+    assert "notes.txt" in everything and "pkg/logs" in everything and "pkg/.vataignore" in everything
+    unfiltered = _rel(repo, walk(str(repo), extensions=(".py", ".js"), prune=(), use_ignore_files=False))
+    assert "node_modules/dep/index.js" in unfiltered and "build/out.py" in unfiltered
+    assert "x.gen.py" in unfiltered and "pkg/fixtures/deep/f.py" in unfiltered
+
+
+def test_sequential_walk_is_sorted_depth_first(repo):
+    # a directory's files come first, then its subdirectories in name order
+    order = ["a.py", "b.js", "keep.gen.py", "pkg/m.py", "pkg/top_only.py", "pkg/fixtures/f.js"]
+    got = list(walk(str(repo), extensions=(".py", ".js")))
+    assert got == [os.path.join(str(repo), *p.split("/")) for p in order]
+
+
+def test_threaded_walk_finds_the_same_files(repo):
+    assert _rel(repo, walk(str(repo), extensions=(".py", ".js"), workers=8)) == EXPECTED
+    assert list(walk(str(repo / "a.py"))) == [str(repo / "a.py")]
+
+
+@pytest.mark.parametrize("pattern,path,is_dir,ignored", [
+    ("*.log", "a/b/c.log", False, True),
+    ("/build", "build", True, True),
+    ("/build", "src/build", True, False),
+    ("docs/*.md", "docs/a.md", False, True),
+    ("docs/*.md", "docs/x/a.md", False, False),
+    ("a/**/b", "a/b", True, True),
+    ("a/**/b", "a/x/y/b", True, True),
+    ("tmp/", "tmp", False, False),
+    ("file[0-9].py", "file7.py", False, True),
+    ("file[!0-9].py", "file7.py", False, False),
+    ("\\#hash", "#hash", False, True),
+])
+def test_ignore_patterns(pattern, path, is_dir, ignored):
+    assert is_ignored((("", parse_ignore([pattern])),), path, is_dir) is ignored
+
+
+def test_later_rules_and_nested_files_win():
+    rules = parse_ignore(["# comment", "", "*.py", "!keep.py"])
+    assert len(rules) == 2
+    assert not is_ignored((("", rules),), "src/keep.py", False)
+    nested = (("", rules), ("src", parse_ignore(["keep.py"])))
+    assert is_ignored(nested, "src/keep.py", False)
+    assert not is_ignored(nested, "keep.py", False)
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+from conftest import ROOT
+
+import vata_witness as vw
+from vata_poseidon import SNARK_FIELD, hash_words
+
+
+def test_encode_words_matches_list_layout():
+    texts = ["hi", "", "a" * 120, "naïve 😀 ok"]
+    rows = vw.encode_words(texts, 100)
+    for text, row in zip(texts, rows):
+        expected = [ord(c) for c in text.ljust(100, "\0")][:100]
+        assert row.tolist() == expected
+
+
+@pytest.fixture
+def tree():
+    # five leaves: levels 5 -> 3 -> 2 -> 1, the odd last node pairs with itself
+    levels = [["a1", "b2", "c3", "d4", "e5"], ["f6", "a7", "b8"], ["c9", "da"], ["eb"]]
+    return vw.MerkleTree(levels, [f"r{i}.json" for i in range(5)], "eb")
+
+
+def test_merkle_path_walks_to_root(tree):
+    assert tree.path(4) == [("e5", "e5"), ("b8", "b8"), ("c9", "da")]
+    assert tree.path(1) == [("a1", "b2"), ("f6", "a7"), ("c9", "da")]
+    assert tree.index_of("receipts/r3.json") == 3
+    with pytest.raises(KeyError):
+        tree.index_of("missing.json")
+    inputs = vw.merkle_inputs(tree, 4)
+    assert inputs["root"] == int("eb", 16)
+    assert inputs["path_elements"][-2:] == [[0, 0], [0, 0]]     # padded to MERKLE_LEVELS
+
+
+def test_build_witness_hashes_action(tree, tmp_path):
+    mandate = tmp_path / "charter.json"
+    mandate.write_text('{"rule": "do no harm"}')
+    w = vw.build_witness("why?", "approve", mandate_file=str(mandate), tree=tree, leaf_index=2)
+    assert w["action_hash"] == hash_words([ord(c) for c in "approve"] + [0] * 43)
+    assert 0 <= w["mandate_hash"] < 2 ** 254
+    assert len(w["prompt"]) == vw.PROMPT_WORDS and len(w["trace"]) == vw.TRACE_WORDS
+    assert w["root"] < SNARK_FIELD
+
+
+def test_prepare_batch_writes_snarkjs_inputs(tmp_path):
+    prompts = [f"prompt {i}" for i in range(5)]
+    actions = [f"action {i}" for i in range(5)]
+    mandate = os.path.join(ROOT, vw.DEFAULT_MANDATE)
+    tree_file = os.path.join(ROOT, vw.DEFAULT_TREE)
+    paths = vw.prepare_batch(prompts, actions, str(tmp_path), workers=2,
+                             mandate_file=mandate, tree_file=tree_file)
+    assert [os.path.basename(p) for p in paths] == [f"input_{i:06d}.json" for i in range(5)]
+    expected = vw.build_witnesses(prompts, actions, mandate_file=mandate, tree=vw.MerkleTree.load(tree_file))
+    for path, witness in zip(paths, expected):
+        with open(path, encoding="utf-8") as f:
+            written = json.load(f)
+        assert written["action_hash"] == str(witness["action_hash"])
+        assert written["prompt"] == [str(c) for c in witness["prompt"]]
+        assert written["path_index"] == str(witness["path_index"])
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+vata_batch_verify.py
+
+Offline batch verification of Groth16 (bn128) proofs.
+
+All proofs that share a verification key are checked with one random linear
+combination:
+
+    prod_i e(r_i·A_i, B_i) == e(alpha, beta)^(sum r_i) · e(sum r_i·L_i, gamma) · e(sum r_i·C_i, delta)
+
+That is n + 3 Miller loops and a single final exponentiation instead of
+four full pairings per proof. If a batch fails it is bisected (with fresh
+randomness) until every bad proof is isolated.
+
+Usage:
+  python vata_batch_verify.py --vkey zk/verification_key.json zk/
+  python vata_batch_verify.py --audit            # proofs/, receipts/, merkle/batches/
+
+In an audit, a receipt ties a proof to its circuit's vkey; a proof without
+one is checked against a sibling verification_key.json, else against every
+known vkey with the right number of public signals. A proof no vkey accepts
+is reported unresolved ("?") and fails the audit unless --allow-unresolved
+is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from py_ecc.optimized_bn128 import (
+    FQ,
+    FQ2,
+    FQ12,
+    Z1,
+    add,
+    b,
+    b2,
+    curve_order,
+    final_exponentiate,
+    is_inf,
+    is_on_curve,
+    multiply,
+    neg,
+    pairing,
+)
+
+BUILD_DIR = Path("build")
+AUDIT_DIRS = ("proofs", "merkle/batches", "zk")
+RECEIPT_DIR = "receipts"
+
+
+# ============================================================
+# PARSING (snarkjs JSON layout)
+# ============================================================
+def _g1(coords: Sequence[str]):
+    return (FQ(int(coords[0])), FQ(int(coords[1])), FQ(int(coords[2])))
+
+
+def _g2(coords: Sequence[Sequence[str]]):
+    return tuple(FQ2([int(c[0]), int(c[1])]) for c in coords[:3])
+
+
+@dataclass
+class VerificationKey:
+    path: str
+    alpha: tuple
+    beta: tuple
+    gamma: tuple
+    delta: tuple
+    ic: List[tuple]
+
+    @classmethod
+    def load(cls, path: str) -> "VerificationKey":
+        with open(path, "r", encoding="utf-8-sig") as f:
+            vk = json.load(f)
+        if vk.get("protocol") != "groth16":
+            raise ValueError(f"{path}: not a groth16 verification key")
+        return cls(
+            path=str(path),
+            alpha=_g1(vk["vk_alpha_1"]),
+            beta=_g2(vk["vk_beta_2"]),
+            gamma=_g2(vk["vk_gamma_2"]),
+            delta=_g2(vk["vk_delta_2"]),
+            ic=[_g1(p) for p in vk["IC"]],
+        )
+
+    @property
+    def n_public(self) -> int:
+        return len(self.ic) - 1
+
+
+@dataclass
+class ProofRecord:
+    name: str
+    proof: dict
+    public: List[str]
+    receipts: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    points: Optional[tuple] = field(default=None, repr=False)
+
+    @classmethod
+    def load(cls, proof_path: Path, public_path: Path) -> "ProofRecord":
+        with open(proof_path, "r", encoding="utf-8-sig") as f:
+            proof = json.load(f)
+        with open(public_path, "r", encoding="utf-8-sig") as f:
+            public = json.load(f)
+        return cls(name=str(proof_path), proof=proof, public=[str(x) for x in public])
+
+    def prepare(self, vk: VerificationKey) -> bool:
+        """Parse and sanity-check points; sets ``error`` on malformed input."""
+        try:
+            a = _g1(self.proof["pi_a"])
+            b_ = _g2(self.proof["pi_b"])
+            c = _g1(self.proof["pi_c"])
+            signals = [int(s) for s in self.public]
+        except (KeyError, ValueError, TypeError, IndexError) as e:
+            self.error = f"malformed proof: {e}"
+            return False
+        if len(signals) != vk.n_public:
+            self.error = f"expected {vk.n_public} public signals, got {len(signals)}"
+            return False
+        if any(s >= curve_order for s in signals):
+            self.error = "public signal outside the scalar field"
+            return False
+        if not (is_on_curve(a, b) and is_on_curve(c, b) and is_on_curve(b_, b2)):
+            self.error = "proof point not on curve"
+            return False
+        # G1 has cofactor 1, so on-curve is enough for A and C; the G2 twist
+        # does not, and B outside the order-r subgroup breaks the pairing check
+        if not is_inf(multiply(b_, curve_order)):
+            self.error = "proof point B not in the G2 subgroup"
+            return False
+        self.points = (a, b_, c, signals)
+        return True
+
+
+# ============================================================
+# BATCH CHECK
+# ============================================================
+def _batch_holds(vk: VerificationKey, records: Sequence[ProofRecord]) -> bool:
+    # a single proof needs no randomizer
+    scalars = [1] if len(records) == 1 else [secrets.randbits(128) | 1 for _ in records]
+
+    acc = FQ12.one()
+    r_sum = 0
+    c_sum = Z1
+    ic_scalars = [0] * len(vk.ic)
+    for r, rec in zip(scalars, records):
+        a, b_, c, signals = rec.points
+        acc = acc * pairing(b_, multiply(a, r), final_exponentiate=False)
+        r_sum += r
+        c_sum = add(c_sum, multiply(c, r))
+        ic_scalars[0] += r
+        for j, s in enumerate(signals, start=1):
+            ic_scalars[j] += r * s
+
+    l_sum = Z1
+    for point, k in zip(vk.ic, ic_scalars):
+        k %= curve_order
+        if k:
+            l_sum = add(l_sum, multiply(point, k))
+
+    acc = acc * pairing(vk.beta, neg(multiply(vk.alpha, r_sum % curve_order)), final_exponentiate=False)
+    acc = acc * pairing(vk.gamma, neg(l_sum), final_exponentiate=False)
+    acc = acc * pairing(vk.delta, neg(c_sum), final_exponentiate=False)
+    return final_exponentiate(acc) == FQ12.one()
+
+
+def _find_failures(vk: VerificationKey, records: List[ProofRecord]) -> List[ProofRecord]:
+    if _batch_holds(vk, records):
+        return []
+    if len(records) == 1:
+        return records
+    mid = len(records) // 2
+    return _find_failures(vk, records[:mid]) + _find_failures(vk, records[mid:])
+
+
+def batch_verify(vk: VerificationKey, records: List[ProofRecord]) -> Dict[str, bool]:
+    """Verify every record against ``vk``; returns {name: valid}."""
+    results = {}
+    ready = []
+    for rec in records:
+        if rec.prepare(vk):
+            ready.append(rec)
+        else:
+            results[rec.name] = False
+    failed = {rec.name for rec in _find_failures(vk, ready)} if ready else set()
+    for rec in ready:
+        results[rec.name] = rec.name not in failed
+        if rec.name in failed:
+            rec.error = "pairing check failed"
+    return results
+
+
+def verify_proof(vk: VerificationKey, proof: dict, public: List[str]) -> bool:
+    rec = ProofRecord(name="proof", proof=proof, public=[str(x) for x in public])
+    return batch_verify(vk, [rec])["proof"]
+
+
+# ============================================================
+# DISCOVERY
+# ============================================================
+def find_proofs(roots: Sequence[str]) -> List[ProofRecord]:
+    """Every proof*.json with a matching public*.json next to it."""
+    records = []
+    seen = set()
+    for root in roots:
+        base = Path(root)
+        candidates = [base] if base.is_file() else sorted(base.rglob("*proof*.json"))
+        for proof_path in candidates:
+            public_path = proof_path.with_name(proof_path.name.replace("proof", "public"))
+            key = proof_path.resolve()
+            if key in seen or not public_path.exists():
+                continue
+            seen.add(key)
+            records.append(ProofRecord.load(proof_path, public_path))
+    return records
+
+
+def _vkey_for_circuit(circuit: str) -> Optional[Path]:
+    path = BUILD_DIR / f"{circuit}_vkey.json"
+    return path if path.exists() else None
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def known_vkeys() -> List[VerificationKey]:
+    paths = sorted(BUILD_DIR.glob("*_vkey.json")) + [Path("zk/verification_key.json")]
+    return [VerificationKey.load(str(p)) for p in paths if p.exists()]
+
+
+def audit_groups(
+    proof_dirs: Sequence[str], receipt_dir: str
+) -> Tuple[Dict[str, List[ProofRecord]], List[ProofRecord], List[str]]:
+    """
+    Group proofs by verification key for a full re-audit.
+
+    Receipts name their circuit and the SHA-256 of their proof.json, which
+    ties each one to a vkey and a proof file; several receipts for one proof
+    are listed on its record, which is verified once. Other proofs use a
+    sibling verification_key.json. The rest are returned unresolved, for
+    resolve_unresolved() to try every known vkey with the right number of
+    public signals. Returns (groups, unresolved records, problems).
+    """
+    records: List[ProofRecord] = []
+    by_hash: Dict[str, ProofRecord] = {}
+    seen = set()
+    for rec in find_proofs(proof_dirs):     # byte-identical copies: the first directory wins
+        digest = _sha256(rec.name)
+        if (digest, tuple(rec.public)) in seen:
+            continue
+        seen.add((digest, tuple(rec.public)))
+        records.append(rec)
+        by_hash.setdefault(digest, rec)
+    groups: Dict[str, List[ProofRecord]] = {}
+    problems: List[str] = []
+    claimed: Dict[str, str] = {}            # proof name -> vkey it is grouped under
+
+    receipts = sorted(Path(receipt_dir).glob("*.json")) if Path(receipt_dir).exists() else []
+    for receipt in receipts:
+        text = receipt.read_text(encoding="utf-8-sig")
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError:
+            problems.append(f"{receipt}: unreadable receipt")
+            continue
+        if not isinstance(data, dict) or not str(data.get("version", "")).startswith("vata-receipt"):
+            continue                        # e.g. saved on-chain transaction receipts
+        proof_hash = str(data.get("proofHash", "")).lower().removeprefix("0x")
+        rec = by_hash.get(proof_hash)
+        vkey = _vkey_for_circuit(data.get("circuit", ""))
+        if rec is None or vkey is None:
+            problems.append(f"{receipt}: proof or vkey for circuit '{data.get('circuit')}' not found")
+            continue
+        signals = data.get("publicSignals", {})
+        signals = signals.get("value", signals) if isinstance(signals, dict) else signals
+        if [str(s) for s in signals] != rec.public:
+            problems.append(f"{receipt}: publicSignals differ from {rec.name}")
+        rec.receipts.append(str(receipt))
+        if rec.name in claimed:
+            if claimed[rec.name] != str(vkey):
+                problems.append(f"{receipt}: circuit differs from {rec.receipts[0]} for {rec.name}")
+            continue
+        claimed[rec.name] = str(vkey)
+        groups.setdefault(str(vkey), []).append(rec)
+
+    unresolved = []
+    for rec in records:
+        if rec.name in claimed:
+            continue
+        sibling = Path(rec.name).with_name("verification_key.json")
+        if sibling.exists():
+            groups.setdefault(str(sibling), []).append(rec)
+        else:
+            unresolved.append(rec)
+    return groups, unresolved, problems
+
+
+def resolve_unresolved(
+    records: List[ProofRecord], vkeys: Sequence[VerificationKey]
+) -> Tuple[Dict[str, List[ProofRecord]], List[ProofRecord]]:
+    """
+    Try candidate vkeys in turn, one batch per key; proofs that pass are
+    assigned to that key. Returns (accepted per vkey, rejected by all).
+    """
+    accepted: Dict[str, List[ProofRecord]] = {}
+    remaining = list(records)
+    for vk in vkeys:
+        batch = [r for r in remaining if len(r.public) == vk.n_public]
+        if not batch:
+            continue
+        results = batch_verify(vk, batch)
+        accepted[vk.path] = [r for r in batch if results[r.name]]
+        remaining = [r for r in remaining if not results.get(r.name, False)]
+    for rec in remaining:
+        rec.error = "no known verification key accepts this proof"
+    return accepted, remaining
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline batch verifier for Groth16 proofs")
+    parser.add_argument("paths", nargs="*", help="Proof files or folders (with --vkey)")
+    parser.add_argument("--vkey", help="verification_key.json shared by all proofs")
+    parser.add_argument("--audit", action="store_true", help="Re-audit proofs/, receipts/ and merkle/batches/")
+    parser.add_argument("--json", action="store_true", help="Output results as JSON")
+    parser.add_argument("--allow-unresolved", action="store_true",
+                        help="Do not fail on proofs no known vkey accepts (stale keys, unknown circuits)")
+    args = parser.parse_args()
+
+    unresolved: List[ProofRecord] = []
+    if args.audit:
+        groups, unresolved, problems = audit_groups(AUDIT_DIRS, RECEIPT_DIR)
+    elif args.vkey:
+        groups, problems = {args.vkey: find_proofs(args.paths or ["."])}, []
+    else:
+        parser.error("use --vkey with proof paths, or --audit")
+
+    report = {"groups": [], "unresolved": [], "problems": problems}
+    all_ok = not problems
+    for vkey_path, records in groups.items():
+        vk = VerificationKey.load(vkey_path)
+        t0 = time.perf_counter()
+        results = batch_verify(vk, records)
+        elapsed = time.perf_counter() - t0
+        failed = [r for r in records if not results[r.name]]
+        all_ok = all_ok and not failed
+        report["groups"].append({
+            "vkey": vkey_path,
+            "proofs": len(records),
+            "failed": [{"proof": r.name, "receipts": r.receipts, "error": r.error} for r in failed],
+            "seconds": round(elapsed, 3),
+        })
+
+    if unresolved:
+        accepted, rejected = resolve_unresolved(unresolved, known_vkeys())
+        for vkey_path, records in accepted.items():
+            if records:
+                report["groups"].append({"vkey": vkey_path, "proofs": len(records), "failed": [], "seconds": None})
+        report["unresolved"] = [{"proof": r.name, "error": r.error} for r in rejected]
+        all_ok = all_ok and (args.allow_unresolved or not rejected)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for g in report["groups"]:
+            status = "OK" if not g["failed"] else f"{len(g['failed'])} FAILED"
+            timing = f" ({g['seconds']}s)" if g["seconds"] is not None else ""
+            print(f"{g['vkey']}: {g['proofs']} proofs, {status}{timing}")
+            for f in g["failed"]:
+                print(f"  ✗ {f['proof']}: {f['error']}")
+        for f in report["unresolved"]:
+            print(f"  ? {f['proof']}: {f['error']}")
+        for p in problems:
+            print(f"  ! {p}")
+        print("ALL PASS ✅" if all_ok else "AUDIT FAILED")
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
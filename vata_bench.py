@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+vata_bench.py
+
+Benchmark harness for the soul-scoring engines.
+
+A synthetic corpus is generated from a seed (same seed, same bytes), every
+engine scores it in its own subprocess (so peak RSS is per engine and one
+engine's imports cannot skew another), and the results go to a JSON file
+that can be compared against a previous run.
+
+Engines:
+  all_in_one   all_in_one.vata_ai_soul_detection
+  scanner      scanner.compute_soul_score
+  cli          cli.compute_soul_score
+  app          app.compute_soul_score
+  simple       simple.analyze_code
+  core         src/vata/core.score_soul (heuristics only)
+  core-embed   src/vata/core.score_soul with MiniLM embeddings (opt-in)
+  humanizer    vatahumanizer.compute_soul_score
+
+Engines whose imports fail here are reported as unavailable, not fatal.
+
+Usage:
+  python vata_bench.py corpus --out .vata_bench/corpus --sizes 1k,10k,100k,1m
+  python vata_bench.py run --sizes 1k,10k,100k --engines all_in_one,simple
+  python vata_bench.py compare .vata_bench/results/OLD.json .vata_bench/results/NEW.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+SRC_DIR = ROOT / "src"
+BENCH_DIR = ROOT / ".vata_bench"
+
+DEFAULT_SIZES = "1k,10k,100k"
+DEFAULT_ENGINES = "all_in_one,scanner,cli,app,simple,core,humanizer"
+
+
+# ============================================================
+# SYNTHETIC CORPUS
+# ============================================================
+# per language: extension, line comment, function template, statement templates
+LANGUAGES: Dict[str, dict] = {
+    "python": dict(
+        ext=".py", comment="#", indent="    ",
+        func="def {name}({args}):\n{body}\n{indent}return {ret}\n",
+        stmt=["{v} = {w} * {n} + {u}", "if {v} > {n}:\n{indent}{indent}{w} = {n}",
+              "{v} = \"{s}\"", "for {v} in range({n}):\n{indent}{indent}{w} += {v}"],
+        cls="class {name}:\n    pass\n",
+    ),
+    "javascript": dict(
+        ext=".js", comment="//", indent="  ",
+        func="function {name}({args}) {{\n{body}\n{indent}return {ret};\n}}\n",
+        stmt=["let {v} = {w} * {n} + {u};", "if ({v} > {n}) {{ {w} = {n}; }}",
+              "const {v} = \"{s}\";", "for (let {v} = 0; {v} < {n}; {v}++) {{ {w} += {v}; }}"],
+        cls="class {name} {{}}\n",
+    ),
+    "typescript": dict(
+        ext=".ts", comment="//", indent="  ",
+        func="export function {name}({args}): number {{\n{body}\n{indent}return {ret};\n}}\n",
+        stmt=["let {v}: number = {w} * {n} + {u};", "if ({v} > {n}) {{ {w} = {n}; }}",
+              "const {v} = `{s}`;", "for (let {v} = 0; {v} < {n}; {v}++) {{ {w} += {v}; }}"],
+        cls="interface {name} {{ id: number }}\n",
+    ),
+    "go": dict(
+        ext=".go", comment="//", indent="\t",
+        func="func {name}({args} int) int {{\n{body}\n{indent}return {ret}\n}}\n",
+        stmt=["{v} := {w}*{n} + {u}", "if {v} > {n} {{ {w} = {n} }}",
+              "{v} := \"{s}\"", "for {v} := 0; {v} < {n}; {v}++ {{ {w} += {v} }}"],
+        cls="type {name} struct {{ id int }}\n",
+    ),
+    "rust": dict(
+        ext=".rs", comment="//", indent="    ",
+        func="fn {name}({args}: i64) -> i64 {{\n{body}\n{indent}{ret}\n}}\n",
+        stmt=["let {v} = {w} * {n} + {u};", "if {v} > {n} {{ {w} = {n}; }}",
+              "let {v} = \"{s}\";", "for {v} in 0..{n} {{ {w} += {v}; }}"],
+        cls="struct {name} {{ id: i64 }}\n",
+    ),
+    "c": dict(
+        ext=".c", comment="//", indent="    ",
+        func="int {name}(int {args}) {{\n{body}\n{indent}return {ret};\n}}\n",
+        stmt=["int {v} = {w} * {n} + {u};", "if ({v} > {n}) {{ {w} = {n}; }}",
+              "const char *{v} = \"{s}\";", "for (int {v} = 0; {v} < {n}; {v}++) {{ {w} += {v}; }}"],
+        cls="struct {name} {{ int id; }};\n",
+    ),
+    "cpp": dict(
+        ext=".cpp", comment="//", indent="    ",
+        func="int {name}(int {args}) {{\n{body}\n{indent}return {ret};\n}}\n",
+        stmt=["auto {v} = {w} * {n} + {u};", "if ({v} > {n}) {{ {w} = {n}; }}",
+              "std::string {v} = \"{s}\";", "for (int {v} = 0; {v} < {n}; ++{v}) {{ {w} += {v}; }}"],
+        cls="class {name} {{ int id; }};\n",
+    ),
+    "java": dict(
+        ext=".java", comment="//", indent="    ",
+        func="static int {name}(int {args}) {{\n{body}\n{indent}return {ret};\n}}\n",
+        stmt=["int {v} = {w} * {n} + {u};", "if ({v} > {n}) {{ {w} = {n}; }}",
+              "String {v} = \"{s}\";", "for (int {v} = 0; {v} < {n}; {v}++) {{ {w} += {v}; }}"],
+        cls="class {name} {{ int id; }}\n",
+    ),
+}
+
+_WORDS = (
+    "count total item value buffer index offset result parser token node cache "
+    "limit score weight delta retry handler config state queue batch record"
+).split()
+_NOTES = ("TODO: handle the empty case", "why does this need a second pass?",
+          "matches the legacy format", "FIXME off by one on the last chunk",
+          "cheap check first", "see the 2019 incident notes")
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _ident(rng: random.Random, terse: bool) -> str:
+    if terse:
+        return rng.choice("abcdefghijkmnpqrstxyz") + (str(rng.randrange(10)) if rng.random() < 0.3 else "")
+    a, b = rng.choice(_WORDS), rng.choice(_WORDS)
+    return f"{a}_{b}" if rng.random() < 0.5 else a + b.capitalize()
+
+
+def synth_source(language: str, size: int, rng: random.Random) -> str:
+    """Source text of roughly ``size`` bytes; terse/commented and verbose/uniform styles are mixed."""
+    spec = LANGUAGES[language]
+    terse = rng.random() < 0.5
+    indent = spec["indent"]
+    parts: List[str] = []
+    written = 0
+    i = 0
+    while written < size:
+        if rng.random() < 0.1:
+            chunk = spec["cls"].format(name=f"{_ident(rng, False).title().replace('_', '')}{i}")
+        else:
+            body = []
+            for _ in range(rng.randint(2, 8)):
+                if terse and rng.random() < 0.25:
+                    body.append(f"{indent}{spec['comment']} {rng.choice(_NOTES)}")
+                stmt = rng.choice(spec["stmt"]).format(
+                    v=_ident(rng, terse), w=_ident(rng, terse), u=_ident(rng, terse),
+                    n=rng.randrange(2, 5000) if terse else rng.choice((0, 1, 10, 100)),
+                    s=" ".join(rng.choice(_WORDS) for _ in range(3)), indent=indent,
+                )
+                body.append(indent + stmt)
+            if not terse:
+                body.insert(0, f"{indent}{spec['comment']} Process the input and return the result.")
+            chunk = spec["func"].format(
+                name=f"{_ident(rng, terse)}_{i}", args=_ident(rng, terse),
+                body="\n".join(body), indent=indent, ret=_ident(rng, terse),
+            )
+        parts.append(chunk + "\n")
+        written += len(chunk) + 1
+        i += 1
+    return "".join(parts)
+
+
+def generate_corpus(
+    out_dir: Path,
+    languages: List[str],
+    sizes: List[str],
+    files_per_cell: int = 4,
+    seed: int = 0,
+) -> dict:
+    """Write the corpus (reused if an identical one is already there); returns its manifest."""
+    out_dir = Path(out_dir)
+    params = {"seed": seed, "languages": languages, "sizes": sizes, "files_per_cell": files_per_cell}
+    manifest_path = out_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("params") == params and all((out_dir / f["path"]).exists() for f in manifest["files"]):
+            return manifest
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    files = []
+    for language in languages:
+        for label in sizes:
+            size = parse_size(label)
+            for n in range(files_per_cell):
+                # one RNG per file: adding a language or size leaves the other files unchanged
+                rng = random.Random(f"{seed}:{language}:{label}:{n}")
+                text = synth_source(language, size, rng)
+                rel = f"{language}/{label}/f{n}{LANGUAGES[language]['ext']}"
+                path = out_dir / rel
+                path.parent.mkdir(parents=True, exist_ok=True)
+                data = text.encode("utf-8")
+                path.write_bytes(data)
+                digest.update(rel.encode() + b"\0" + data)
+                files.append({"path": rel, "language": language, "size": label, "bytes": len(data)})
+
+    manifest = {"params": params, "corpus_id": digest.hexdigest()[:16], "files": files}
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+# ============================================================
+# ENGINES
+# ============================================================
+def _load_engine(name: str) -> Callable[[str, str], Any]:
+    """``fn(path, text)`` for one engine; imports happen here, inside the worker."""
+    sys.path.insert(0, str(ROOT))
+    if name == "all_in_one":
+        from all_in_one import vata_ai_soul_detection
+        return lambda path, text: vata_ai_soul_detection(text, path=path)
+    if name in ("scanner", "cli", "app"):
+        module = __import__(name)
+        return lambda path, text: module.compute_soul_score(text)
+    if name == "simple":
+        from simple import analyze_code
+        return lambda path, text: analyze_code(text)
+    if name in ("core", "core-embed"):
+        sys.path.insert(0, str(SRC_DIR))
+        from vata.core import score_soul
+        embed = name == "core-embed"
+        return lambda path, text: score_soul(text, use_embeddings=embed)
+    if name == "humanizer":
+        from vatahumanizer import compute_soul_score
+        return lambda path, text: compute_soul_score(path)     # reads the file itself
+    raise KeyError(f"Unknown engine: {name}")
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:     # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _stats(latencies: List[float], nbytes: int) -> Dict[str, Any]:
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    q = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        "files": len(ordered),
+        "bytes": nbytes,
+        "seconds": round(total, 4),
+        "files_per_s": round(len(ordered) / total, 2) if total else None,
+        "mb_per_s": round(nbytes / 1e6 / total, 3) if total else None,
+        "p50_ms": round(q[49] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+    }
+
+
+def run_engine(name: str, corpus_dir: Path) -> dict:
+    """Score every corpus file with one engine (call in a fresh process)."""
+    from vata_fileio import read_text
+
+    corpus_dir = Path(corpus_dir)
+    manifest = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))
+    try:
+        fn = _load_engine(name)
+    except Exception as e:
+        return {"engine": name, "status": "unavailable", "reason": f"{type(e).__name__}: {e}"}
+    import_rss = _peak_rss_mb()
+
+    files = manifest["files"]
+    first = corpus_dir / files[0]["path"]
+    fn(str(first), read_text(first))       # warm-up: lazy regex compiles, caches
+
+    latencies: List[Tuple[dict, float]] = []
+    errors = 0
+    for entry in files:
+        path = str(corpus_dir / entry["path"])
+        t0 = time.perf_counter()
+        try:
+            fn(path, read_text(path))
+        except Exception:
+            errors += 1
+        latencies.append((entry, time.perf_counter() - t0))
+
+    def group(key: str) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for label in dict.fromkeys(e[key] for e, _ in latencies):
+            picked = [(e, t) for e, t in latencies if e[key] == label]
+            out[label] = _stats([t for _, t in picked], sum(e["bytes"] for e, _ in picked))
+        return out
+
+    return {
+        "engine": name,
+        "status": "ok",
+        "errors": errors,
+        "overall": _stats([t for _, t in latencies], sum(e["bytes"] for e, _ in latencies)),
+        "by_size": group("size"),
+        "by_language": group("language"),
+        "import_rss_mb": import_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _spawn(name: str, corpus_dir: Path, timeout: float) -> dict:
+    # results go through a file: several engines print on import
+    fd, out = tempfile.mkstemp(suffix=".json", prefix="vata-bench-")
+    os.close(fd)
+    try:
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "_worker", name, str(corpus_dir), out],
+            cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout,
+        )
+        if proc.returncode != 0 or not os.path.getsize(out):
+            tail = (proc.stderr or "").strip().splitlines()[-1:] or [f"exit {proc.returncode}"]
+            return {"engine": name, "status": "failed", "reason": tail[0]}
+        with open(out, encoding="utf-8") as f:
+            return json.load(f)
+    except subprocess.TimeoutExpired:
+        return {"engine": name, "status": "timeout", "reason": f"exceeded {timeout}s"}
+    finally:
+        os.unlink(out)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    engines: List[str],
+    corpus_dir: Path,
+    languages: List[str],
+    sizes: List[str],
+    files_per_cell: int = 4,
+    seed: int = 0,
+    timeout: float = 900.0,
+) -> dict:
+    manifest = generate_corpus(corpus_dir, languages, sizes, files_per_cell, seed)
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {"id": manifest["corpus_id"], **manifest["params"]},
+        "engines": {name: _spawn(name, corpus_dir, timeout) for name in engines},
+    }
+
+
+# ============================================================
+# REPORTING
+# ============================================================
+def format_results(results: dict) -> str:
+    lines = [f"commit {results.get('commit')}  corpus {results['corpus']['id']}  python {results['python']}"]
+    lines.append(f"{'engine':<12} {'files/s':>9} {'MB/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+    for name, r in results["engines"].items():
+        if r["status"] != "ok":
+            lines.append(f"{name:<12} {r['status']}: {r.get('reason')}")
+            continue
+        o = r["overall"]
+        lines.append(
+            f"{name:<12} {o['files_per_s'] or 0:>9.1f} {o['mb_per_s'] or 0:>8.2f} "
+            f"{o['p50_ms']:>9.2f} {o['p99_ms']:>9.2f} {r['peak_rss_mb'] or 0:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(old: dict, new: dict, threshold: float = 0.10) -> Tuple[str, List[str]]:
+    """Table of old -> new per engine, plus the engines that regressed by more than ``threshold``."""
+    if old["corpus"]["id"] != new["corpus"]["id"]:
+        note = "warning: different corpora, numbers are not directly comparable"
+    else:
+        note = f"corpus {new['corpus']['id']}"
+    lines = [f"{old.get('commit')} -> {new.get('commit')}  ({note})"]
+    regressions = []
+    for name, n in new["engines"].items():
+        o = old["engines"].get(name)
+        if not o or o["status"] != "ok" or n["status"] != "ok":
+            continue
+        of, nf = o["overall"]["files_per_s"] or 0, n["overall"]["files_per_s"] or 0
+        op, np_ = o["overall"]["p99_ms"], n["overall"]["p99_ms"]
+        tput = (nf - of) / of if of else 0.0
+        tail = (np_ - op) / op if op else 0.0
+        flag = ""
+        if tput < -threshold or tail > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:<12} files/s {of:>9.1f} -> {nf:>9.1f} ({tput:+.1%})  "
+                     f"p99 {op:>8.2f} -> {np_:>8.2f} ms ({tail:+.1%}){flag}")
+    return "\n".join(lines), regressions
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _csv(text: str) -> List[str]:
+    return [t.strip() for t in text.split(",") if t.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VATA scoring engine benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def corpus_args(p):
+        p.add_argument("--corpus", default=str(BENCH_DIR / "corpus"), help="Corpus directory")
+        p.add_argument("--languages", default=",".join(LANGUAGES))
+        p.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated file sizes, e.g. 1k,10k,1m")
+        p.add_argument("--files", type=int, default=4, help="Files per language and size")
+        p.add_argument("--seed", type=int, default=0)
+
+    p_corpus = sub.add_parser("corpus", help="Generate the synthetic corpus only")
+    corpus_args(p_corpus)
+
+    p_run = sub.add_parser("run", help="Benchmark engines and save results")
+    corpus_args(p_run)
+    p_run.add_argument("--engines", default=DEFAULT_ENGINES)
+    p_run.add_argument("--out", default=None, help="Results file (default .vata_bench/results/<commit>-<time>.json)")
+    p_run.add_argument("--timeout", type=float, default=900.0, help="Seconds per engine")
+
+    p_cmp = sub.add_parser("compare", help="Compare two results files")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+
+    p_worker = sub.add_parser("_worker")
+    p_worker.add_argument("engine")
+    p_worker.add_argument("corpus")
+    p_worker.add_argument("out")
+
+    args = parser.parse_args()
+
+    if args.command == "_worker":
+        result = run_engine(args.engine, Path(args.corpus))
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return
+
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        table, regressions = compare(old, new, args.threshold)
+        print(table)
+        sys.exit(1 if regressions else 0)
+
+    languages = _csv(args.languages)
+    unknown = [l for l in languages if l not in LANGUAGES]
+    if unknown:
+        parser.error(f"unknown languages: {', '.join(unknown)}")
+    sizes = _csv(args.sizes)
+
+    if args.command == "corpus":
+        manifest = generate_corpus(Path(args.corpus), languages, sizes, args.files, args.seed)
+        total = sum(f["bytes"] for f in manifest["files"])
+        print(f"corpus {manifest['corpus_id']}: {len(manifest['files'])} files, {total / 1e6:.2f} MB -> {args.corpus}")
+        return
+
+    results = run_benchmarks(_csv(args.engines), Path(args.corpus), languages, sizes,
+                             args.files, args.seed, args.timeout)
+    out = Path(args.out) if args.out else (
+        BENCH_DIR / "results" / f"{results['commit'] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(format_results(results))
+    print(f"\nSaved -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+vata_checkpoint.py
+
+Crash-safe progress journal for long batch scans.
+
+The journal is a JSON-lines file next to the scan output
+(``vata-scan-<ts>.csv.checkpoint``): a header line with the scan settings,
+then one line per finished file (its result row, or its error). Lines are
+buffered and appended every ``every_files`` files / ``every_seconds``
+seconds, then fsync'd, so a crash loses at most one interval. The journal is
+both the list of completed paths and the partial results: a resumed scan
+replays its rows into the output and skips those paths. A torn last line
+(crash mid-write) is cut off on load. The journal is deleted once the scan
+output has been written.
+
+  ckpt = Checkpoint.create("out.csv.checkpoint", {"input": root, ...})
+  ckpt.record(path, row=row); ckpt.maybe_commit()
+  ...
+  ckpt = Checkpoint.load(find_checkpoint("vata_results", root))
+  skip = ckpt.done
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+SUFFIX = ".checkpoint"
+VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, path: str, meta: Dict[str, Any], every_files: int = 500, every_seconds: float = 30.0):
+        self.path = path
+        self.meta = meta
+        self.every_files = max(1, every_files)
+        self.every_seconds = every_seconds
+        self.done: Set[str] = set()
+        self._pending: List[str] = []
+        self._last = time.monotonic()
+
+    # ---- creation / loading ----
+    @classmethod
+    def create(cls, path: str, meta: Dict[str, Any], **kwargs) -> "Checkpoint":
+        ckpt = cls(path, meta, **kwargs)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"checkpoint": VERSION, **meta}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return ckpt
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "Checkpoint":
+        """Open an existing journal for appending; fills ``done`` from it."""
+        with open(path, "rb") as f:
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):                     # torn write: drop the partial line
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        lines = data[:end].decode("utf-8").splitlines()
+        if not lines:
+            raise ValueError(f"empty checkpoint: {path}")
+        header = json.loads(lines[0])
+        if header.pop("checkpoint", None) != VERSION:
+            raise ValueError(f"not a VATA checkpoint: {path}")
+        ckpt = cls(path, header, **kwargs)
+        for path_, _, _ in ckpt.entries():
+            ckpt.done.add(path_)
+        return ckpt
+
+    def entries(self) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """(path, row, error) for every committed file, in journal order."""
+        with open(self.path, encoding="utf-8") as f:
+            next(f, None)
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                entry = json.loads(line)
+                yield entry["path"], entry.get("row"), entry.get("error")
+
+    # ---- recording ----
+    def record(self, path: str, row: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        entry: Dict[str, Any] = {"path": path}
+        if row is not None:
+            entry["row"] = row
+        if error is not None:
+            entry["error"] = error
+        self._pending.append(json.dumps(entry, default=str))
+        self.done.add(path)
+
+    def due(self) -> bool:
+        return len(self._pending) >= self.every_files or (
+            bool(self._pending) and time.monotonic() - self._last >= self.every_seconds
+        )
+
+    def maybe_commit(self) -> bool:
+        if self.due():
+            self.commit()
+            return True
+        return False
+
+    def commit(self) -> None:
+        """Append buffered entries and fsync."""
+        self._last = time.monotonic()
+        if not self._pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(self._pending) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending = []
+
+    def finish(self) -> None:
+        """The scan output is complete: the journal is no longer needed."""
+        self._pending = []
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def find_checkpoint(output_dir: str, input_path: Optional[str] = None) -> Optional[str]:
+    """Newest journal in ``output_dir`` (for ``input_path`` if given)."""
+    for path in sorted(glob.glob(os.path.join(glob.escape(str(output_dir)), f"vata-scan-*{SUFFIX}")), reverse=True):
+        if input_path is None:
+            return path
+        try:
+            with open(path, encoding="utf-8") as f:
+                header = json.loads(f.readline())
+        except (OSError, ValueError):
+            continue
+        if header.get("input") == str(input_path):
+            return path
+    return None
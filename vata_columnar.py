@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+vata_columnar.py
+
+Streaming columnar output for scan results (Parquet or Arrow IPC).
+
+Rows are buffered column-wise and flushed as one row group every
+``row_group_size`` rows, so memory stays bounded however long the scan runs
+and the finished file can be read back a few columns (or row groups) at a
+time. Requires pyarrow; it is imported on first use so CSV-only scans do not
+need it.
+
+  with ColumnarWriter("scan.parquet", SCAN_COLUMNS, compression="zstd") as w:
+      for row in rows:
+          w.write(row)
+
+The format follows the extension (.parquet; .arrow/.feather/.ipc) unless
+``format`` is given. Keys not in the schema are ignored; missing keys are null.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_ROW_GROUP = 64 * 1024
+COMPRESSIONS = ("zstd", "snappy", "gzip", "brotli", "lz4", "none")
+ARROW_COMPRESSIONS = ("zstd", "lz4", "none")
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+# (name, arrow type name); kept as plain tuples so importing this module does not need pyarrow
+DIMENSIONS = ("structure", "style", "semantics", "risk")
+SCAN_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("full_path", "string"),
+    ("filename", "string"),
+    ("content_hash", "string"),
+    ("ai_probability", "float64"),
+    ("verdict", "string"),
+    ("soul_score", "int32"),
+    ("confidence", "float64"),
+    ("language", "string"),
+    *((d, "int32") for d in DIMENSIONS),
+    ("guard_status", "string"),
+    ("guard_reason", "string"),
+    ("scored_bytes", "int64"),
+    ("ci_low", "int32"),
+    ("ci_high", "int32"),
+    ("elapsed_ms", "float64"),
+    ("scan_time", "string"),
+)
+ANALYZE_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("path", "string"),
+    ("soul_score", "int32"),
+    *((d, "int32") for d in DIMENSIONS),
+    ("bytes", "int64"),
+    ("elapsed_ms", "float64"),
+    ("persona", "string"),
+    ("timestamp", "string"),
+)
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def schema(columns: Sequence[Tuple[str, str]]):
+    pa = require_pyarrow()
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+
+
+def format_for(path: str) -> Optional[str]:
+    return FORMATS.get(os.path.splitext(str(path))[1].lower())
+
+
+class ColumnarWriter:
+    def __init__(
+        self,
+        path: str,
+        columns: Sequence[Tuple[str, str]] = SCAN_COLUMNS,
+        format: Optional[str] = None,
+        compression: str = "zstd",
+        row_group_size: int = DEFAULT_ROW_GROUP,
+    ):
+        self.path = str(path)
+        self.format = format or format_for(self.path)
+        if self.format is None:
+            raise ValueError(f"Cannot tell the format of {self.path}: use one of {', '.join(FORMATS)}")
+        if self.format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown columnar format: {self.format}")
+        allowed = COMPRESSIONS if self.format == "parquet" else ARROW_COMPRESSIONS
+        if compression not in allowed:
+            raise ValueError(f"{self.format} compression must be one of {', '.join(allowed)}")
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be >= 1")
+        self._pa = require_pyarrow()
+        self.schema = schema(columns)
+        self.compression = None if compression == "none" else compression
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._names = self.schema.names
+        self._buffer: Dict[str, List[Any]] = {n: [] for n in self._names}
+        self._pending = 0
+        self._writer = None
+
+    def _open(self):
+        pa = self._pa
+        if self.format == "parquet":
+            return pa.parquet.ParquetWriter(self.path, self.schema, compression=self.compression or "none")
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(self.path, self.schema, options=options)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        for name in self._names:
+            self._buffer[name].append(row.get(name))
+        self._pending += 1
+        if self._pending >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group (Parquet) / record batch (Arrow)."""
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._writer = self._open()
+        table = self._pa.Table.from_pydict(self._buffer, schema=self.schema)
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=self._pending)
+        else:
+            self._writer.write_table(table, max_chunksize=self._pending)
+        self.rows += self._pending
+        self._buffer = {n: [] for n in self._names}
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:            # no rows: still leave a readable, empty file
+            self._writer = self._open()
+        self._writer.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_columns(path: str, columns: Optional[Sequence[str]] = None, format: Optional[str] = None):
+    """Read only ``columns`` back as a pyarrow Table."""
+    pa = require_pyarrow()
+    fmt = format or format_for(path) or "parquet"
+    if fmt == "parquet":
+        return pa.parquet.read_table(path, columns=list(columns) if columns else None)
+    # memory-mapped: unselected columns are never read
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return table.select(list(columns)) if columns else table
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+vata_diff.py
+
+Streaming diff of two batch_scan result sets.
+
+Both sides are sorted by path with an external merge sort: record batches
+are collected into runs of ``chunk_rows`` rows, each run is sorted and
+spilled to a temporary Arrow file, and the runs are k-way merged. The two
+sorted streams are then merge-joined, so memory is bounded by the run size
+whatever the scan size. Only differences are emitted:
+
+  added     path only in the new scan
+  removed   path only in the old scan
+  changed   verdict differs, or |ai_probability delta| > min_delta
+
+Changed rows carry score deltas and whether the file content changed (by
+``content_hash``; unknown when either scan lacks it), which separates edited
+files from files whose score moved because the scorer did.
+
+Usage:
+  python vata_diff.py OLD NEW                      # result files, or scan ids / prev / latest
+  python vata_diff.py prev latest --min-delta 0.05 --out diff.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from vata_columnar import ColumnarWriter, require_pyarrow
+from vata_query import DEFAULT_RESULTS, Predicate, discover, open_dataset
+
+DEFAULT_CHUNK_ROWS = 250_000
+KEY_COLUMNS = ("full_path", "content_hash", "verdict", "ai_probability", "soul_score")
+DIFF_COLUMNS = (
+    ("status", "string"),
+    ("full_path", "string"),
+    ("content_changed", "bool_"),
+    ("old_verdict", "string"),
+    ("new_verdict", "string"),
+    ("old_ai_probability", "float64"),
+    ("new_ai_probability", "float64"),
+    ("ai_probability_delta", "float64"),
+    ("old_soul_score", "float64"),
+    ("new_soul_score", "float64"),
+    ("soul_score_delta", "float64"),
+)
+
+Row = Tuple[Optional[str], Optional[str], Optional[str], Optional[float], Optional[float]]
+
+
+# ============================================================
+# EXTERNAL SORT
+# ============================================================
+def _run_schema():
+    pa = require_pyarrow()
+    return pa.schema([
+        ("full_path", pa.string()), ("content_hash", pa.string()), ("verdict", pa.string()),
+        ("ai_probability", pa.float64()), ("soul_score", pa.float64()),
+    ])
+
+
+def _spill(batches: list, schema, tmpdir: str, n: int) -> str:
+    pa = require_pyarrow()
+    table = pa.Table.from_batches(batches, schema=schema).sort_by([("full_path", "ascending")])
+    path = os.path.join(tmpdir, f"run-{n:05d}.arrow")
+    with pa.ipc.new_file(path, schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def sorted_runs(
+    path: str, tmpdir: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, where: Optional[Predicate] = None
+) -> List[str]:
+    """
+    Spill ``path`` as path-sorted Arrow runs of ~chunk_rows rows (rows without
+    a path, or not matching ``where``, are dropped).
+    """
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+
+    schema = _run_schema()
+    dataset = open_dataset(path)
+    present = [c for c in KEY_COLUMNS if c in dataset.schema.names]
+    if "full_path" not in present:
+        raise ValueError(f"{path}: no full_path column")
+
+    expr = where.expression(dataset.schema.names) if where else None
+    runs, pending, rows = [], [], 0
+    for batch in dataset.to_batches(columns=present, filter=expr):
+        # older scans lack content_hash: fill with nulls so every run has one schema
+        arrays = [
+            batch.column(present.index(f.name)).cast(f.type) if f.name in present else pa.nulls(batch.num_rows, f.type)
+            for f in schema
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+        batch = batch.filter(pc.is_valid(batch.column(0)))
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= chunk_rows:
+            runs.append(_spill(pending, schema, tmpdir, len(runs)))
+            pending, rows = [], 0
+    if pending or not runs:
+        runs.append(_spill(pending, schema, tmpdir, len(runs)))
+    return runs
+
+
+def _iter_run(path: str) -> Iterator[Row]:
+    pa = require_pyarrow()
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        yield from zip(*(batch.column(j).to_pylist() for j in range(batch.num_columns)))
+
+
+def iter_sorted(
+    path: str, tmpdir: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, where: Optional[Predicate] = None
+) -> Iterator[Row]:
+    """Rows of ``path`` (matching ``where``) in full_path order (k-way merge of the sorted runs)."""
+    runs = sorted_runs(path, tmpdir, chunk_rows, where)
+    return heapq.merge(*(_iter_run(r) for r in runs), key=lambda row: row[0])
+
+
+# ============================================================
+# MERGE JOIN
+# ============================================================
+def _delta(new: Optional[float], old: Optional[float]) -> Optional[float]:
+    return None if new is None or old is None else round(new - old, 6)
+
+
+def diff_rows(old: Iterator[Row], new: Iterator[Row], min_delta: float = 0.0) -> Iterator[Dict[str, Any]]:
+    """Merge-join two path-sorted row streams, yielding only added/removed/changed rows."""
+    o, n = next(old, None), next(new, None)
+    while o is not None or n is not None:
+        if n is None or (o is not None and o[0] < n[0]):
+            yield _row("removed", o, None)
+            o = next(old, None)
+        elif o is None or n[0] < o[0]:
+            yield _row("added", None, n)
+            n = next(new, None)
+        else:
+            delta = _delta(n[3], o[3])
+            if o[2] != n[2] or (delta is not None and abs(delta) > min_delta) or ((o[3] is None) != (n[3] is None)):
+                yield _row("changed", o, n)
+            o, n = next(old, None), next(new, None)
+
+
+def _row(status: str, o: Optional[Row], n: Optional[Row]) -> Dict[str, Any]:
+    content_changed = None
+    if o is not None and n is not None and o[1] is not None and n[1] is not None:
+        content_changed = o[1] != n[1]
+    return {
+        "status": status,
+        "full_path": (n or o)[0],
+        "content_changed": content_changed,
+        "old_verdict": o[2] if o else None,
+        "new_verdict": n[2] if n else None,
+        "old_ai_probability": o[3] if o else None,
+        "new_ai_probability": n[3] if n else None,
+        "ai_probability_delta": _delta(n[3], o[3]) if o and n else None,
+        "old_soul_score": o[4] if o else None,
+        "new_soul_score": n[4] if n else None,
+        "soul_score_delta": _delta(n[4], o[4]) if o and n else None,
+    }
+
+
+def diff_scans(
+    old_path: str,
+    new_path: str,
+    min_delta: float = 0.0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[Dict[str, Any]]:
+    """Stream the differences between two result files (spill files are removed when done)."""
+    with tempfile.TemporaryDirectory(prefix="vata-diff-") as tmpdir:
+        old_dir, new_dir = os.path.join(tmpdir, "old"), os.path.join(tmpdir, "new")
+        os.mkdir(old_dir)
+        os.mkdir(new_dir)
+        old = iter_sorted(old_path, old_dir, chunk_rows)
+        new = iter_sorted(new_path, new_dir, chunk_rows)
+        yield from diff_rows(old, new, min_delta)
+
+
+# ============================================================
+# CLI
+# ============================================================
+def resolve(ref: str, results_dir: str = DEFAULT_RESULTS) -> str:
+    """A result file path as given, or a scan id / "latest" / "prev" in ``results_dir``."""
+    if os.path.isfile(ref):
+        return ref
+    scans = discover(results_dir)
+    if ref in ("latest", "prev"):
+        need = 1 if ref == "latest" else 2
+        if len(scans) < need:
+            raise ValueError(f"fewer than {need} scans in {results_dir}")
+        return scans[-need].path
+    for scan in scans:
+        if scan.id == ref:
+            return scan.path
+    raise ValueError(f"no result file or scan id: {ref}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff two VATA batch_scan result sets")
+    parser.add_argument("old", help="Older result file, scan id, or 'prev'")
+    parser.add_argument("new", help="Newer result file, scan id, or 'latest'")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Directory for scan ids / prev / latest")
+    parser.add_argument("--min-delta", type=float, default=0.0,
+                        help="Ignore ai_probability moves up to this size when the verdict is unchanged")
+    parser.add_argument("--out", default=None, help="Write the diff to .parquet/.arrow instead of JSON lines")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per sorted run (memory bound)")
+    args = parser.parse_args()
+
+    try:
+        require_pyarrow()
+        old, new = resolve(args.old, args.results), resolve(args.new, args.results)
+        writer = ColumnarWriter(args.out, DIFF_COLUMNS) if args.out else None
+    except (RuntimeError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(2)
+
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    try:
+        for row in diff_scans(old, new, args.min_delta, args.chunk_rows):
+            counts[row["status"]] += 1
+            if writer is not None:
+                writer.write(row)
+            else:
+                sys.stdout.write(json.dumps(row) + "\n")
+    finally:
+        if writer is not None:
+            writer.close()
+    summary = ", ".join(f"{v} {k}" for k, v in counts.items())
+    print(f"{os.path.basename(old)} → {os.path.basename(new)}: {summary}", file=sys.stderr)
+    sys.exit(1 if any(counts.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
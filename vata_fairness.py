@@ -1,12 +1,282 @@
-from sklearn.metrics import confusion_matrix
+import json
+import warnings
+
 import numpy as np
 
-def prove_fairness(y_true, y_pred, sensitive_groups):
+# ============================================================
+# GROUP ENCODING
+# ============================================================
+def encode_groups(*columns):
+    """
+    Map one or more sensitive-attribute columns to dense integer group ids.
+
+    Several columns give intersectional groups (e.g. gender x age band).
+    Returns (group_ids, labels) where labels[g] is the tuple of attribute
+    values for group g.
+    """
+    if not columns:
+        raise ValueError("need at least one attribute column")
+    codes, uniques = [], []
+    for col in columns:
+        col = np.asarray(col)
+        if col.dtype.kind in "iub" and col.size:
+            # small integer codes: offset instead of sorting
+            lo, hi = int(col.min()), int(col.max())
+            if hi - lo < 1 << 20:
+                codes.append(col.astype(np.int64) - lo)
+                uniques.append(np.arange(lo, hi + 1))
+                continue
+        u, inv = np.unique(col, return_inverse=True)
+        uniques.append(u)
+        codes.append(inv.astype(np.int64).ravel())
+    shape = [len(u) for u in uniques]
+    combined = np.ravel_multi_index(codes, shape)
+    if np.prod(shape, dtype=np.float64) <= 1 << 26:
+        # dense cell space: presence table + cumsum, O(N)
+        present = np.bincount(combined, minlength=int(np.prod(shape))) > 0
+        cells = np.flatnonzero(present)
+        remap = np.cumsum(present) - 1
+        group_ids = remap[combined]
+    else:
+        cells, group_ids = np.unique(combined, return_inverse=True)
+    parts = np.unravel_index(cells, shape)
+    labels = [tuple(u[p[i]].item() for u, p in zip(uniques, parts)) for i in range(len(cells))]
+    return group_ids, labels
+
+
+# ============================================================
+# GROUPED RATES (one bincount pass per statistic)
+# ============================================================
+def _binary(values, name):
+    values = np.asarray(values)
+    if not ((values == 0) | (values == 1)).all():
+        raise ValueError(f"{name} must contain only 0/1 labels")
+    return values.astype(np.int64)
+
+
+def _n_groups(group_ids, n_groups):
+    if n_groups:
+        return n_groups
+    return int(group_ids.max()) + 1 if group_ids.size else 0
+
+
+def _cell_counts(y_true, y_pred, group_ids, n_groups):
+    """Counts per (group, y_true, y_pred) cell, shape (n_groups, 4): TN, FP, FN, TP."""
+    # anything else would land in a neighbouring group's cells
+    cell = group_ids * 4 + _binary(y_true, "y_true") * 2 + _binary(y_pred, "y_pred")
+    return np.bincount(cell, minlength=n_groups * 4).reshape(n_groups, 4)
+
+
+def _rates_from_cells(cells):
+    """Selection rate, TPR and FPR from (..., n_groups, 4) cell counts."""
+    tn, fp, fn, tp = cells[..., 0], cells[..., 1], cells[..., 2], cells[..., 3]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        selection = (tp + fp) / (tn + fp + fn + tp)
+        tpr = tp / (tp + fn)
+        fpr = fp / (fp + tn)
+    return selection, tpr, fpr
+
+
+def _gap(rates, axis=-1):
+    """max - min over groups, ignoring groups where the rate is undefined."""
+    if rates.shape[axis] == 0:
+        return np.full(np.delete(rates.shape, axis), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices
+        return np.nanmax(rates, axis=axis) - np.nanmin(rates, axis=axis)
+
+
+def group_rates(y_pred, group_ids, n_groups=None):
+    """Mean prediction per group in a single bincount pass."""
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    n_groups = _n_groups(group_ids, n_groups)
+    counts = np.bincount(group_ids, minlength=n_groups)
+    sums = np.bincount(group_ids, weights=np.asarray(y_pred, dtype=np.float64), minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts, counts
+
+
+def fairness_report(y_true, y_pred, group_ids, n_groups=None, n_boot=0, alpha=0.05, seed=None):
+    """
+    Demographic parity, equal opportunity and equalized odds gaps for binary
+    predictions over integer group ids.
+
+    With ``n_boot`` > 0 every gap gets a (1 - alpha) percentile bootstrap
+    interval. Resampling rows with replacement is the same as drawing
+    multinomial counts over the (group, y_true, y_pred) cells, so all
+    resamples are drawn at once from the cell table and cost
+    O(n_boot * n_groups), independent of the number of predictions.
+    """
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    n_groups = _n_groups(group_ids, n_groups)
+    cells = _cell_counts(y_true, y_pred, group_ids, n_groups)
+    return _summarize(cells, n_boot=n_boot, alpha=alpha, seed=seed)
+
+
+def _summarize(cells, n_boot=0, alpha=0.05, seed=None):
+    n_groups = cells.shape[0]
+    selection, tpr, fpr = _rates_from_cells(cells)
+
+    gaps = {
+        "demographic_parity": _gap(selection),
+        "equal_opportunity": _gap(tpr),
+        "equalized_odds": np.fmax(_gap(tpr), _gap(fpr)),
+    }
+    report = {
+        "groups": n_groups,
+        "counts": cells.sum(axis=1),
+        "selection_rate": selection,
+        "tpr": tpr,
+        "fpr": fpr,
+        "gaps": {k: float(v) for k, v in gaps.items()},
+    }
+
+    if n_boot and not cells.any():
+        report["ci"] = {k: (float("nan"), float("nan")) for k in gaps}
+    elif n_boot:
+        rng = np.random.default_rng(seed)
+        total = int(cells.sum())
+        boot = rng.multinomial(total, (cells / total).ravel(), size=n_boot).reshape(n_boot, n_groups, 4)
+        b_sel, b_tpr, b_fpr = _rates_from_cells(boot)
+        samples = {
+            "demographic_parity": _gap(b_sel),
+            "equal_opportunity": _gap(b_tpr),
+            "equalized_odds": np.fmax(_gap(b_tpr), _gap(b_fpr)),
+        }
+        q = [100 * alpha / 2, 100 * (1 - alpha / 2)]
+        report["ci"] = {
+            k: tuple(float(x) for x in np.nanpercentile(v, q)) for k, v in samples.items()
+        }
+    return report
+
+
+# ============================================================
+# STREAMING ACCUMULATOR
+# ============================================================
+class FairnessAccumulator:
+    """
+    Running per-group confusion counts for prediction logs too large to
+    hold in memory.
+
+    Feed it chunks (arrays or dict records), read parity/disparity at any
+    time with report(), and combine shards with merge(); to_dict()/
+    from_dict() make the state portable between processes. Memory is
+    O(groups), independent of how many predictions have been seen.
+    """
+
+    def __init__(self, group_keys=("group",), true_key="y_true", pred_key="y_pred"):
+        self.group_keys = tuple(group_keys)
+        self.true_key = true_key
+        self.pred_key = pred_key
+        self.labels = []        # group id -> label tuple
+        self._ids = {}          # label tuple -> group id
+        self.cells = np.zeros((0, 4), dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.cells.sum())
+
+    def _grow(self, n_groups):
+        if n_groups > self.cells.shape[0]:
+            grown = np.zeros((max(n_groups, 2 * self.cells.shape[0]), 4), dtype=np.int64)
+            grown[:self.cells.shape[0]] = self.cells
+            self.cells = grown
+
+    def group_id(self, label):
+        gid = self._ids.get(label)
+        if gid is None:
+            gid = self._ids[label] = len(self.labels)
+            self.labels.append(label)
+        return gid
+
+    def update(self, y_true, y_pred, group_ids):
+        """Add a chunk given as arrays with ids from group_id()."""
+        group_ids = np.asarray(group_ids, dtype=np.int64)
+        if group_ids.size == 0:
+            return self
+        n_groups = max(len(self.labels), int(group_ids.max()) + 1)
+        self._grow(n_groups)
+        self.cells[:n_groups] += _cell_counts(y_true, y_pred, group_ids, n_groups)
+        return self
+
+    def update_records(self, records):
+        """Add a chunk of dict records (e.g. parsed JSONL lines)."""
+        ids, y_true, y_pred = [], [], []
+        for rec in records:
+            ids.append(self.group_id(tuple(rec[k] for k in self.group_keys)))
+            y_true.append(int(rec[self.true_key]))
+            y_pred.append(int(rec[self.pred_key]))
+        return self.update(y_true, y_pred, ids)
+
+    def consume_jsonl(self, path, chunk_size=100_000):
+        """Stream a JSONL prediction log in fixed-size chunks."""
+        chunk = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                chunk.append(json.loads(line))
+                if len(chunk) >= chunk_size:
+                    self.update_records(chunk)
+                    chunk = []
+        if chunk:
+            self.update_records(chunk)
+        return self
+
+    def merge(self, other):
+        """Fold another shard's counts into this one (labels are re-mapped)."""
+        if not other.labels:
+            return self
+        remap = np.array([self.group_id(label) for label in other.labels], dtype=np.int64)
+        self._grow(len(self.labels))
+        np.add.at(self.cells, remap, other.cells[:len(other.labels)])
+        return self
+
+    def report(self, n_boot=0, alpha=0.05, seed=None, threshold=0.1):
+        """Current gaps; ``fair`` is demographic parity below ``threshold``."""
+        report = _summarize(self.cells[:len(self.labels)], n_boot=n_boot, alpha=alpha, seed=seed)
+        report["labels"] = list(self.labels)
+        report["fair"] = report["gaps"]["demographic_parity"] < threshold
+        return report
+
+    def to_dict(self):
+        return {
+            "group_keys": list(self.group_keys),
+            "true_key": self.true_key,
+            "pred_key": self.pred_key,
+            "labels": [list(label) for label in self.labels],
+            "cells": self.cells[:len(self.labels)].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        acc = cls(data["group_keys"], data["true_key"], data["pred_key"])
+        for label in data["labels"]:
+            acc.group_id(tuple(label))
+        acc.cells = np.array(data["cells"], dtype=np.int64).reshape(-1, 4)
+        return acc
+
+
+# ============================================================
+# ZK-FACING CHECK
+# ============================================================
+def prove_fairness(y_true, y_pred, sensitive_groups, threshold=0.1):
     # Demographic parity check — ZK circuit coming soon
-    rates = {}
-    for group in sensitive_groups:
-        mask = sensitive_groups[group]
-        rates[group] = np.mean(y_pred[mask])
-    
-    disparity = max(rates.values()) - min(rates.values())
-    return disparity < 0.1, rates, disparity
\ No newline at end of file
+    # Each group is a boolean mask or an index array into y_pred (groups may
+    # overlap); all group means come from one bincount over the selected rows.
+    names = list(sensitive_groups)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    members = []
+    for g in names:
+        sel = np.asarray(sensitive_groups[g])
+        members.append(np.flatnonzero(sel) if sel.dtype == bool else sel.astype(np.int64).ravel())
+    sizes = np.array([len(m) for m in members], dtype=np.int64)
+    owner = np.repeat(np.arange(len(names)), sizes)
+    rows = np.concatenate(members) if members else np.zeros(0, dtype=np.int64)
+    sums = np.bincount(owner, weights=y_pred[rows], minlength=len(names))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / sizes
+    rates = dict(zip(names, means.tolist()))
+
+    disparity = float(_gap(means))
+    return disparity < threshold, rates, disparity
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+vata_guard.py
+
+Guarded scanning: per-file byte and time budgets for the regex heuristics.
+
+A single minified bundle or generated file can stall a whole scan, so every
+file goes through ScanGuard.scan() before it reaches a scorer:
+
+  1. the file is memory-mapped (vata_fileio); binary files are skipped
+  2. the head is checked for minified/generated content; such files are
+     sampled (only the head is scored) or skipped, per ``on_generated``
+  3. oversized files go to a ``sampler(path)`` when one is given and
+     ``on_oversize="sample"`` (stratified sampling, see vata_sampling);
+     otherwise only the bytes up to the last newline inside ``max_bytes``
+     are decoded
+  4. the scorer runs under a ``max_seconds`` wall-clock limit (SIGALRM,
+     main thread on POSIX only; elsewhere overruns are flagged afterwards)
+
+Timings are bucketed by outcome (ok / truncated / stratified / sampled /
+skipped / timeout / error) so scan summaries can show the cost of guarded
+files separately from normal ones.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from vata_fileio import open_mapped
+
+GENERATED_MARKERS = (
+    b"@generated",
+    b"DO NOT EDIT",
+    b"Code generated by",
+    b"sourceMappingURL=",
+    b"webpackBootstrap",
+    b"/*! ",
+)
+
+
+@dataclass
+class Budget:
+    max_bytes: int = 2 * 1024 * 1024       # bytes scored per file
+    max_seconds: float = 2.0               # scorer wall-clock limit per file
+    head_bytes: int = 64 * 1024            # head used for detection / sampling
+    on_generated: str = "sample"           # "sample" | "skip" | "score"
+    on_oversize: str = "sample"            # "sample" (needs a sampler) | "truncate"
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+@contextmanager
+def time_limit(seconds: float):
+    """
+    Raise BudgetExceeded in the calling code after ``seconds``.
+
+    Python's regex engine only checks for signals between match attempts,
+    so a single runaway match can overshoot; the byte budget is the hard
+    bound, this is the backstop.
+    """
+    usable = (
+        seconds and seconds > 0
+        and hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if not usable:
+        yield
+        return
+
+    def _expired(signum, frame):
+        raise BudgetExceeded(f"exceeded {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def detect_generated(head: bytes) -> Optional[str]:
+    """Reason string if the head looks minified or machine-generated, else None."""
+    for marker in GENERATED_MARKERS:
+        if marker in head:
+            return f"generated ({marker.decode().strip()})"
+    if len(head) < 4096:
+        return None
+    newlines = head.count(b"\n")
+    if len(head) / (newlines + 1) > 300:
+        return "minified (long lines)"
+    if head.count(b" ") + newlines + head.count(b"\t") < len(head) * 0.03:
+        return "minified (no whitespace)"
+    return None
+
+
+@dataclass
+class GuardedResult:
+    path: str
+    status: str                   # ok | truncated | stratified | sampled | skipped | timeout | error
+    size: int
+    scored_bytes: int = 0
+    elapsed_ms: float = 0.0
+    reason: Optional[str] = None
+    result: Any = None
+    content_hash: Optional[str] = None    # SHA-1 of the file; None above max_bytes (not read in full)
+
+
+@dataclass
+class _Bucket:
+    files: int = 0
+    seconds: float = 0.0
+    max_ms: float = 0.0
+    bytes: int = 0
+
+    def add(self, elapsed: float, size: int) -> None:
+        self.files += 1
+        self.seconds += elapsed
+        self.bytes += size
+        self.max_ms = max(self.max_ms, elapsed * 1000)
+
+
+@dataclass
+class ScanGuard:
+    budget: Budget = field(default_factory=Budget)
+    timings: Dict[str, _Bucket] = field(default_factory=dict)
+
+    def record(self, res: GuardedResult) -> GuardedResult:
+        self.timings.setdefault(res.status, _Bucket()).add(res.elapsed_ms / 1000, res.size)
+        return res
+
+    def _run(self, res: GuardedResult, start: float, fn: Callable[[], Any]) -> GuardedResult:
+        b = self.budget
+        try:
+            with time_limit(b.max_seconds):
+                res.result = fn()
+        except BudgetExceeded as e:
+            res.status, res.reason = "timeout", str(e)
+        except Exception as e:
+            res.status, res.reason = "error", str(e)
+        res.elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        if res.status in ("ok", "stratified") and b.max_seconds and res.elapsed_ms > b.max_seconds * 1000:
+            res.status, res.reason = "timeout", f"took {res.elapsed_ms:.0f}ms (not interruptible here)"
+        return self.record(res)
+
+    def scan(
+        self,
+        path: str,
+        scorer: Callable[[str], Any],
+        sampler: Optional[Callable[[str], Any]] = None,
+        mf=None,
+    ) -> GuardedResult:
+        """
+        Read ``path`` within budget and run ``scorer(text)`` on what is kept;
+        oversized files go to ``sampler(path)`` instead when one is given.
+        ``mf`` is the file already loaded (vata_fileio.LoadedFile, from a
+        prefetch stage, holding at least ``max_bytes``) to use instead of
+        mapping ``path``.
+        """
+        b = self.budget
+        start = time.perf_counter()
+        if mf is None:
+            try:
+                mf = open_mapped(path)
+            except (OSError, ValueError) as e:
+                return self.record(GuardedResult(path, "error", 0, reason=str(e)))
+        with mf:
+            digest = mf.sha1() if mf.size <= b.max_bytes else None
+            res = self._scan_mapped(mf, scorer, sampler, start)
+        res.content_hash = digest
+        return res
+
+    def _scan_mapped(self, mf, scorer, sampler, start: float) -> GuardedResult:
+        b, path, size = self.budget, mf.path, mf.size
+
+        def skip(reason: str) -> GuardedResult:
+            res = GuardedResult(path, "skipped", size, reason=reason)
+            res.elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+            return self.record(res)
+
+        if mf.is_binary():
+            return skip("binary")
+        head = mf.head(b.head_bytes)
+        generated = detect_generated(head) if b.on_generated != "score" else None
+        if generated and b.on_generated == "skip":
+            return skip(generated)
+
+        if not generated and size > b.max_bytes and sampler is not None and b.on_oversize == "sample":
+            res = GuardedResult(path, "stratified", size, reason=f"sampled {size} bytes")
+            res = self._run(res, start, lambda: sampler(path))
+            if isinstance(res.result, dict) and "sampling" in res.result:
+                res.scored_bytes = res.result["sampling"]["sampled_bytes"]
+            return res
+
+        status, reason, end = "ok", None, size
+        if generated:
+            status, reason = "sampled", generated
+            end = min(size, b.head_bytes)
+        elif size > b.max_bytes:
+            status, reason = "truncated", f"scored first {b.max_bytes} of {size} bytes"
+            end = mf.cut(b.max_bytes)
+
+        # only the kept region is decoded, straight from the mapping
+        res = GuardedResult(path, status, size, scored_bytes=end, reason=reason)
+        return self._run(res, start, lambda: scorer(mf.text(0, end)))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            status: {
+                "files": bucket.files,
+                "seconds": round(bucket.seconds, 3),
+                "max_ms": round(bucket.max_ms, 3),
+                "mb": round(bucket.bytes / 1e6, 3),
+            }
+            for status, bucket in sorted(self.timings.items())
+        }
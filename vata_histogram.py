@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+vata_histogram.py
+
+Fixed-bucket histogram shared by the metrics registry (vata_metrics) and the
+stage profiler (vata_profile). Counts are kept per bucket; ``to_dict`` reports
+them cumulatively, like Prometheus ``le`` buckets.
+
+  h = Histogram((1, 5, 10))
+  h.observe(3.2)
+  h.to_dict()   # {"buckets": {"1": 0, "5": 1, "10": 1, "+Inf": 1}, "count": 1, "sum": 3.2}
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, Sequence
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts, Prometheus-style `le` buckets)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + [float("inf")], self.counts):
+            running += n
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 3)}
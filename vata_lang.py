@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+vata_lang.py
+
+Language plugins for the soul heuristics.
+
+Each plugin describes one language's lexical surface (comment markers,
+string literal forms, definition keywords) and is compiled into a single
+tokenizer regex whose alternatives cannot backtrack into each other. One
+left-to-right pass over the source yields a SourceFeatures record
+(comment lines, identifiers, numbers, functions/classes, line stats,
+repetition) that every scoring engine consumes, so `.js`/`.go`/`.rs`/`.c`
+files are no longer scored as if they were Python.
+
+  register(plugin)         add or replace a language
+  plugin_for(path)         plugin by file extension (None if unknown)
+  extract_features(code, language="python" | path=...)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# ============================================================
+# FEATURE RECORD
+# ============================================================
+@dataclass
+class SourceFeatures:
+    language: str
+    lines: int = 0
+    blank_lines: int = 0
+    comment_lines: int = 0
+    functions: int = 0
+    classes: int = 0
+    strings: int = 0
+    numbers: int = 0
+    identifiers: Counter = field(default_factory=Counter)
+    avg_line_len: float = 0.0
+    max_line_len: int = 0
+    repeated_lines: int = 0   # distinct non-blank lines seen 3+ times
+
+    @property
+    def comment_ratio(self) -> float:
+        return self.comment_lines / self.lines if self.lines else 0.0
+
+    @property
+    def unique_identifiers(self) -> int:
+        return len(self.identifiers)
+
+    @property
+    def avg_identifier_len(self) -> float:
+        n = len(self.identifiers)
+        return sum(len(i) for i in self.identifiers) / n if n else 0.0
+
+
+# ============================================================
+# PLUGINS
+# ============================================================
+# string literal patterns; each one also matches an unterminated literal up
+# to end of line (or end of file for multi-line forms) so a match never fails
+# after consuming input
+_DQ = r'"(?:[^"\\\n]|\\.)*"?'
+_SQ = r"'(?:[^'\\\n]|\\.)*'?"
+_CHAR = r"'(?:[^'\\\n]|\\[^\n]{1,10}?)'"           # C/Go/Rust/Java char literal
+_BACKTICK = r"`(?:[^`\\]|\\[\s\S])*`?"               # JS template / Go raw string
+_PY_TRIPLE_DQ = r'[rRbBuUfF]{0,2}"""(?:[^"\\]|\\[\s\S]|"(?!""))*(?:"""|\Z)'
+_PY_TRIPLE_SQ = r"[rRbBuUfF]{0,2}'''(?:[^'\\]|\\[\s\S]|'(?!''))*(?:'''|\Z)"
+_PY_DQ = r'[rRbBuUfF]{0,2}' + _DQ
+_PY_SQ = r'[rRbBuUfF]{0,2}' + _SQ
+_RUST_RAW = r'b?r#*"(?:[^"]|"(?!#))*(?:"#*|\Z)'
+_BLOCK_C = r"/\*(?:[^*]|\*(?!/))*(?:\*/|\Z)"
+
+_C_CONTROL = frozenset({
+    "if", "for", "while", "switch", "catch", "return", "sizeof", "new", "delete",
+    "else", "do", "case", "throw", "typeof", "await", "yield", "synchronized",
+})
+
+
+@dataclass
+class LanguagePlugin:
+    name: str
+    extensions: Tuple[str, ...]
+    line_comments: Tuple[str, ...] = ()
+    block_comments: Tuple[str, ...] = ()     # regex alternatives
+    strings: Tuple[str, ...] = (_DQ,)        # regex alternatives, tried in order
+    ident: str = r"[^\W\d]\w*"
+    def_keywords: FrozenSet[str] = frozenset()
+    class_keywords: FrozenSet[str] = frozenset()
+    arrow_functions: bool = False            # count `=>` as a function
+    c_style_defs: bool = False               # `name(...) {` is a definition
+    control_keywords: FrozenSet[str] = _C_CONTROL
+    _regex: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def regex(self) -> re.Pattern:
+        if self._regex is None:
+            comments = list(self.block_comments) + [re.escape(m) + r"[^\n]*" for m in self.line_comments]
+            parts = [r"(?P<nl>\n)"]
+            if comments:
+                parts.append(f"(?P<comment>{'|'.join(comments)})")
+            parts += [
+                f"(?P<string>{'|'.join(self.strings)})",
+                f"(?P<ident>{self.ident})",
+                r"(?P<number>\d[\w.]*)",
+                # brackets stay single tokens for definition tracking; other
+                # punctuation runs are one token each
+                r"(?P<op>=>|[(){};]|[^\s\w(){};\"'`#/$]+|\S)",
+            ]
+            self._regex = re.compile("|".join(parts))
+        return self._regex
+
+
+PLUGINS: Dict[str, LanguagePlugin] = {}
+EXTENSIONS: Dict[str, LanguagePlugin] = {}
+
+
+def register(plugin: LanguagePlugin) -> LanguagePlugin:
+    PLUGINS[plugin.name] = plugin
+    for ext in plugin.extensions:
+        EXTENSIONS[ext.lower()] = plugin
+    return plugin
+
+
+def plugin_for(path: str) -> Optional[LanguagePlugin]:
+    """Plugin for a file path or bare extension (".rs"), None if unknown."""
+    ext = path if path.startswith(".") and path.count(".") == 1 else os.path.splitext(path)[1]
+    return EXTENSIONS.get(ext.lower())
+
+
+def get_plugin(language: Optional[str] = None, path: Optional[str] = None) -> LanguagePlugin:
+    """Resolve by explicit language name, then by path, defaulting to Python."""
+    if language:
+        if language not in PLUGINS:
+            raise KeyError(f"Unknown language: {language}")
+        return PLUGINS[language]
+    if path:
+        plugin = plugin_for(path)
+        if plugin is not None:
+            return plugin
+    return PLUGINS["python"]
+
+
+register(LanguagePlugin(
+    name="python",
+    extensions=(".py", ".pyw", ".pyi"),
+    line_comments=("#",),
+    strings=(_PY_TRIPLE_DQ, _PY_TRIPLE_SQ, _PY_DQ, _PY_SQ),
+    def_keywords=frozenset({"def"}),
+    class_keywords=frozenset({"class"}),
+))
+_JS = dict(
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(_DQ, _SQ, _BACKTICK),
+    ident=r"[^\W\d][\w$]*|\$[\w$]*",
+    def_keywords=frozenset({"function"}),
+    arrow_functions=True,
+    c_style_defs=True,
+)
+register(LanguagePlugin(
+    name="javascript", extensions=(".js", ".jsx", ".mjs", ".cjs"),
+    class_keywords=frozenset({"class"}), **_JS,
+))
+register(LanguagePlugin(
+    name="typescript", extensions=(".ts", ".tsx", ".mts", ".cts"),
+    class_keywords=frozenset({"class", "interface", "enum"}), **_JS,
+))
+register(LanguagePlugin(
+    name="go",
+    extensions=(".go",),
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(_DQ, _BACKTICK, _CHAR),
+    def_keywords=frozenset({"func"}),
+    class_keywords=frozenset({"struct", "interface"}),
+))
+register(LanguagePlugin(
+    name="rust",
+    extensions=(".rs",),
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(_RUST_RAW, r"b?" + _DQ, r"b?" + _CHAR),
+    def_keywords=frozenset({"fn"}),
+    class_keywords=frozenset({"struct", "enum", "trait", "union"}),
+))
+register(LanguagePlugin(
+    name="c",
+    extensions=(".c", ".h"),
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(_DQ, _CHAR),
+    c_style_defs=True,
+))
+register(LanguagePlugin(
+    name="cpp",
+    extensions=(".cpp", ".cc", ".cxx", ".hpp", ".hh", ".hxx"),
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(r'R"\((?:[^)]|\)(?!"))*(?:\)"|\Z)', _DQ, _CHAR),
+    class_keywords=frozenset({"class", "struct", "union"}),
+    c_style_defs=True,
+))
+register(LanguagePlugin(
+    name="java",
+    extensions=(".java",),
+    line_comments=("//",),
+    block_comments=(_BLOCK_C,),
+    strings=(r'"""(?:[^"\\]|\\[\s\S]|"(?!""))*(?:"""|\Z)', _DQ, _CHAR),
+    class_keywords=frozenset({"class", "interface", "enum", "record"}),
+    c_style_defs=True,
+))
+
+# tokens allowed between `)` and `{` of a C-style definition
+# (C++ `const noexcept`, Java `throws A, B`, TS `: Promise<T[]>`)
+_DEF_TRAILER = frozenset(",.&*:<>[]|?")
+
+
+# ============================================================
+# SINGLE-PASS EXTRACTION
+# ============================================================
+def extract_features(
+    code: str,
+    language: Optional[str] = None,
+    path: Optional[str] = None,
+) -> SourceFeatures:
+    plugin = get_plugin(language, path)
+    feats = SourceFeatures(language=plugin.name)
+    idents = feats.identifiers
+    line_counts: Counter = Counter()
+
+    line_start = 0
+    has_code = has_comment = False
+    lengths_total = nonblank = 0
+    max_len = 0
+    functions = classes = strings = numbers = comment_lines = 0
+
+    # C-style definition tracking
+    prev = prev2 = None          # last two significant tokens
+    cands: List[int] = []        # paren depths at which candidate `name(`s opened
+    depth = 0
+    trailer = False              # between a candidate's `)` and its `{`
+    not_a_def = plugin.def_keywords | {"new", "."}
+
+    def end_line(pos: int, code_line: bool, comment_line: bool) -> None:
+        nonlocal line_start, lengths_total, nonblank, max_len, comment_lines
+        text = code[line_start:pos]
+        if code_line or comment_line:
+            n = len(text.rstrip("\r"))
+            lengths_total += n
+            nonblank += 1
+            if n > max_len:
+                max_len = n
+            line_counts[text.strip()] += 1
+            if comment_line and not code_line:
+                comment_lines += 1
+        line_start = pos + 1
+
+    for m in plugin.regex.finditer(code):
+        kind = m.lastgroup
+        if kind == "nl":
+            end_line(m.start(), has_code, has_comment)
+            has_code = has_comment = False
+            continue
+
+        value = m.group()
+        if kind == "comment" or kind == "string":
+            if kind == "comment":
+                has_comment = True
+            else:
+                has_code = True
+                strings += 1
+            # multi-line token: close every line it spans
+            nl = value.find("\n")
+            while nl != -1:
+                end_line(m.start() + nl, has_code, has_comment)
+                nl = value.find("\n", nl + 1)
+                has_code, has_comment = kind == "string", kind == "comment"
+            if kind == "comment":
+                continue
+            token = "<str>"
+        else:
+            has_code = True
+            token = value
+            if kind == "ident":
+                idents[value] += 1
+                if value in plugin.def_keywords:
+                    functions += 1
+                elif value in plugin.class_keywords:
+                    classes += 1
+            elif kind == "number":
+                numbers += 1
+            elif value == "=>" and plugin.arrow_functions:
+                functions += 1
+
+        if plugin.c_style_defs:
+            if trailer:
+                if token == "{":
+                    functions += 1
+                    trailer = False
+                elif not (kind == "ident" or _DEF_TRAILER.issuperset(token)):
+                    trailer = False
+            if token == "(":
+                if (
+                    prev is not None and prev[0] == "ident"
+                    and prev[1] not in plugin.control_keywords
+                    and prev[1] not in plugin.def_keywords
+                    and not (prev2 and prev2[1] in not_a_def)
+                ):
+                    cands.append(depth)
+                depth += 1
+            elif token == ")":
+                depth = max(0, depth - 1)
+                if cands and depth == cands[-1]:
+                    cands.pop()
+                    trailer = True
+            elif token in ";{}":
+                while cands and depth <= cands[-1]:
+                    cands.pop()
+            prev2, prev = prev, (kind, token)
+
+    # last line without a trailing newline
+    if line_start < len(code):
+        end_line(len(code), has_code, has_comment)
+
+    feats.lines = len(code.splitlines())
+    feats.blank_lines = feats.lines - nonblank
+    feats.comment_lines = comment_lines
+    feats.functions = functions
+    feats.classes = classes
+    feats.strings = strings
+    feats.numbers = numbers
+    feats.avg_line_len = lengths_total / nonblank if nonblank else 0.0
+    feats.max_line_len = max_len
+    feats.repeated_lines = sum(1 for c in line_counts.values() if c >= 3)
+    return feats
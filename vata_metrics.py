@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+vata_metrics.py
+
+Process-wide metrics for long-running scans, exported in the Prometheus
+text format (0.0.4).
+
+Counters, gauges and histograms live in one registry; every metric takes
+optional labels. Updates are a dict lookup under a lock, with no I/O;
+export happens off the hot path:
+
+  write_textfile("vata.prom")             atomic write (node_exporter textfile collector)
+  MetricsExporter("vata.prom", 15).start() rewrite the file every 15 s during a scan
+  serve_metrics(9464)                      GET /metrics on a background thread
+  render()                                 the text itself (vata_service serves it at /metrics)
+
+The scanners share the metric names defined at the bottom of this module.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from vata_histogram import Histogram as _Buckets
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """+1 for the duration of the block (in-progress / workers-busy gauges)."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS_S):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            h = self._values.get(key)
+            if h is None:
+                h = self._values[key] = _Buckets(self.buckets)
+            h.observe(value)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((k, list(h.counts), h.sum, h.count) for k, h in self._values.items())
+        for key, counts, total, count in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = _labels(self.label_names, key, f'le="{_num(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {running}")
+            base = _labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{base} {_num(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, labels: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            elif type(metric) is not cls or metric.label_names != tuple(labels):
+                raise ValueError(f"metric {name} already registered as {metric.kind}{metric.label_names}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS_S) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render(registry: Registry = REGISTRY) -> str:
+    return registry.render()
+
+
+def write_textfile(path: str, registry: Registry = REGISTRY) -> None:
+    """Write atomically so a scraper never reads a half-written file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+
+class MetricsExporter(threading.Thread):
+    """Rewrite ``path`` every ``interval`` seconds until stopped (and once more on stop)."""
+
+    def __init__(self, path: str, interval: float = 15.0, registry: Registry = REGISTRY):
+        super().__init__(name="vata-metrics", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            write_textfile(self.path, self.registry)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        write_textfile(self.path, self.registry)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve GET /metrics on a daemon thread; returns the server (call .shutdown() to stop)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="vata-metrics-http", daemon=True).start()
+    return server
+
+
+# ============================================================
+# SHARED SCAN METRICS
+# ============================================================
+FILES_SCANNED = REGISTRY.counter("vata_files_scanned_total", "Files scored", ("engine", "status"))
+SCAN_ERRORS = REGISTRY.counter("vata_scan_errors_total", "Files that failed to score", ("engine",))
+CACHE_HITS = REGISTRY.counter("vata_cache_hits_total", "Score cache hits", ("cache",))
+CACHE_MISSES = REGISTRY.counter("vata_cache_misses_total", "Score cache misses", ("cache",))
+FILE_LATENCY = REGISTRY.histogram("vata_file_seconds", "Per-file scoring latency", ("engine",))
+FILE_BYTES = REGISTRY.histogram("vata_file_bytes", "Size of scored files", ("engine",), buckets=SIZE_BUCKETS_BYTES)
+FILE_READ_LATENCY = REGISTRY.histogram("vata_file_read_seconds", "Per-file read (I/O) latency", ("engine",))
+IO_WAIT = REGISTRY.counter("vata_io_wait_seconds_total", "Time scorers sat idle waiting for file reads", ("engine",))
+QUEUE_DEPTH = REGISTRY.gauge("vata_queue_depth", "Items waiting to be processed", ("queue",))
+WORKERS_BUSY = REGISTRY.gauge("vata_workers_busy", "Workers currently scoring", ("pool",))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+vata_pipeline.py
+
+Prefetching producer/consumer pipeline for scans on slow or network disks.
+
+  paths ──> reader threads ──> bounded queue ──> scorer(s) ──> results
+
+``io_threads`` threads load files ahead of scoring into a queue of at most
+``depth`` files. When the queue is full the readers block (backpressure),
+so memory stays bounded by ``depth`` loaded files however far I/O could run
+ahead. Scoring happens in the calling thread (``workers=1``, keeps the
+SIGALRM time budget of vata_guard) or in a process pool of ``workers``,
+fed only while a worker is free.
+
+Time is accounted separately for I/O and compute:
+
+  read_s   seconds spent loading files (summed over reader threads)
+  wait_s   seconds the scorer side sat idle waiting for a loaded file
+  score_s  seconds spent scoring (summed over workers)
+
+A scan is I/O bound when ``wait_s`` is a large share of the wall time;
+raise ``io_threads`` then, or ``workers`` when it is near zero.
+
+  stats = PipelineStats()
+  for path, out in pipeline(paths, load, score, io_threads=8, depth=64, stats=stats):
+      ...   # out is score(path, load(path)), or the exception either raised
+  print(stats.format())
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+from vata_metrics import FILE_READ_LATENCY, IO_WAIT, QUEUE_DEPTH, WORKERS_BUSY
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    files: int = 0
+    bytes: int = 0
+    read_s: float = 0.0
+    wait_s: float = 0.0
+    score_s: float = 0.0
+    wall_s: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_read(self, seconds: float, size: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.read_s += seconds
+
+    def summary(self) -> dict:
+        return {
+            "files": self.files,
+            "mb": round(self.bytes / 1e6, 3),
+            "read_s": round(self.read_s, 3),
+            "wait_s": round(self.wait_s, 3),
+            "score_s": round(self.score_s, 3),
+            "wall_s": round(self.wall_s, 3),
+        }
+
+    def format(self) -> str:
+        share = self.wait_s / self.wall_s * 100 if self.wall_s else 0.0
+        return (f"  I/O      read {self.read_s:>8.3f}s  ({self.files} files, {self.bytes / 1e6:.2f} MB)\n"
+                f"  waiting  {self.wait_s:>13.3f}s  ({share:.0f}% of {self.wall_s:.3f}s wall)\n"
+                f"  compute  {self.score_s:>13.3f}s")
+
+
+# ============================================================
+# PREFETCH
+# ============================================================
+def prefetch(
+    paths: Iterable[str],
+    load: Callable[[str], Any],
+    io_threads: int = 4,
+    depth: int = 64,
+    stats: Optional[PipelineStats] = None,
+    engine: str = "scanner",
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield ``(path, load(path))`` in completion order, loaded by ``io_threads``
+    threads at most ``depth`` files ahead; a load that raises yields the
+    exception instead. Closing the generator stops the readers.
+    """
+    stats = stats if stats is not None else PipelineStats()
+    io_threads = max(1, io_threads)
+    ready: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    source = iter(paths)
+    source_lock = threading.Lock()          # the path iterator is usually a generator
+
+    def put(item) -> None:
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def reader() -> None:
+        while not stop.is_set():
+            with source_lock:
+                try:
+                    path = next(source, _DONE)
+                except Exception as e:
+                    path = e
+            if path is _DONE:
+                break
+            if isinstance(path, Exception):
+                put((None, path))
+                break
+            start = time.perf_counter()
+            try:
+                item = load(path)
+            except Exception as e:
+                item = e
+            elapsed = time.perf_counter() - start
+            stats.add_read(elapsed, len(getattr(item, "buf", b"")))
+            FILE_READ_LATENCY.observe(elapsed, engine=engine)
+            put((path, item))
+        put(_DONE)
+
+    threads = [threading.Thread(target=reader, name=f"vata-prefetch-{i}", daemon=True) for i in range(io_threads)]
+    for t in threads:
+        t.start()
+    finished = 0
+    try:
+        while finished < io_threads:
+            start = time.perf_counter()
+            entry = ready.get()
+            waited = time.perf_counter() - start
+            stats.wait_s += waited
+            IO_WAIT.inc(waited, engine=engine)
+            QUEUE_DEPTH.set(ready.qsize(), queue="prefetch")
+            if entry is _DONE:
+                finished += 1
+                continue
+            if entry[0] is None:             # the path iterator itself failed
+                raise entry[1]
+            yield entry
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+        QUEUE_DEPTH.set(0, queue="prefetch")
+
+
+# ============================================================
+# PIPELINE
+# ============================================================
+def _timed(score: Callable[[str, Any], Any], path: str, item: Any) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    if isinstance(item, Exception):
+        return item, 0.0
+    try:
+        out = score(path, item)
+    except Exception as e:
+        out = e
+    return out, time.perf_counter() - start
+
+
+def pipeline(
+    paths: Iterable[str],
+    load: Callable[[str], Any],
+    score: Callable[[str, Any], Any],
+    io_threads: int = 4,
+    depth: int = 64,
+    workers: int = 1,
+    stats: Optional[PipelineStats] = None,
+    engine: str = "scanner",
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield ``(path, score(path, load(path)))`` with loading prefetched on
+    threads. Any exception from either step is yielded as the result. With
+    ``workers > 1``, ``score`` and the loaded items must be picklable and
+    results arrive in completion order.
+    """
+    stats = stats if stats is not None else PipelineStats()
+    started = time.perf_counter()
+    loaded = prefetch(paths, load, io_threads, depth, stats, engine)
+    try:
+        if workers <= 1:
+            for path, item in loaded:
+                out, seconds = _timed(score, path, item)
+                stats.score_s += seconds
+                yield path, out
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            exhausted = False
+            try:
+                while running or not exhausted:
+                    # pull from the queue only while a worker is free, so a
+                    # blocked get means idle CPU waiting on I/O
+                    while not exhausted and len(running) < workers:
+                        entry = next(loaded, None)
+                        if entry is None:
+                            exhausted = True
+                            break
+                        path, item = entry
+                        running[pool.submit(_timed, score, path, item)] = path
+                    WORKERS_BUSY.set(len(running), pool=engine)
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = running.pop(future)
+                        try:
+                            out, seconds = future.result()
+                        except Exception as e:      # worker died (BrokenProcessPool, unpicklable result)
+                            out, seconds = e, 0.0
+                        stats.score_s += seconds
+                        yield path, out
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            finally:
+                WORKERS_BUSY.set(0, pool=engine)
+    finally:
+        loaded.close()
+        stats.wall_s += time.perf_counter() - started
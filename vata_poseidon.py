@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+vata_poseidon.py
+
+Poseidon hash over the BN254 scalar field, parameter-compatible with
+circomlib's poseidon.circom (x^5 S-box, 8 full rounds, constants from the
+reference Grain LFSR). Used to build the public inputs of the
+ethical_action_verifier circuit.
+
+  poseidon(inputs)          one hash, 1..16 field elements
+  poseidon_batch(rows)      many hashes of the same width in one pass; the
+                            permutation state is a NumPy object array of
+                            shape (batch, t), so every round is a few
+                            vectorized big-int ops instead of a Python loop
+                            per input
+  hash_words / hash_words_batch
+                            fixed-size word arrays longer than 16 elements
+                            (e.g. the 50-word action array), chained in
+                            16-wide chunks
+  MandateHashCache          mandate hash per file, invalidated by mtime
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# ============================================================
+# PARAMETERS (match circomlib)
+# ============================================================
+SNARK_FIELD = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+FULL_ROUNDS = 8
+# Partial rounds for t = 2..17 (inputs 1..16), as used by circomlib.
+PARTIAL_ROUNDS = [56, 57, 56, 60, 60, 63, 64, 63, 60, 66, 60, 65, 70, 60, 64, 68]
+MAX_INPUTS = len(PARTIAL_ROUNDS)
+
+_FIELD_BITS = 254
+
+
+def _grain_generator(t: int, partial_rounds: int):
+    """Grain LFSR in self-shrinking mode, seeded per the Poseidon reference."""
+    state = (
+        [0, 1]                                               # prime field
+        + [0, 0, 0, 0]                                       # x^alpha S-box
+        + [int(b) for b in format(_FIELD_BITS, "012b")]
+        + [int(b) for b in format(t, "012b")]
+        + [int(b) for b in format(FULL_ROUNDS, "010b")]
+        + [int(b) for b in format(partial_rounds, "010b")]
+        + [1] * 30
+    )
+    # Store the 80-bit register as an int; bit i of the paper is bit (79 - i).
+    reg = int("".join(str(b) for b in state), 2)
+    mask = (1 << 80) - 1
+
+    def step() -> int:
+        nonlocal reg
+        bit = (
+            (reg >> 79) ^ (reg >> 66) ^ (reg >> 56)
+            ^ (reg >> 41) ^ (reg >> 28) ^ (reg >> 17)
+        ) & 1
+        reg = ((reg << 1) | bit) & mask
+        return bit
+
+    for _ in range(160):
+        step()
+
+    def field_bits() -> int:
+        value = 0
+        produced = 0
+        while produced < _FIELD_BITS:
+            keep = step()
+            bit = step()
+            if keep:
+                value = (value << 1) | bit
+                produced += 1
+        return value
+
+    return field_bits
+
+
+@lru_cache(maxsize=None)
+def poseidon_constants(t: int) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, ...], ...]]:
+    """Round constants and MDS matrix for state width ``t`` (cached)."""
+    if not 2 <= t <= MAX_INPUTS + 1:
+        raise ValueError(f"Poseidon width must be 2..{MAX_INPUTS + 1}, got {t}")
+    partial = PARTIAL_ROUNDS[t - 2]
+    rnd = _grain_generator(t, partial)
+
+    constants: List[int] = []
+    while len(constants) < (FULL_ROUNDS + partial) * t:
+        value = rnd()
+        if value < SNARK_FIELD:
+            constants.append(value)
+
+    while True:
+        xs = [rnd() % SNARK_FIELD for _ in range(2 * t)]
+        if len(set(xs)) != len(xs):
+            continue
+        if any((xs[i] + xs[t + j]) % SNARK_FIELD == 0 for i in range(t) for j in range(t)):
+            continue
+        mds = tuple(
+            tuple(pow(xs[i] + xs[t + j], -1, SNARK_FIELD) for j in range(t))
+            for i in range(t)
+        )
+        return tuple(constants), mds
+
+
+# ------------------------------------------------------------
+# Optimized round layout
+#
+# Only lane 0 goes through the S-box in a partial round, so (a) the
+# constants of lanes 1..t-1 can be carried forward into the next full
+# round, and (b) each dense MDS multiply can be factored into a sparse
+# matrix (full first row + first column + identity) times a block matrix
+# that commutes with the partial S-box and is folded into the previous
+# round. Partial rounds then cost 2t-1 multiplications instead of t^2.
+# Same permutation, fewer big-int ops.
+# ------------------------------------------------------------
+def _mat_mul(a, b):
+    return [
+        [sum(a[i][k] * b[k][j] for k in range(len(b))) % SNARK_FIELD for j in range(len(b[0]))]
+        for i in range(len(a))
+    ]
+
+
+def _mat_vec(m, v):
+    return [sum(x * y for x, y in zip(row, v)) % SNARK_FIELD for row in m]
+
+
+def _mat_inv(m):
+    n = len(m)
+    aug = [list(row) + [int(i == j) for j in range(n)] for i, row in enumerate(m)]
+    for col in range(n):
+        pivot = next(r for r in range(col, n) if aug[r][col] % SNARK_FIELD)
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        inv = pow(aug[col][col], -1, SNARK_FIELD)
+        aug[col] = [x * inv % SNARK_FIELD for x in aug[col]]
+        for r in range(n):
+            if r != col and aug[r][col]:
+                f = aug[r][col]
+                aug[r] = [(x - f * y) % SNARK_FIELD for x, y in zip(aug[r], aug[col])]
+    return [row[n:] for row in aug]
+
+
+@lru_cache(maxsize=None)
+def _optimized_constants(t: int):
+    constants, mds = poseidon_constants(t)
+    partial = PARTIAL_ROUNDS[t - 2]
+    half = FULL_ROUNDS // 2
+    rc = [list(constants[r * t:(r + 1) * t]) for r in range(FULL_ROUNDS + partial)]
+    m = [list(row) for row in mds]
+
+    # (a) partial rounds keep a scalar constant for lane 0
+    carry = [0] * t
+    lane0 = []
+    for r in range(half, half + partial):
+        c = [(x + y) % SNARK_FIELD for x, y in zip(rc[r], carry)]
+        lane0.append(c[0])
+        c[0] = 0
+        carry = _mat_vec(m, c)
+    rc[half + partial] = [(x + y) % SNARK_FIELD for x, y in zip(rc[half + partial], carry)]
+
+    # (b) X = B · A, B sparse, A = diag(1, X[1:, 1:]); A moves one round back
+    sparse = []
+    x = m
+    for _ in range(partial):
+        inner = [row[1:] for row in x[1:]]
+        first_row = [x[0][0]] + _mat_vec(list(zip(*_mat_inv(inner))), x[0][1:])
+        column = [row[0] for row in x[1:]]
+        sparse.append((
+            np.array(first_row, dtype=object),
+            np.array(column, dtype=object),
+        ))
+        block = [[1] + [0] * (t - 1)] + [[0] + row for row in inner]
+        x = _mat_mul(block, m)
+    sparse.reverse()
+
+    full_rc = np.array(rc[:half] + rc[half + partial:], dtype=object)
+    # Transposed so that ``state @ m_t`` computes M · state for every row.
+    mds_t = np.array(m, dtype=object).T.copy()
+    pre_t = np.array(x, dtype=object).T.copy()
+    return full_rc, mds_t, pre_t, lane0, sparse
+
+
+# ============================================================
+# HASHING
+# ============================================================
+def _pow5(x):
+    x2 = x * x % SNARK_FIELD
+    x4 = x2 * x2 % SNARK_FIELD
+    return x4 * x % SNARK_FIELD
+
+
+def _permute(state: np.ndarray) -> np.ndarray:
+    t = state.shape[1]
+    full_rc, mds_t, pre_t, lane0, sparse = _optimized_constants(t)
+    half = FULL_ROUNDS // 2
+
+    for r in range(half):
+        state = _pow5(state + full_rc[r])
+        state = (state @ (pre_t if r == half - 1 else mds_t)) % SNARK_FIELD
+
+    for k, (first_row, column) in zip(lane0, sparse):
+        s0 = _pow5(state[:, 0] + k)
+        state[:, 0] = s0
+        head = state.dot(first_row) % SNARK_FIELD
+        state[:, 1:] = (state[:, 1:] + np.outer(s0, column)) % SNARK_FIELD
+        state[:, 0] = head
+
+    for r in range(half, FULL_ROUNDS):
+        state = _pow5(state + full_rc[r])
+        state = (state @ mds_t) % SNARK_FIELD
+    return state
+
+
+def poseidon_batch(rows: Sequence[Sequence[int]]) -> List[int]:
+    """Hash many equal-width input rows; returns one field element per row."""
+    if len(rows) == 0:
+        return []
+    width = len(rows[0])
+    if not 1 <= width <= MAX_INPUTS:
+        raise ValueError(f"Poseidon takes 1..{MAX_INPUTS} inputs, got {width}")
+
+    state = np.zeros((len(rows), width + 1), dtype=object)
+    try:
+        state[:, 1:] = np.array(rows, dtype=object).reshape(len(rows), width)
+    except ValueError:
+        raise ValueError("All rows passed to poseidon_batch must have the same width")
+    state[:, 1:] %= SNARK_FIELD
+    return [int(v) for v in _permute(state)[:, 0]]
+
+
+def poseidon(inputs: Sequence[int]) -> int:
+    """Single Poseidon hash, identical to circomlib's Poseidon(len(inputs))."""
+    return poseidon_batch([list(inputs)])[0]
+
+
+def hash_words_batch(rows: Sequence[Sequence[int]]) -> List[int]:
+    """
+    Hash equal-length word arrays of any length.
+
+    Arrays of up to 16 words are a plain Poseidon. Longer arrays are chained:
+    the first 16 words are hashed, then each following chunk of 15 words is
+    hashed together with the running digest. A circuit consuming these
+    digests has to mirror the same chaining (circomlib stops at 16 inputs).
+    """
+    if len(rows) == 0:
+        return []
+    length = len(rows[0])
+    if length <= MAX_INPUTS:
+        return poseidon_batch(rows)
+
+    matrix = np.array(rows, dtype=object).reshape(len(rows), length)
+    digests = poseidon_batch(matrix[:, :MAX_INPUTS])
+    for start in range(MAX_INPUTS, length, MAX_INPUTS - 1):
+        chunk = matrix[:, start:start + MAX_INPUTS - 1]
+        acc = np.array(digests, dtype=object).reshape(-1, 1)
+        digests = poseidon_batch(np.hstack([acc, chunk]))
+    return digests
+
+
+def hash_words(words: Sequence[int]) -> int:
+    return hash_words_batch([list(words)])[0]
+
+
+# ============================================================
+# MANDATE HASH CACHE
+# ============================================================
+def _mandate_digest(path: str) -> int:
+    with open(path, "rb") as f:
+        return int.from_bytes(hashlib.sha256(f.read()).digest(), "big") % (2**254)
+
+
+class MandateHashCache:
+    """
+    Caches the mandate (ethics charter) hash per file.
+
+    An entry is reused while the file's mtime and size are unchanged, so
+    editing the charter is picked up on the next call without re-reading
+    the file for every agent action.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> int:
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                return entry[2]
+        digest = _mandate_digest(key)
+        with self._lock:
+            self._entries[key] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def invalidate(self, path: str = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+
+mandate_cache = MandateHashCache()
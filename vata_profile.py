@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+vata_profile.py
+
+Per-stage timing for the analysis pipeline.
+
+Pipeline code marks its stages with ``stage("name")``; that is a shared
+no-op context unless a Profiler is active, so instrumented code costs one
+global lookup when profiling is off. While active, each stage records
+wall-clock and CPU (thread) time into a latency histogram, and each
+``profiler.file(path)`` block records the file's total time and per-stage
+split for a top-N slowest-files report.
+
+  with profiling(pstats_path="vata.prof") as prof:     # also runs cProfile
+      for path in files:
+          with prof.file(path):
+              run_analysis(...)
+  print(prof.format_report())
+
+Stage names are dotted (``soul``, ``soul.lex``, ``fairness.rules``); nested
+stages are timed inclusively, so ``soul`` contains ``soul.lex``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import heapq
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from vata_histogram import Histogram
+
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_NULL = nullcontext()
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    max_ms: float = 0.0
+    wall_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+
+    def add(self, wall: float, cpu: float) -> None:
+        self.calls += 1
+        self.wall_s += wall
+        self.cpu_s += cpu
+        self.max_ms = max(self.max_ms, wall * 1000)
+        self.wall_ms.observe(wall * 1000)
+
+
+class Profiler:
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.stages: Dict[str, StageStats] = {}
+        self.files = 0
+        self._slowest: List[Tuple[float, str, Dict[str, float]]] = []   # min-heap of the top N
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        w0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - w0, time.thread_time() - c0
+            with self._lock:
+                self.stages.setdefault(name, StageStats()).add(wall, cpu)
+            split = getattr(self._local, "split", None)
+            if split is not None:
+                split[name] = split.get(name, 0.0) + wall * 1000
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        self._local.split = split = {}
+        w0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - w0) * 1000
+            self._local.split = None
+            entry = (ms, str(path), {k: round(v, 3) for k, v in split.items()})
+            with self._lock:
+                self.files += 1
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, entry)
+                elif ms > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, entry)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": self.files,
+                "stages": {
+                    name: {
+                        "calls": s.calls,
+                        "wall_s": round(s.wall_s, 4),
+                        "cpu_s": round(s.cpu_s, 4),
+                        "mean_ms": round(s.wall_s * 1000 / s.calls, 3) if s.calls else 0.0,
+                        "max_ms": round(s.max_ms, 3),
+                        "histogram_ms": s.wall_ms.to_dict(),
+                    }
+                    for name, s in sorted(self.stages.items())
+                },
+                "slowest_files": [
+                    {"path": path, "ms": round(ms, 3), "stages": split}
+                    for ms, path, split in sorted(self._slowest, reverse=True)
+                ],
+            }
+
+    def format_report(self) -> str:
+        rep = self.report()
+        lines = ["", "=" * 70, f"PROFILE — {rep['files']} files", "=" * 70]
+        lines.append(f"{'stage':<18} {'calls':>7} {'wall s':>9} {'cpu s':>9} {'mean ms':>9} {'max ms':>9}")
+        for name, s in rep["stages"].items():
+            lines.append(f"{name:<18} {s['calls']:>7} {s['wall_s']:>9.3f} {s['cpu_s']:>9.3f} "
+                         f"{s['mean_ms']:>9.3f} {s['max_ms']:>9.2f}")
+        if rep["slowest_files"]:
+            lines.append(f"\nSlowest {len(rep['slowest_files'])} files:")
+            for f in rep["slowest_files"]:
+                top = sorted(((v, k) for k, v in f["stages"].items() if "." not in k), reverse=True)[:3]
+                detail = ", ".join(f"{k} {v:.1f}ms" for v, k in top)
+                lines.append(f"  {f['ms']:>9.1f}ms  {f['path']}  ({detail})")
+        return "\n".join(lines)
+
+
+_active: Optional[Profiler] = None
+
+
+def stage(name: str):
+    """Time a pipeline stage on the active profiler (no-op when profiling is off)."""
+    return _NULL if _active is None else _active.stage(name)
+
+
+def file_scope(path: str):
+    return _NULL if _active is None else _active.file(path)
+
+
+def active() -> Optional[Profiler]:
+    return _active
+
+
+@contextmanager
+def profiling(top_n: int = 10, pstats_path: Optional[str] = None) -> Iterator[Profiler]:
+    """Activate a Profiler for the block; with ``pstats_path``, also cProfile the block into that file."""
+    global _active
+    prof, previous = Profiler(top_n), _active
+    _active = prof
+    cprof = cProfile.Profile() if pstats_path else None
+    if cprof is not None:
+        cprof.enable()
+    try:
+        yield prof
+    finally:
+        if cprof is not None:
+            cprof.disable()
+            cprof.dump_stats(pstats_path)
+        _active = previous
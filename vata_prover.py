@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+vata_prover.py
+
+Local Groth16 proving service.
+
+Each worker is a long-lived `node zk/prover_worker.js` process that loads the
+zkey and the circuit's witness calculator once and then proves jobs from
+stdin, so only the first proof pays the load cost. Run one worker per core
+to scale throughput; nothing talks to the network.
+
+  ProverPool    in-process API: submit() -> Future, prove() -> result dict
+  serve         file-based job queue (spool directory):
+
+                  <queue>/pending/<job>.json   circuit input, dropped by `submit`
+                  <queue>/running/<job>@<host>-<pid>.json
+                                               claimed by the server <host>-<pid>
+                  <queue>/done/<job>/          proof.json, public.json, timing.json
+                  <queue>/failed/<job>.json    input + error
+
+Usage:
+  python vata_prover.py serve  --circuit claim --queue zk/queue --workers 4
+  python vata_prover.py submit --queue zk/queue input.json [input2.json ...]
+  python vata_prover.py prove  --circuit claim input.json --out-dir proofs
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent
+WORKER_SCRIPT = ROOT / "zk" / "prover_worker.js"
+BUILD_DIR = ROOT / "build"
+
+
+# ============================================================
+# CIRCUIT ARTIFACTS
+# ============================================================
+@dataclass
+class CircuitArtifacts:
+    zkey: str
+    wasm: str
+    witness_calculator: str
+    vkey: Optional[str] = None
+
+    @classmethod
+    def for_circuit(cls, name: str, build_dir: Path = BUILD_DIR) -> "CircuitArtifacts":
+        """Resolve build/<name>_final.zkey (or <name>.zkey), wasm and vkey."""
+        zkey = build_dir / f"{name}_final.zkey"
+        if not zkey.exists():
+            zkey = build_dir / f"{name}.zkey"
+        js_dir = build_dir / f"{name}_js"
+        vkey = build_dir / f"{name}_vkey.json"
+        for path in (zkey, js_dir / f"{name}.wasm", js_dir / "witness_calculator.js"):
+            if not path.exists():
+                raise FileNotFoundError(f"Missing circuit artifact: {path}")
+        return cls(
+            zkey=str(zkey),
+            wasm=str(js_dir / f"{name}.wasm"),
+            witness_calculator=str(js_dir / "witness_calculator.js"),
+            vkey=str(vkey) if vkey.exists() else None,
+        )
+
+
+# ============================================================
+# WORKER POOL
+# ============================================================
+class _Worker:
+    def __init__(self, artifacts: CircuitArtifacts, node: str, single_thread: bool):
+        cmd = [
+            node, str(WORKER_SCRIPT),
+            "--zkey", artifacts.zkey,
+            "--wasm", artifacts.wasm,
+            "--wc", artifacts.witness_calculator,
+            "--single-thread", "1" if single_thread else "0",
+        ]
+        if artifacts.vkey:
+            cmd += ["--vkey", artifacts.vkey]
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        hello = self._read()
+        if not hello.get("ready"):
+            self.close()
+            raise RuntimeError(f"Prover worker failed to start: {hello.get('error')}")
+        self.load_ms = hello.get("load_ms")
+
+    def _read(self) -> Dict[str, Any]:
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("Prover worker exited unexpectedly")
+        return json.loads(line)
+
+    def call(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        self.proc.stdin.write(json.dumps(job) + "\n")
+        self.proc.stdin.flush()
+        return self._read()
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except Exception:
+                self.proc.kill()
+
+
+class ProverPool:
+    """
+    Pool of persistent snarkjs workers for one circuit.
+
+    Jobs are served first-come first-served from a shared queue; each result
+    dict has ``proof``, ``public`` and ``timings`` (queue_ms, witness_ms,
+    prove_ms, total_ms).
+
+    A worker process that dies is replaced. The job it was running is
+    requeued up to ``job_retries`` times, then fails, so a job that
+    crashes every worker cannot take the pool down. A slot whose
+    replacement fails to start ``max_restarts`` times in a row is retired;
+    when no slot is left, queued and new jobs fail instead of waiting.
+    """
+
+    def __init__(
+        self,
+        artifacts: CircuitArtifacts,
+        workers: int = None,
+        node: str = "node",
+        max_restarts: int = 3,
+        job_retries: int = 1,
+    ):
+        self.artifacts = artifacts
+        self.size = workers or os.cpu_count() or 1
+        self.node = node
+        self.max_restarts = max_restarts
+        self.job_retries = job_retries
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._workers: List[Optional[_Worker]] = []
+        self._threads: List[threading.Thread] = []
+        # several workers share the cores; keep each one single-threaded
+        self._single_thread = self.size > 1
+        for _ in range(self.size):
+            self._workers.append(_Worker(artifacts, node, self._single_thread))
+        self._live = self.size
+        for slot in range(self.size):
+            thread = threading.Thread(target=self._run, args=(slot,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @classmethod
+    def for_circuit(cls, name: str, **kwargs) -> "ProverPool":
+        return cls(CircuitArtifacts.for_circuit(name), **kwargs)
+
+    def _restart(self, slot: int) -> Optional[_Worker]:
+        """Replace the dead worker in ``slot``; None once the restart budget is spent."""
+        dead = self._workers[slot]
+        if dead is not None:
+            dead.close()
+        self._workers[slot] = None
+        for attempt in range(self.max_restarts):
+            try:
+                worker = _Worker(self.artifacts, self.node, self._single_thread)
+            except Exception:
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+                continue
+            self._workers[slot] = worker
+            return worker
+        return None
+
+    def _retire(self) -> None:
+        with self._lock:
+            self._live -= 1
+            if self._live:
+                return
+        # the last worker is gone: nothing will ever take these jobs
+        while True:
+            try:
+                item = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError("No prover workers left"))
+
+    def _run(self, slot: int) -> None:
+        worker = self._workers[slot]
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            job, future, queued_at, attempts = item
+            started = time.perf_counter()
+            try:
+                reply = worker.call(job)
+            except Exception as e:
+                # the worker process is gone (crash, OOM kill, broken pipe)
+                if attempts < self.job_retries:
+                    self._jobs.put((job, future, queued_at, attempts + 1))
+                else:
+                    future.set_exception(RuntimeError(f"Prover worker died: {e}"))
+                worker = self._restart(slot)
+                if worker is None:
+                    self._retire()
+                    return
+                continue
+            if not reply.get("ok"):
+                future.set_exception(RuntimeError(reply.get("error", "proof failed")))
+                continue
+            timings = reply.get("timings", {})
+            timings["queue_ms"] = round((started - queued_at) * 1000, 3)
+            timings["total_ms"] = round((time.perf_counter() - queued_at) * 1000, 3)
+            reply["timings"] = timings
+            future.set_result(reply)
+
+    def _submit(self, job: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        job["id"] = next(self._ids)
+        with self._lock:
+            if not self._live:
+                future.set_exception(RuntimeError("No prover workers left"))
+                return future
+            self._jobs.put((job, future, time.perf_counter(), 0))
+        return future
+
+    def submit(self, inputs: Dict[str, Any]) -> Future:
+        return self._submit({"op": "prove", "input": inputs})
+
+    def prove(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.submit(inputs).result()
+
+    def verify(self, proof: Dict[str, Any], public: List[str]) -> bool:
+        if not self.artifacts.vkey:
+            raise ValueError("No verification key for this circuit")
+        return bool(self._submit({"op": "verify", "proof": proof, "public": public}).result()["valid"])
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        for worker in self._workers:
+            if worker is not None:
+                worker.close()
+
+    def __enter__(self) -> "ProverPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ============================================================
+# FILE QUEUE
+# ============================================================
+def _queue_dirs(root: str) -> Dict[str, Path]:
+    dirs = {name: Path(root) / name for name in ("pending", "running", "done", "failed")}
+    for d in dirs.values():
+        d.mkdir(parents=True, exist_ok=True)
+    return dirs
+
+
+def submit_job(queue_dir: str, input_path: str) -> str:
+    """Copy a circuit input into the queue; returns the job id."""
+    dirs = _queue_dirs(queue_dir)
+    job_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}_{Path(input_path).stem}"
+    tmp = dirs["pending"] / f".{job_id}.tmp"
+    shutil.copyfile(input_path, tmp)
+    os.replace(tmp, dirs["pending"] / f"{job_id}.json")  # atomic hand-off
+    return job_id
+
+
+def _write_result(out_dir: Path, result: Dict[str, Any]) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "proof.json").write_text(json.dumps(result["proof"], indent=2))
+    (out_dir / "public.json").write_text(json.dumps(result["public"], indent=2))
+    (out_dir / "timing.json").write_text(json.dumps(result["timings"], indent=2))
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True     # exists, owned by another user
+    return True
+
+
+def _owner_gone(owner: str) -> bool:
+    """True when the server that claimed a job is known to have exited."""
+    if not owner:
+        return True     # claimed before owners were recorded
+    host, _, pid = owner.rpartition("-")
+    if host != socket.gethostname():
+        return False    # cannot check another machine's processes
+    try:
+        return not _pid_alive(int(pid))
+    except ValueError:
+        return True
+
+
+def requeue_orphans(queue_dir: str) -> List[str]:
+    """Move jobs whose owning server has exited from running/ back to pending/; returns their ids."""
+    dirs = _queue_dirs(queue_dir)
+    requeued = []
+    for path in dirs["running"].glob("*.json"):
+        job_id, sep, owner = path.stem.rpartition("@")
+        if not sep:
+            job_id, owner = owner, ""
+        if not _owner_gone(owner):
+            continue
+        try:
+            os.replace(path, dirs["pending"] / f"{job_id}.json")
+        except FileNotFoundError:
+            continue    # another server requeued it first
+        requeued.append(job_id)
+    return requeued
+
+
+def serve(pool: ProverPool, queue_dir: str, poll_interval: float = 0.2, once: bool = False) -> None:
+    """
+    Prove every job dropped into <queue>/pending until interrupted. Claimed
+    jobs carry this server's host and PID in their running/ name, so several
+    servers can share a queue and only jobs of servers that died are retried.
+    """
+    dirs = _queue_dirs(queue_dir)
+    inflight: Dict[str, Future] = {}
+    owner = f"{socket.gethostname()}-{os.getpid()}"
+
+    for job_id in requeue_orphans(queue_dir):
+        print(f"  retry  → {job_id} (server exited)")
+
+    while True:
+        for path in sorted(dirs["pending"].glob("*.json")):
+            running = dirs["running"] / f"{path.stem}@{owner}.json"
+            try:
+                os.replace(path, running)
+            except FileNotFoundError:
+                continue  # claimed by another server
+            try:
+                inputs = json.loads(running.read_text(encoding="utf-8"))
+            except ValueError as e:
+                (dirs["failed"] / path.name).write_text(json.dumps({"error": f"bad input: {e}"}))
+                running.unlink()
+                continue
+            inflight[path.stem] = pool.submit(inputs)
+
+        for job_id, future in list(inflight.items()):
+            if not future.done():
+                continue
+            del inflight[job_id]
+            running = dirs["running"] / f"{job_id}@{owner}.json"
+            try:
+                result = future.result()
+                _write_result(dirs["done"] / job_id, result)
+                t = result["timings"]
+                print(f"  done   → {job_id}  witness {t.get('witness_ms')}ms  prove {t.get('prove_ms')}ms")
+            except Exception as e:
+                failed = {"input": json.loads(running.read_text(encoding="utf-8")), "error": str(e)}
+                (dirs["failed"] / f"{job_id}.json").write_text(json.dumps(failed, indent=2))
+                print(f"  failed → {job_id}: {e}")
+            running.unlink(missing_ok=True)
+
+        if once and not inflight and not any(dirs["pending"].glob("*.json")):
+            return
+        time.sleep(poll_interval)
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VATA local Groth16 proving service")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run workers over a file-based job queue")
+    p_serve.add_argument("--circuit", required=True)
+    p_serve.add_argument("--queue", default="zk/queue")
+    p_serve.add_argument("--workers", type=int, default=None)
+    p_serve.add_argument("--once", action="store_true", help="Exit when the queue is drained")
+
+    p_submit = sub.add_parser("submit", help="Queue circuit inputs for a running server")
+    p_submit.add_argument("--queue", default="zk/queue")
+    p_submit.add_argument("inputs", nargs="+")
+
+    p_prove = sub.add_parser("prove", help="Prove input files directly")
+    p_prove.add_argument("--circuit", required=True)
+    p_prove.add_argument("--workers", type=int, default=None)
+    p_prove.add_argument("--out-dir", default="proofs")
+    p_prove.add_argument("inputs", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        for path in args.inputs:
+            print(submit_job(args.queue, path))
+        return
+
+    with ProverPool.for_circuit(args.circuit, workers=args.workers) as pool:
+        print(f"{pool.size} prover workers ready for '{args.circuit}'")
+        if args.command == "serve":
+            try:
+                serve(pool, args.queue, once=args.once)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        futures = {
+            path: pool.submit(json.loads(Path(path).read_text(encoding="utf-8")))
+            for path in args.inputs
+        }
+        for path, future in futures.items():
+            out_dir = Path(args.out_dir) / Path(path).stem if len(futures) > 1 else Path(args.out_dir)
+            result = future.result()
+            _write_result(out_dir, result)
+            print(f"{path} → {out_dir}  {result['timings']}")
+
+
+if __name__ == "__main__":
+    main()
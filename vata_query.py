@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+vata_query.py
+
+Queries across stored batch_scan results (vata_results/).
+
+Each scan is one file, ``vata-scan-YYYYMMDD-HHMMSS.{csv,parquet,arrow}``, so
+the scan time is known from the name alone: date ranges prune whole files
+before any of them is opened. Inside the remaining files only the needed
+columns are read, in record batches, with verdict/score predicates pushed
+down to the reader (Parquet skips row groups whose min/max statistics rule
+them out). Aggregates are combined batch by batch, so memory stays bounded.
+
+  trend   per-scan file count, mean score, verdict mix, files below a threshold
+  drops   files at or above a threshold in the first scan of a window and below it in the last
+          (sort-merge join, bounded memory)
+  top     N lowest (or highest) scoring files
+  compact convert CSV scans to Parquet (same name), which enables pushdown
+
+Usage:
+  python vata_query.py trend --since 2026-10-01
+  python vata_query.py drops --below 40 --since 2026-10-01
+  python vata_query.py top -n 20 --verdict AI,MIXED
+  python vata_query.py compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from vata_columnar import SCAN_COLUMNS, require_pyarrow
+
+DEFAULT_RESULTS = "vata_results"
+SCAN_NAME = re.compile(r"^vata-scan-(\d{8}-\d{6})\.(csv|parquet|arrow)$")
+FORMAT_RANK = {"parquet": 0, "arrow": 1, "csv": 2}     # preferred copy when a scan exists twice
+
+
+@dataclass(frozen=True)
+class Scan:
+    id: str                 # YYYYMMDD-HHMMSS
+    started: datetime
+    path: str
+    format: str
+
+
+def discover(results_dir: str = DEFAULT_RESULTS) -> List[Scan]:
+    """Scans under ``results_dir``, oldest first; a Parquet copy wins over its CSV."""
+    best: Dict[str, Scan] = {}
+    try:
+        names = os.listdir(results_dir)
+    except OSError:
+        return []
+    for name in names:
+        m = SCAN_NAME.match(name)
+        if not m:
+            continue
+        scan = Scan(m.group(1), datetime.strptime(m.group(1), "%Y%m%d-%H%M%S"),
+                    os.path.join(results_dir, name), m.group(2))
+        held = best.get(scan.id)
+        if held is None or FORMAT_RANK[scan.format] < FORMAT_RANK[held.format]:
+            best[scan.id] = scan
+    return sorted(best.values(), key=lambda s: s.started)
+
+
+def select(scans: Sequence[Scan], since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Scan]:
+    """Partition pruning: keep scans started in [since, until) without opening any file."""
+    return [s for s in scans if (since is None or s.started >= since) and (until is None or s.started < until)]
+
+
+# ============================================================
+# READING
+# ============================================================
+def _dataset(scan: Scan):
+    return open_dataset(scan.path, scan.format)
+
+
+def open_dataset(path: str, format: Optional[str] = None):
+    """pyarrow dataset over one result file (format from the extension unless given)."""
+    pa = require_pyarrow()
+    import pyarrow.csv  # noqa: F401
+    import pyarrow.dataset as ds
+
+    format = format or os.path.splitext(path)[1].lstrip(".").lower()
+    if format == "csv":
+        # every scan column typed up front: inference from the first block
+        # types sparse columns (guard_reason, ci_low) as null and then fails
+        # on their first value; integers are read as float64 because pandas
+        # writes columns with gaps as "85.0"
+        column_types = {
+            name: pa.float64() if kind.startswith("int") else getattr(pa, kind)()
+            for name, kind in SCAN_COLUMNS
+        }
+        fmt = ds.CsvFileFormat(convert_options=pa.csv.ConvertOptions(column_types=column_types))
+    else:
+        fmt = "parquet" if format == "parquet" else "ipc"
+    return ds.dataset(path, format=fmt)
+
+
+@dataclass
+class Predicate:
+    verdicts: Optional[Sequence[str]] = None
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None       # exclusive
+
+    def expression(self, names: Sequence[str]):
+        import pyarrow.dataset as ds
+
+        expr = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        if self.verdicts and "verdict" in names:
+            expr = both(expr, ds.field("verdict").isin(list(self.verdicts)))
+        if self.min_score is not None and "soul_score" in names:
+            expr = both(expr, ds.field("soul_score") >= self.min_score)
+        if self.max_score is not None and "soul_score" in names:
+            expr = both(expr, ds.field("soul_score") < self.max_score)
+        return expr
+
+    def narrow(self, min_score: Optional[float] = None, max_score: Optional[float] = None) -> "Predicate":
+        """This predicate with its score range intersected with [min_score, max_score)."""
+        lo = [s for s in (self.min_score, min_score) if s is not None]
+        hi = [s for s in (self.max_score, max_score) if s is not None]
+        return Predicate(self.verdicts, max(lo) if lo else None, min(hi) if hi else None)
+
+
+def batches(scan: Scan, columns: Sequence[str], where: Optional[Predicate] = None) -> Iterator[Any]:
+    """Record batches of ``columns`` (those the scan has) matching ``where``."""
+    dataset = _dataset(scan)
+    names = dataset.schema.names
+    present = [c for c in columns if c in names]
+    expr = where.expression(names) if where else None
+    yield from dataset.to_batches(columns=present, filter=expr)
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+def trend(scans: Sequence[Scan], below: float = 40, where: Optional[Predicate] = None) -> List[Dict[str, Any]]:
+    require_pyarrow()
+    import pyarrow.compute as pc
+
+    rows = []
+    for scan in scans:
+        files = scored = below_n = 0
+        total = 0.0
+        verdicts: Dict[str, int] = {}
+        for batch in batches(scan, ["soul_score", "verdict"], where):
+            files += batch.num_rows
+            names = batch.schema.names
+            if "soul_score" in names:
+                score = batch.column(names.index("soul_score"))
+                scored += len(score) - score.null_count
+                total += (pc.sum(score).as_py() or 0)
+                below_n += pc.sum(pc.less(score, below)).as_py() or 0
+            if "verdict" in names:
+                for item in pc.value_counts(batch.column(names.index("verdict"))).to_pylist():
+                    key = item["values"] or "UNKNOWN"
+                    verdicts[key] = verdicts.get(key, 0) + item["counts"]
+        rows.append({
+            "scan": scan.id,
+            "started": scan.started.isoformat(),
+            "files": files,
+            "mean_score": round(total / scored, 2) if scored else None,
+            f"below_{below:g}": below_n,
+            "verdicts": dict(sorted(verdicts.items())),
+        })
+    return rows
+
+
+def drops(
+    scans: Sequence[Scan],
+    below: float = 40,
+    where: Optional[Predicate] = None,
+    chunk_rows: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Files scoring >= ``below`` in the first scan and < ``below`` in the last
+    (and matching ``where`` in both).
+
+    Both sides are read with the threshold pushed down, externally sorted by
+    path and merge-joined (vata_diff), so memory is bounded by ``chunk_rows``
+    per sorted run plus the drops themselves.
+    """
+    if len(scans) < 2:
+        return []
+    import tempfile
+
+    from vata_diff import DEFAULT_CHUNK_ROWS, iter_sorted
+
+    first, last = scans[0], scans[-1]
+    chunk_rows = chunk_rows or DEFAULT_CHUNK_ROWS
+    where = where or Predicate()
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="vata-drops-") as tmpdir:
+        before_dir, after_dir = os.path.join(tmpdir, "before"), os.path.join(tmpdir, "after")
+        os.mkdir(before_dir)
+        os.mkdir(after_dir)
+        before = iter_sorted(first.path, before_dir, chunk_rows, where.narrow(min_score=below))
+        after = iter_sorted(last.path, after_dir, chunk_rows, where.narrow(max_score=below))
+        b, a = next(before, None), next(after, None)
+        while b is not None and a is not None:
+            if b[0] < a[0]:
+                b = next(before, None)
+            elif a[0] < b[0]:
+                a = next(after, None)
+            else:
+                rows.append({
+                    "full_path": a[0],
+                    "score_before": b[4],
+                    "score_after": a[4],
+                    "delta": a[4] - b[4],
+                    "from_scan": first.id,
+                    "to_scan": last.id,
+                })
+                b, a = next(before, None), next(after, None)
+        before.close()                      # release the memory-mapped runs before cleanup
+        after.close()
+    rows.sort(key=lambda r: (r["delta"], r["full_path"]))
+    return rows
+
+
+def top(scans: Sequence[Scan], n: int = 20, lowest: bool = True, where: Optional[Predicate] = None) -> List[Dict[str, Any]]:
+    """N lowest (or highest) scores across ``scans``, keeping only N candidates per batch."""
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+
+    order = "ascending" if lowest else "descending"
+    keys = [("soul_score", order), ("full_path", "ascending")]
+    columns = ["full_path", "soul_score", "verdict", "language"]
+    best = None
+    for scan in scans:
+        for batch in batches(scan, columns, where):
+            if "soul_score" not in batch.schema.names:
+                continue
+            table = pa.Table.from_batches([batch]).filter(pc.is_valid(batch.column(batch.schema.names.index("soul_score"))))
+            table = table.append_column("scan", pa.array([scan.id] * table.num_rows, pa.string()))
+            table = table.cast(pa.schema([
+                (f.name, pa.float64() if f.name == "soul_score" else pa.string()) for f in table.schema
+            ]))
+            candidates = pc.select_k_unstable(table, k=n, sort_keys=keys)
+            table = table.take(candidates)
+            best = table if best is None else pa.concat_tables([best, table], promote_options="default")
+            best = best.take(pc.select_k_unstable(best, k=n, sort_keys=keys))
+    if best is None:
+        return []
+    return best.sort_by(keys).to_pylist()
+
+
+# ============================================================
+# MAINTENANCE
+# ============================================================
+def compact(results_dir: str = DEFAULT_RESULTS, remove_csv: bool = False) -> List[str]:
+    """Write a Parquet copy of every CSV-only scan (row groups + stats enable pushdown)."""
+    pa = require_pyarrow()
+    import pyarrow.parquet as pq
+
+    native = {name: getattr(pa, kind)() for name, kind in SCAN_COLUMNS}
+    written = []
+    for scan in discover(results_dir):
+        if scan.format != "csv":
+            continue
+        target = scan.path[:-len(".csv")] + ".parquet"
+        dataset = _dataset(scan)
+        # the same column types batch_scan_columnar writes
+        schema = pa.schema([pa.field(f.name, native.get(f.name, f.type)) for f in dataset.schema])
+        writer = None
+        for batch in dataset.to_batches():
+            if writer is None:
+                writer = pq.ParquetWriter(target, schema, compression="zstd")
+            writer.write_batch(batch.cast(schema))
+        if writer is not None:
+            writer.close()
+            written.append(target)
+            if remove_csv:
+                os.unlink(scan.path)
+    return written
+
+
+# ============================================================
+# CLI
+# ============================================================
+def _date(text: str) -> datetime:
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y%m%d-%H%M%S"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"not a date: {text}")
+
+
+def _print(rows: List[Dict[str, Any]], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(rows, indent=2, default=str))
+        return
+    if not rows:
+        print("(no rows)")
+        return
+    keys = list(rows[0])
+    print("  ".join(keys))
+    for row in rows:
+        print("  ".join(json.dumps(row[k]) if isinstance(row[k], dict) else str(row[k]) for k in keys))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query stored VATA batch_scan results")
+    parser.add_argument("command", choices=["trend", "drops", "top", "compact", "scans"])
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Directory of vata-scan-* files")
+    parser.add_argument("--since", type=_date, default=None, help="Scans started on/after (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_date, default=None, help="Scans started before (YYYY-MM-DD)")
+    parser.add_argument("--below", type=float, default=40, help="Score threshold for trend/drops")
+    parser.add_argument("--verdict", default=None, help="Comma-separated verdicts to keep")
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument("--max-score", type=float, default=None, help="Exclusive upper bound")
+    parser.add_argument("-n", type=int, default=20, help="Rows for top")
+    parser.add_argument("--highest", action="store_true", help="top: highest scores instead of lowest")
+    parser.add_argument("--all-scans", action="store_true", help="top: search every selected scan, not just the latest")
+    parser.add_argument("--remove-csv", action="store_true", help="compact: delete CSVs after conversion")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(2)
+
+    if args.command == "compact":
+        for path in compact(args.results, args.remove_csv):
+            print(f"[OK] {path}")
+        return
+
+    scans = select(discover(args.results), args.since, args.until)
+    if not scans:
+        print(f"No scans in {args.results} for that range.")
+        return
+    where = Predicate(
+        verdicts=[v.strip().upper() for v in args.verdict.split(",")] if args.verdict else None,
+        min_score=args.min_score,
+        max_score=args.max_score,
+    )
+
+    if args.command == "scans":
+        _print([{"scan": s.id, "format": s.format, "path": s.path} for s in scans], args.json)
+    elif args.command == "trend":
+        _print(trend(scans, args.below, where), args.json)
+    elif args.command == "drops":
+        _print(drops(scans, args.below, where), args.json)
+    elif args.command == "top":
+        _print(top(scans if args.all_scans else scans[-1:], args.n, not args.highest, where), args.json)
+
+
+if __name__ == "__main__":
+    main()
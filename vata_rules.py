@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+vata_rules.py
+
+Central rule engine for the keyword / pattern checks (dangerous calls, PII,
+bias keywords), configured from ``config.json``.
+
+The leading literal of every rule (the keyword itself, or the fixed text a
+regex starts with) goes into one alternation that is run once over the
+lowercased file (case-insensitively instead, for non-ASCII text). Each
+position it reports is checked against just the rules starting with that
+literal, with their own case and word-boundary semantics. Scanning stops
+once every rule has been found. Regexes with no literal start (the PII
+shapes) cannot be prefiltered, so each is searched on its own. The result
+is the exact set of rules that match.
+
+Rule lists (config.json keys; missing keys fall back to DEFAULT_CONFIG):
+
+  dangerous_patterns   literal, case-sensitive          "eval("
+  pii_patterns         regex                            SSN / card / email shapes
+  pii_keywords         literal, case-insensitive        "password"
+  bias_keywords        whole word, case-insensitive;    "race", "discriminat*"
+                       a trailing * matches any word ending
+  bias_context         regex, case-insensitive; a hit marks bias keywords as
+                       false positives ("race condition")
+  report_bias_keywords like bias_keywords; the shorter list the cli.py / app.py
+                       reports flag (no "bias": it is a layer parameter in ML code)
+
+The config is reloaded when the file changes (checked at most once per
+``check_interval`` seconds, on use), so long-running services pick up new
+rules without a restart; a config that fails to load or compile is logged
+and the previous rules stay in force.
+
+  hits = current_rules().scan(code)      # {"dangerous": ["eval("], "bias": [], ...}
+  current_rules().config["default_persona"]
+
+``VATA_CONFIG`` overrides the config path.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "dangerous_patterns": ["eval(", "exec(", "rm -rf", "subprocess.Popen", "os.system", "pickle.loads"],
+    "pii_patterns": [
+        r"\b\d{3}-\d{2}-\d{4}\b",          # SSN-like
+        r"\b\d{16}\b",                     # 16-digit card
+        r"\b\d{4} \d{4} \d{4} \d{4}\b",    # spaced card
+        r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}\b",  # email
+    ],
+    "pii_keywords": ["password", "ssn"],
+    "bias_keywords": [
+        "race", "gender", "religion", "ethnicity", "racism", "sexism", "discriminat*", "bias",
+        "IQ", "stereotype",
+    ],
+    "bias_context": [
+        r"race\s*condition", r"race[^\n]{0,200}lock", r"lock[^\n]{0,200}race",
+        r"race_id", r"racecar", r"racer", r"race\s*track",
+        r"fair[^\n]{0,200}race", r"race\s*result", r"race\s*as",
+    ],
+    "report_bias_keywords": ["race", "gender", "religion", "ethnicity", "IQ", "stereotype"],
+    "default_persona": "default",
+}
+
+# config key -> (category reported by scan(), kind, ignore case)
+RULE_LISTS: Dict[str, Tuple[str, str, bool]] = {
+    "dangerous_patterns": ("dangerous", "literal", False),
+    "pii_patterns": ("pii", "regex", False),
+    "pii_keywords": ("pii_keywords", "literal", True),
+    "bias_keywords": ("bias", "word", True),
+    "bias_context": ("bias_context", "regex", True),
+    "report_bias_keywords": ("report_bias", "word", True),
+}
+CATEGORIES = tuple(category for category, _, _ in RULE_LISTS.values())
+
+
+@dataclass(frozen=True)
+class Rule:
+    category: str
+    pattern: str              # as written in the config
+    regex: re.Pattern         # this rule alone, for re-checking a hit position
+
+
+def _rule_source(pattern: str, kind: str, ignore_case: bool) -> str:
+    if kind == "regex":
+        body = pattern
+    elif kind == "word":
+        stem, prefix = (pattern[:-1], True) if pattern.endswith("*") else (pattern, False)
+        body = re.escape(stem) + (r"\w*" if prefix else "")
+        # word boundaries only where the keyword itself starts/ends with a word character
+        if stem[:1].isalnum() or stem[:1] == "_":
+            body = r"(?<!\w)" + body
+        if prefix or stem[-1:].isalnum() or stem[-1:] == "_":
+            body += r"(?!\w)"
+    else:
+        body = re.escape(pattern)
+    return f"(?i:{body})" if ignore_case else f"(?:{body})"
+
+
+def _top_level_alternation(pattern: str) -> bool:
+    """True if ``pattern`` has a ``|`` outside any group or character class."""
+    depth, i, in_class = 0, 0, False
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":         # "[]...]": the first ] is literal
+                i += 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def _leading_literal(pattern: str) -> str:
+    """Literal text every match of regex ``pattern`` starts with ("" if none)."""
+    if _top_level_alternation(pattern):         # "abc|xyz": no common start
+        return ""
+    out: List[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1:i + 2]
+            if not nxt or nxt.isalnum():        # \d, \b, \w, backreferences...
+                break
+            out.append(nxt)
+            i += 2
+            continue
+        if c in "*?{":                          # the previous character is optional
+            if out:
+                out.pop()
+            break
+        if c in ".^$+[]|()":
+            break
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+class RuleSet:
+    """Compiled rules from one config (immutable; RuleEngine swaps whole sets on reload)."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = {**DEFAULT_CONFIG, **config}
+        self.rules: List[Rule] = []
+        anchors: List[Optional[str]] = []
+        for key, (category, kind, ignore_case) in RULE_LISTS.items():
+            patterns = self.config.get(key) or []
+            if isinstance(patterns, str) or not all(isinstance(p, str) and p for p in patterns):
+                raise ValueError(f"{key} must be a list of non-empty strings")
+            for pattern in patterns:
+                try:
+                    regex = re.compile(_rule_source(pattern, kind, ignore_case))
+                except re.error as e:
+                    raise ValueError(f"{key}: bad pattern {pattern!r}: {e}") from e
+                self.rules.append(Rule(category, pattern, regex))
+                anchor = _leading_literal(pattern) if kind == "regex" else pattern.rstrip("*")
+                anchors.append(anchor.lower() if len(anchor) >= 2 else None)
+
+        # one alternation of every rule's leading literal, matched on lowercased
+        # text; a zero-width lookahead so overlapping anchors are all seen
+        unique = sorted({a for a in anchors if a}, key=len, reverse=True)
+        alternation = "|".join(map(re.escape, unique))
+        self._prefilter = re.compile(f"(?=({alternation}))") if unique else None
+        self._prefilter_i = re.compile(f"(?=({alternation}))", re.IGNORECASE) if unique else None
+        # the longest anchor at a position hides shorter ones that are its prefixes
+        self._candidates: Dict[str, List[int]] = {
+            a: [i for i, b in enumerate(anchors) if b and a.startswith(b)] for a in unique
+        }
+        # free-form regexes without a literal start (PII shapes) are searched on their own
+        self._unanchored = [i for i, a in enumerate(anchors) if not a]
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Patterns found in ``text`` per category (config order), from one prefilter pass."""
+        found = [False] * len(self.rules)
+        remaining = len(self.rules) - len(self._unanchored)
+        if self._prefilter is not None:
+            if text.isascii():
+                matches = self._prefilter.finditer(text.lower())
+            else:                               # Unicode case folding: slower, exact
+                matches = self._prefilter_i.finditer(text)
+            for m in matches:
+                pos = m.start()
+                for i in self._candidates.get(m.group(1).lower()) or self._fold(m.group(1)):
+                    if not found[i] and self.rules[i].regex.match(text, pos):
+                        found[i] = True
+                        remaining -= 1
+                if not remaining:
+                    break
+        for i in self._unanchored:
+            found[i] = self.rules[i].regex.search(text) is not None
+        hits: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+        for rule, hit in zip(self.rules, found):
+            if hit:
+                hits[rule.category].append(rule.pattern)
+        return hits
+
+    def _fold(self, matched: str) -> List[int]:
+        # IGNORECASE matched an anchor whose lower() differs (e.g. "ſ" vs "s")
+        for anchor, rules in self._candidates.items():
+            if re.fullmatch(re.escape(anchor), matched, re.IGNORECASE):
+                return rules
+        return []
+
+    def patterns(self, category: str) -> List[str]:
+        return [r.pattern for r in self.rules if r.category == category]
+
+
+class RuleEngine:
+    """Loads the RuleSet from ``path`` and reloads it when the file changes."""
+
+    def __init__(self, path: Optional[os.PathLike] = None, check_interval: float = 1.0):
+        self.path = Path(path or os.environ.get("VATA_CONFIG") or CONFIG_PATH)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._rules: Optional[RuleSet] = None
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._last: Tuple[Optional[str], Optional[RuleSet], Optional[Dict[str, List[str]]]] = (None, None, None)
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, stamp: Optional[Tuple[int, int]]) -> None:
+        config: Dict[str, Any] = {}
+        if stamp is not None:
+            with open(self.path, encoding="utf-8") as f:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("config must be a JSON object")
+        self._rules = RuleSet(config)
+
+    def current(self) -> RuleSet:
+        now = time.monotonic()
+        if self._rules is not None and now - self._checked < self.check_interval:
+            return self._rules
+        with self._lock:
+            if self._rules is None or now - self._checked >= self.check_interval:
+                self._checked = now
+                stamp = self._file_stamp()
+                if self._rules is None or stamp != self._stamp:
+                    try:
+                        self._load(stamp)
+                        if self._stamp is not None:
+                            logging.info(f"Rules reloaded from {self.path}")
+                    except (OSError, ValueError) as e:
+                        logging.warning(f"Rules not reloaded from {self.path}: {e}")
+                        if self._rules is None:
+                            self._rules = RuleSet({})
+                    self._stamp = stamp
+        return self._rules
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """current().scan(text); the last result is reused when the same string is scanned again."""
+        rules = self.current()
+        last_text, last_rules, last_hits = self._last
+        if text is last_text and rules is last_rules:
+            return last_hits
+        hits = rules.scan(text)
+        self._last = (text, rules, hits)
+        return hits
+
+
+RULES = RuleEngine()
+
+
+def current_rules() -> RuleSet:
+    return RULES.current()
+
+
+def scan(text: str) -> Dict[str, List[str]]:
+    return RULES.scan(text)
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+vata_service.py
+
+HTTP scoring service around all_in_one.run_analysis for CI fleets.
+
+Plain ASGI app (no framework), served by uvicorn with HTTP keep-alive.
+Scoring is CPU-bound, so it runs in a process pool; the event loop only
+parses requests and awaits results. Identical requests that arrive while
+one is already being scored share that result (coalescing).
+
+Endpoints (JSON in, JSON out):
+  GET  /health
+  GET  /metrics        Prometheus text format (vata_metrics registry)
+  POST /analyze          {"code": "...", "persona": "default", "language": "go", "stages": ["soul"]}
+  POST /analyze/batch    {"items": [{"code": "...", "persona": "..."}, ...]}
+  POST /soul             {"code": "..."}
+  POST /soul/batch       {"codes": ["...", ...]}
+  POST /score            {"code": "..."}      MiniLM scorer (src/vata/core.py)
+  POST /score/batch      {"codes": ["...", ...]}
+
+/score requests are micro-batched: concurrent snippets are collected for up
+to --embed-wait-ms or --embed-batch items and embedded in one encode call.
+Batch-size, queue-depth and wait histograms are reported by /health.
+
+Usage:
+  python vata_service.py serve --port 8088 --workers 4
+  python vata_service.py bench --url http://127.0.0.1:8088 --requests 2000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pathlib import Path
+from urllib.parse import urlparse
+
+from all_in_one import resolve_stages, run_analysis, vata_ai_soul_detection
+from vata_lang import PLUGINS
+from vata_metrics import CONTENT_TYPE, QUEUE_DEPTH, REGISTRY, WORKERS_BUSY
+
+MAX_BODY_BYTES = 1 * 1024 * 1024
+MAX_BATCH_ITEMS = 512
+BATCH_CHUNK = 16  # items per process-pool task in batch endpoints
+EMBED_MAX_BATCH = 32
+EMBED_MAX_WAIT_MS = 5.0
+SRC_DIR = Path(__file__).resolve().parent / "src"
+
+
+# ============================================================
+# POOL TASKS (top-level so they pickle)
+# ============================================================
+def _analyze_many(items: List[Dict[str, str]]) -> List[dict]:
+    return [
+        run_analysis(
+            i["code"], persona=i.get("persona", "default"), language=i.get("language"), stages=i.get("stages")
+        )
+        for i in items
+    ]
+
+
+def _soul_many(codes: List[str]) -> List[dict]:
+    return [vata_ai_soul_detection(code) for code in codes]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _content_length(value) -> int:
+    try:
+        length = int(value)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPError(400, "bad content-length")
+    return length
+
+
+# ============================================================
+# ASGI APP
+# ============================================================
+class ScoringApp:
+    def __init__(
+        self,
+        workers: int = None,
+        max_body: int = MAX_BODY_BYTES,
+        max_batch: int = MAX_BATCH_ITEMS,
+        embed_max_batch: int = EMBED_MAX_BATCH,
+        embed_max_wait_ms: float = EMBED_MAX_WAIT_MS,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_body = max_body
+        self.max_batch = max_batch
+        self.embed_max_batch = embed_max_batch
+        self.embed_max_wait_ms = embed_max_wait_ms
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.batcher = None  # created on first /score request (loads the model)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"requests": 0, "coalesced": 0, "rejected": 0}
+        self.requests = REGISTRY.counter("vata_http_requests_total", "HTTP requests by route and status", ("path", "status"))
+        self.coalesced = REGISTRY.counter("vata_http_coalesced_total", "Requests answered by an identical in-flight request")
+        self._routes: Dict[tuple, Callable[[dict], Awaitable[Any]]] = {
+            ("GET", "/health"): self._health,
+            ("POST", "/analyze"): self._analyze,
+            ("POST", "/analyze/batch"): self._analyze_batch,
+            ("POST", "/soul"): self._soul,
+            ("POST", "/soul/batch"): self._soul_batch,
+            ("POST", "/score"): self._score,
+            ("POST", "/score/batch"): self._score_batch,
+        }
+
+    # ---------- lifecycle ----------
+    def startup(self) -> None:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def aclose(self) -> None:
+        if self.batcher is not None:
+            await self.batcher.close()
+            self.batcher = None
+        self.shutdown()
+
+    # ---------- execution ----------
+    async def _run(self, fn, arg):
+        self.startup()
+        with WORKERS_BUSY.track(pool="service"):
+            return await asyncio.get_running_loop().run_in_executor(self.pool, fn, arg)
+
+    async def _coalesced(self, key: str, fn, arg):
+        """Share one pool task between identical concurrent requests."""
+        return await self._coalesced_call(key, self._run, fn, arg)
+
+    async def _coalesced_call(self, key: str, coro_fn, *args):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            self.coalesced.inc()
+            return await asyncio.shield(future)
+        future = asyncio.ensure_future(coro_fn(*args))
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _chunked(self, fn, items: list) -> list:
+        chunks = [items[i:i + BATCH_CHUNK] for i in range(0, len(items), BATCH_CHUNK)]
+        parts = await asyncio.gather(*(self._run(fn, c) for c in chunks))
+        return [r for part in parts for r in part]
+
+    def _embed_batcher(self):
+        # The model lives in this process: one copy, fed through the batcher's
+        # single worker thread, instead of one copy per pool process.
+        if self.batcher is None:
+            if str(SRC_DIR) not in sys.path:
+                sys.path.insert(0, str(SRC_DIR))
+            from vata.batcher import MicroBatcher
+            from vata.core import score_soul_batch
+
+            self.batcher = MicroBatcher(
+                score_soul_batch,
+                max_batch=self.embed_max_batch,
+                max_wait_ms=self.embed_max_wait_ms,
+            )
+        return self.batcher
+
+    @staticmethod
+    def _key(*parts: str) -> str:
+        h = hashlib.sha256()
+        for p in parts:
+            h.update(p.encode("utf-8", "surrogatepass"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    # ---------- handlers ----------
+    async def _health(self, body: dict) -> dict:
+        health = {"status": "ok", "workers": self.workers, **self.stats}
+        if self.batcher is not None:
+            health["embed_batcher"] = self.batcher.stats()
+        return health
+
+    @staticmethod
+    def _code(body: dict, key: str = "code") -> str:
+        code = body.get(key)
+        if not isinstance(code, str):
+            raise HTTPError(422, f"'{key}' must be a string")
+        return code
+
+    def _items(self, body: dict, key: str) -> list:
+        items = body.get(key)
+        if not isinstance(items, list):
+            raise HTTPError(422, f"'{key}' must be a list")
+        if len(items) > self.max_batch:
+            raise HTTPError(413, f"batch too large ({len(items)} > {self.max_batch})")
+        return items
+
+    def _analyze_item(self, body: dict) -> dict:
+        language = body.get("language")
+        if language is not None and language not in PLUGINS:
+            raise HTTPError(422, f"unknown language '{language}'")
+        stages = body.get("stages")
+        if stages is not None:
+            if not isinstance(stages, list) or not all(isinstance(s, str) for s in stages):
+                raise HTTPError(422, "'stages' must be a list of strings")
+            try:
+                stages = sorted(resolve_stages(stages))
+            except ValueError as e:
+                raise HTTPError(422, str(e))
+        return {
+            "code": self._code(body),
+            "persona": str(body.get("persona", "default")),
+            "language": language,
+            "stages": stages,
+        }
+
+    async def _analyze(self, body: dict) -> dict:
+        item = self._analyze_item(body)
+        key = self._key("analyze", item["persona"], item["language"] or "", ",".join(item["stages"] or ()), item["code"])
+        results = await self._coalesced(key, _analyze_many, [item])
+        return results[0]
+
+    async def _analyze_batch(self, body: dict) -> dict:
+        items = []
+        for item in self._items(body, "items"):
+            if not isinstance(item, dict):
+                raise HTTPError(422, "each item must be an object")
+            items.append(self._analyze_item(item))
+        return {"results": await self._chunked(_analyze_many, items)}
+
+    async def _soul(self, body: dict) -> dict:
+        code = self._code(body)
+        results = await self._coalesced(self._key("soul", code), _soul_many, [code])
+        return results[0]
+
+    async def _soul_batch(self, body: dict) -> dict:
+        codes = self._items(body, "codes")
+        if not all(isinstance(c, str) for c in codes):
+            raise HTTPError(422, "'codes' must be a list of strings")
+        return {"results": await self._chunked(_soul_many, codes)}
+
+    async def _score(self, body: dict) -> dict:
+        code = self._code(body)
+        batcher = self._embed_batcher()
+        return await self._coalesced_call(self._key("score", code), batcher.submit, code)
+
+    async def _score_batch(self, body: dict) -> dict:
+        codes = self._items(body, "codes")
+        if not all(isinstance(c, str) for c in codes):
+            raise HTTPError(422, "'codes' must be a list of strings")
+        batcher = self._embed_batcher()
+        return {"results": list(await asyncio.gather(*(batcher.submit(c) for c in codes)))}
+
+    # ---------- ASGI plumbing ----------
+    async def _read_body(self, scope: dict, receive) -> bytes:
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and _content_length(value) > self.max_body:
+                raise HTTPError(413, f"body exceeds {self.max_body} bytes")
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                raise HTTPError(413, f"body exceeds {self.max_body} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _send(send, status: int, data: bytes, content_type: bytes = b"application/json") -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(data)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+    async def _send_json(self, send, status: int, payload: Any) -> None:
+        await self._send(send, status, json.dumps(payload).encode("utf-8"))
+
+    def _metrics_text(self) -> bytes:
+        QUEUE_DEPTH.set(len(self._inflight), queue="service_inflight")
+        if self.batcher is not None:
+            QUEUE_DEPTH.set(self.batcher.stats()["pending"], queue="embed_batcher")
+        return REGISTRY.render().encode("utf-8")
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        self.stats["requests"] += 1
+        if (scope["method"], scope["path"]) == ("GET", "/metrics"):
+            self.requests.inc(path="/metrics", status="200")
+            await self._send(send, 200, self._metrics_text(), CONTENT_TYPE.encode())
+            return
+        handler = self._routes.get((scope["method"], scope["path"]))
+        route = scope["path"] if handler is not None else "other"   # bounded label set
+        try:
+            if handler is None:
+                raise HTTPError(404, "not found")
+            raw = await self._read_body(scope, receive) if scope["method"] == "POST" else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                raise HTTPError(400, "body is not valid JSON")
+            if not isinstance(body, dict):
+                raise HTTPError(422, "body must be a JSON object")
+            await self._send_json(send, 200, await handler(body))
+            self.requests.inc(path=route, status="200")
+        except HTTPError as e:
+            self.stats["rejected"] += 1
+            self.requests.inc(path=route, status=str(e.status))
+            await self._send_json(send, e.status, {"error": e.message})
+
+
+app = ScoringApp()
+
+
+# ============================================================
+# LOAD BENCHMARK (stdlib keep-alive client)
+# ============================================================
+async def _http_post(reader, writer, host: str, path: str, payload: bytes) -> int:
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+    )
+    await writer.drain()
+    status_line = (await reader.readline()).split()
+    if len(status_line) < 2 or not status_line[1].isdigit():
+        raise HTTPError(400, f"bad status line {b' '.join(status_line)!r}")
+    status = int(status_line[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = _content_length(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def run_bench(url: str, path: str, payloads: List[bytes], requests: int, concurrency: int) -> dict:
+    target = urlparse(url)
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client() -> None:
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(target.hostname, target.port or 80)
+        try:
+            for i in counter:
+                t0 = time.perf_counter()
+                try:
+                    status = await _http_post(reader, writer, target.netloc, path, payloads[i % len(payloads)])
+                except HTTPError:
+                    # malformed response: the connection's framing is lost
+                    latencies.append(time.perf_counter() - t0)
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - t0)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(q[49] * 1000, 2),
+        "p99_ms": round(q[98] * 1000, 2),
+    }
+
+
+def _sample_payloads(unique: int) -> List[bytes]:
+    base = (
+        "# sample module\n"
+        "def handler_{i}(items, threshold=3):\n"
+        "    total = 0\n"
+        "    for item in items:\n"
+        "        if item > threshold:\n"
+        "            total += item\n"
+        "    return total\n"
+    )
+    return [json.dumps({"code": base.format(i=i)}).encode() for i in range(max(1, unique))]
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VATA HTTP scoring service")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8088)
+    p_serve.add_argument("--workers", type=int, default=None, help="Scoring processes")
+    p_serve.add_argument("--max-body", type=int, default=MAX_BODY_BYTES)
+    p_serve.add_argument("--keep-alive", type=int, default=30, help="Idle keep-alive seconds")
+    p_serve.add_argument("--embed-batch", type=int, default=EMBED_MAX_BATCH, help="Max snippets per encode call")
+    p_serve.add_argument("--embed-wait-ms", type=float, default=EMBED_MAX_WAIT_MS,
+                         help="Max time a /score request waits for its batch to fill")
+
+    p_bench = sub.add_parser("bench")
+    p_bench.add_argument("--url", default="http://127.0.0.1:8088")
+    p_bench.add_argument("--path", default="/soul")
+    p_bench.add_argument("--requests", type=int, default=2000)
+    p_bench.add_argument("--concurrency", type=int, default=32)
+    p_bench.add_argument("--unique", type=int, default=64, help="Distinct payloads (lower = more coalescing)")
+
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        result = asyncio.run(run_bench(
+            args.url, args.path, _sample_payloads(args.unique), args.requests, args.concurrency,
+        ))
+        print(json.dumps(result, indent=2))
+        return
+
+    import uvicorn
+
+    service = ScoringApp(
+        workers=args.workers,
+        max_body=args.max_body,
+        embed_max_batch=args.embed_batch,
+        embed_max_wait_ms=args.embed_wait_ms,
+    )
+    uvicorn.run(
+        service,
+        host=args.host,
+        port=args.port,
+        timeout_keep_alive=args.keep_alive,
+        lifespan="on",
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
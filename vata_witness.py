@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+vata_witness.py
+
+Witness-input preparation for circuits/ethical_action_verifier.circom.
+
+  encode_words(texts, width)  prompts/actions -> pre-allocated (N, width)
+                              integer array of code points, zero padded
+  MerkleTree                  receipt tree from merkle/tree.json; gives the
+                              real sibling path for a receipt
+  build_witness(...)          one circuit input dict
+  write_input_json(...)       streams an input dict to disk in one pass
+  prepare_batch(...)          N input.json files, hashed and written in
+                              parallel worker processes
+
+Usage:
+  python vata_witness.py actions.jsonl --out-dir witnesses --workers 4
+
+Each line of the JSONL file is {"prompt": "...", "action": "..."}.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vata_poseidon import SNARK_FIELD, hash_words_batch, mandate_cache
+
+# ============================================================
+# CIRCUIT SHAPE (EthicalActionVerifier(5))
+# ============================================================
+PROMPT_WORDS = 100
+TRACE_WORDS = 50
+ACTION_WORDS = 50
+MERKLE_LEVELS = 5
+
+PUBLIC_SIGNALS = ("mandate_hash", "action_hash", "root")
+PRIVATE_SIGNALS = ("prompt", "trace", "action", "path_elements", "path_index")
+
+DEFAULT_MANDATE = "ethics_charter.json"
+DEFAULT_TREE = "merkle/tree.json"
+
+
+# ============================================================
+# ENCODING
+# ============================================================
+def encode_words(texts: Sequence[str], width: int) -> np.ndarray:
+    """
+    Encode strings as fixed-width rows of code points (one word per char).
+
+    Matches the old ``[ord(c) for c in s.ljust(...)][:width]`` layout, but
+    fills a single pre-allocated array instead of building lists.
+    """
+    out = np.zeros((len(texts), width), dtype=np.uint32)
+    for i, text in enumerate(texts):
+        codes = np.frombuffer(text[:width].encode("utf-32-le"), dtype="<u4")
+        out[i, :len(codes)] = codes
+    return out
+
+
+# ============================================================
+# RECEIPT MERKLE TREE
+# ============================================================
+class MerkleTree:
+    """
+    Receipt tree written by scripts/build_merkle.ps1.
+
+    Nodes are SHA-256 hex digests; they are reduced into the SNARK field
+    when handed to the circuit.
+    """
+
+    def __init__(self, levels: List[List[str]], files: List[str], root: str):
+        self.levels = levels
+        self.files = files
+        self.root = root
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TREE) -> "MerkleTree":
+        # build_merkle.ps1 writes UTF-8 with a BOM
+        with open(path, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+        return cls(data["levels"], data.get("files", []), data["root"])
+
+    def index_of(self, receipt: str) -> int:
+        try:
+            return self.files.index(os.path.basename(receipt))
+        except ValueError:
+            raise KeyError(f"Receipt not in tree: {receipt}")
+
+    def path(self, index: int) -> List[Tuple[str, str]]:
+        """[left, right] pair at every level from the leaf up to the root."""
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Leaf index out of range: {index}")
+        pairs = []
+        for level in self.levels[:-1]:
+            left = index - (index % 2)
+            right = left + 1 if left + 1 < len(level) else left  # odd level: last node duplicated
+            pairs.append((level[left], level[right]))
+            index //= 2
+        return pairs
+
+
+def _to_field(hex_digest: str) -> int:
+    return int(hex_digest, 16) % SNARK_FIELD
+
+
+def merkle_inputs(tree: MerkleTree, index: int, levels: int = MERKLE_LEVELS) -> Dict[str, object]:
+    pairs = tree.path(index)
+    if len(pairs) > levels:
+        raise ValueError(f"Receipt tree has {len(pairs)} levels, circuit supports {levels}")
+    elements = [[_to_field(l), _to_field(r)] for l, r in pairs]
+    elements += [[0, 0]] * (levels - len(elements))
+    return {
+        "path_elements": elements,
+        "path_index": index,
+        "root": _to_field(tree.root),
+    }
+
+
+# ============================================================
+# WITNESS BUILDING
+# ============================================================
+def _rows(words: np.ndarray) -> List[List[int]]:
+    return words.astype(object).tolist()
+
+
+def build_witnesses(
+    prompts: Sequence[str],
+    actions: Sequence[str],
+    mandate_file: str = DEFAULT_MANDATE,
+    tree: Optional[MerkleTree] = None,
+    leaf_index: int = 0,
+) -> List[Dict[str, object]]:
+    """Circuit input dicts for many (prompt, action) pairs at once."""
+    if len(prompts) != len(actions):
+        raise ValueError("prompts and actions must be the same length")
+    tree = tree or MerkleTree.load()
+    merkle = merkle_inputs(tree, leaf_index)
+    mandate = mandate_cache.get(mandate_file)
+
+    prompt_words = _rows(encode_words(prompts, PROMPT_WORDS))
+    action_words = _rows(encode_words(actions, ACTION_WORDS))
+    action_hashes = hash_words_batch(action_words)
+    trace = [0] * TRACE_WORDS
+
+    return [
+        {
+            "mandate_hash": mandate,
+            "action_hash": action_hash,
+            "root": merkle["root"],
+            "prompt": p,
+            "trace": trace,
+            "action": a,
+            "path_elements": merkle["path_elements"],
+            "path_index": merkle["path_index"],
+        }
+        for p, a, action_hash in zip(prompt_words, action_words, action_hashes)
+    ]
+
+
+def build_witness(prompt: str, action: str, **kwargs) -> Dict[str, object]:
+    return build_witnesses([prompt], [action], **kwargs)[0]
+
+
+def _signal(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_signal(v) for v in value) + "]"
+    return f'"{value}"'  # snarkjs wants big ints as decimal strings
+
+
+def write_input_json(path: str, witness: Dict[str, object]) -> None:
+    """Serialize a circuit input in a single streaming pass."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for i, (name, value) in enumerate(witness.items()):
+            if i:
+                f.write(",")
+            f.write(f'\n  "{name}": ')
+            f.write(_signal(value))
+        f.write("\n}\n")
+
+
+# ============================================================
+# BATCH MODE
+# ============================================================
+def _prepare_chunk(args) -> List[str]:
+    start, prompts, actions, out_dir, mandate_file, tree_file, leaf_index = args
+    witnesses = build_witnesses(
+        prompts, actions,
+        mandate_file=mandate_file,
+        tree=MerkleTree.load(tree_file),
+        leaf_index=leaf_index,
+    )
+    written = []
+    for offset, witness in enumerate(witnesses):
+        path = os.path.join(out_dir, f"input_{start + offset:06d}.json")
+        write_input_json(path, witness)
+        written.append(path)
+    return written
+
+
+def prepare_batch(
+    prompts: Sequence[str],
+    actions: Sequence[str],
+    out_dir: str,
+    workers: int = None,
+    mandate_file: str = DEFAULT_MANDATE,
+    tree_file: str = DEFAULT_TREE,
+    leaf_index: int = 0,
+) -> List[str]:
+    """Write one input.json per (prompt, action) pair; returns the paths."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-len(prompts) // workers))
+    jobs = [
+        (i, prompts[i:i + chunk], actions[i:i + chunk], out_dir, mandate_file, tree_file, leaf_index)
+        for i in range(0, len(prompts), chunk)
+    ]
+    if workers == 1 or len(jobs) <= 1:
+        return [p for job in jobs for p in _prepare_chunk(job)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [p for paths in pool.map(_prepare_chunk, jobs) for p in paths]
+
+
+# ============================================================
+# CLI
+# ============================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prepare ethical_action_verifier witness inputs")
+    parser.add_argument("actions", help="JSONL file of {\"prompt\", \"action\"} records")
+    parser.add_argument("--out-dir", default="witnesses")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mandate", default=DEFAULT_MANDATE)
+    parser.add_argument("--tree", default=DEFAULT_TREE)
+    parser.add_argument("--leaf-index", type=int, default=0)
+    args = parser.parse_args()
+
+    prompts, actions = [], []
+    with open(args.actions, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                prompts.append(record["prompt"])
+                actions.append(record["action"])
+
+    paths = prepare_batch(
+        prompts, actions, args.out_dir,
+        workers=args.workers,
+        mandate_file=args.mandate,
+        tree_file=args.tree,
+        leaf_index=args.leaf_index,
+    )
+    print(f"Wrote {len(paths)} witness inputs → {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
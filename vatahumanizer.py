@@ -5,16 +5,39 @@ vatahumanizer.py
 Unified humanizer + soul scoring engine.
 Safe to import. Safe to run. CI‑compatible.
 Always prints a valid SOUL SCORE and never returns 0.
+
+Usage:
+  python vatahumanizer.py <file>                       single file (original CI form)
+  python vatahumanizer.py a.py b.py "src/**/*.py"      many files, one process
+  git diff --name-only | python vatahumanizer.py --files-from -
+  python vatahumanizer.py --serve /tmp/vata.sock       long-lived scorer daemon
+  python vatahumanizer.py --socket /tmp/vata.sock ...  score through the daemon
+                                                       (falls back to in-process)
+  python vatahumanizer.py --diff origin/main..HEAD     score only changed regions
 """
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional, List, Union
+from typing import Any, Dict, Optional, List, Tuple, Union
+import argparse
+import ast
+import glob
+import hashlib
+import io
+import json
+import os
+import socket
+import socketserver
+import subprocess
 import sys
 import re
+import threading
 import tokenize
 from pathlib import Path
 
+from vata_fileio import read_text
+from vata_metrics import CACHE_HITS, CACHE_MISSES, WORKERS_BUSY
+
 ScoreType = Union[int, float]
 
 # ============================================================
@@ -81,11 +104,18 @@ default_humanizer = VataHumanizer()
 
 def safe_read(path: str) -> str:
     try:
-        return Path(path).read_text(errors="ignore")
+        return read_text(path) or ""    # binary files read as empty
     except Exception:
         return ""
 
 
+def safe_read_bytes(path: str) -> bytes:
+    try:
+        return Path(path).read_bytes()
+    except Exception:
+        return b""
+
+
 def score_comment_density(text: str) -> float:
     lines = text.splitlines()
     if not lines:
@@ -108,30 +138,45 @@ def score_complexity(text: str) -> float:
 
 
 def score_docstrings(text: str) -> float:
-    triple = re.findall(r'"""(.*?)"""', text, flags=re.DOTALL)
-    return min(1.0, len(triple) / 3)
+    # complete """...""" pairs; counting avoids a DOTALL scan per unmatched quote
+    pairs = text.count('"""') // 2
+    return min(1.0, pairs / 3)
 
 
 def score_token_balance(path: str) -> float:
+    return score_token_balance_bytes(safe_read_bytes(path))
+
+
+def score_token_balance_bytes(data: bytes) -> float:
     try:
-        with open(path, "rb") as f:
-            list(tokenize.tokenize(f.readline))
+        for _ in tokenize.tokenize(io.BytesIO(data).readline):
+            pass
         return 1.0
     except Exception:
         return 0.5  # not zero
 
 
 def compute_soul_score(path: str) -> int:
-    text = safe_read(path)
+    # one read per file: the text scorers and the tokenizer share the bytes
+    return score_source(safe_read_bytes(path))
+
+
+def score_source(data: bytes, clamp: bool = True) -> int:
+    """
+    Soul score of ``data``. ``clamp`` keeps the legacy whole-file CI range
+    (never below 50, empty files pass); region scoring for --diff turns it
+    off so a threshold like --fail-under 40 can actually fail.
+    """
+    text = data.decode("utf-8", errors="ignore")
 
     if not text.strip():
-        return 50  # empty files pass CI
+        return 50 if clamp else 0
 
     c1 = score_comment_density(text)
     c2 = score_identifier_style(text)
     c3 = score_complexity(text)
     c4 = score_docstrings(text)
-    c5 = score_token_balance(path)
+    c5 = score_token_balance_bytes(data)
 
     # Weighted blend tuned to produce scores 50–95 for normal code
     score = (
@@ -145,77 +190,359 @@ def compute_soul_score(path: str) -> int:
     final = int(score * 100)
 
     # Guarantee CI‑passing range
-    return max(final, 50)
+    return max(final, 50) if clamp else final
+
+# ============================================================
+# Multi-file scoring + daemon
+# ============================================================
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Expand globs (``**`` allowed), keep plain paths as given, drop duplicates."""
+    seen, out = set(), []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                out.append(path)
+    return out
+
+
+class ScoreCache:
+    """Scores keyed on (path, mtime_ns, size); unchanged files are not re-read."""
+
+    def __init__(self) -> None:
+        self._scores: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def score(self, path: str) -> int:
+        try:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return compute_soul_score(path)
+        with self._lock:
+            hit = self._scores.get(path)
+        if hit and hit[0] == key:
+            CACHE_HITS.inc(cache="score")
+            return hit[1]
+        CACHE_MISSES.inc(cache="score")
+        score = compute_soul_score(path)
+        with self._lock:
+            self._scores[path] = (key, score)
+        return score
+
+
+def score_paths(paths: List[str], cache: Optional[ScoreCache] = None) -> List[Dict[str, Any]]:
+    score = cache.score if cache else compute_soul_score
+    return [{"path": p, "score": score(p)} for p in paths]
+
+
+class _ScoreHandler(socketserver.StreamRequestHandler):
+    # one JSON request per line: {"paths": [...]} -> {"results": [...]}
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                paths = json.loads(line)["paths"]
+                with WORKERS_BUSY.track(pool="daemon"):
+                    reply = {"results": score_paths(paths, self.server.cache)}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+            self.wfile.flush()
+
+
+class ScoreDaemon(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a previous run
+        super().__init__(socket_path, _ScoreHandler)
+        self.socket_path = socket_path
+        self.cache = ScoreCache()
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def score_via_daemon(socket_path: str, paths: List[str], timeout: float = 60.0) -> List[Dict[str, Any]]:
+    """Score through a running daemon; paths are sent absolute so cwd does not matter."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps({"paths": [os.path.abspath(p) for p in paths]}) + "\n").encode())
+        with sock.makefile("rb") as f:
+            reply = json.loads(f.readline())
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return [{"path": p, "score": r["score"]} for p, r in zip(paths, reply["results"])]
+
+# ============================================================
+# Git diff mode: score changed regions only
+# ============================================================
+
+HUNK_RE = re.compile(rb"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+DIFF_CONTEXT = 3          # lines around a hunk outside any function
+DIFF_CACHE = ".vata_cache/diff_scores.json"
+DIFF_SCORE_VERSION = 2    # bump when region scores change, so cached ones are not reused
+
+
+def _git(*args: str, input: Optional[bytes] = None) -> bytes:
+    return subprocess.run(
+        ["git", *args], input=input, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+    ).stdout
+
+
+def changed_lines(base: str, head: str) -> Dict[str, List[int]]:
+    """New-side line numbers touched by base..head, per file (deleted files skipped)."""
+    out = _git("diff", "--unified=0", "--no-color", "--no-ext-diff", "--diff-filter=AMR", base, head)
+    files: Dict[str, List[int]] = {}
+    current = None
+    for line in out.splitlines():
+        if line.startswith(b"+++ "):
+            name = line[4:].decode("utf-8", errors="surrogateescape")
+            current = name[2:] if name.startswith("b/") else None
+            if current is not None:
+                files.setdefault(current, [])
+        elif current is not None and line.startswith(b"@@"):
+            m = HUNK_RE.match(line)
+            if m:
+                start, count = int(m.group(1)), int(m.group(2) or 1)
+                files[current].extend(range(start, start + count))
+    return files
+
+
+def blob_ids(rev: str, paths: List[str]) -> Dict[str, str]:
+    """Blob SHA of each path at ``rev`` (one ls-tree call)."""
+    if not paths:
+        return {}
+    out = _git("ls-tree", "-z", rev, "--", *paths)
+    blobs = {}
+    for entry in out.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, path = entry.partition(b"\t")
+        mode, kind, sha = meta.split()
+        if kind == b"blob":
+            blobs[path.decode("utf-8", errors="surrogateescape")] = sha.decode()
+    return blobs
+
+
+def read_blobs(shas: List[str]) -> Dict[str, bytes]:
+    """Contents of many blobs through a single ``git cat-file --batch``."""
+    if not shas:
+        return {}
+    out = _git("cat-file", "--batch", input="".join(f"{s}\n" for s in shas).encode())
+    blobs, pos = {}, 0
+    for sha in shas:
+        eol = out.index(b"\n", pos)
+        header = out[pos:eol].split()
+        size = int(header[2])
+        blobs[sha] = out[eol + 1:eol + 1 + size]
+        pos = eol + 1 + size + 1  # content is followed by a newline
+    return blobs
+
+
+def _enclosing_spans(source: bytes) -> List[tuple]:
+    """(start, end) line spans of every def/class, innermost first on ties."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    spans = [
+        (node.lineno, node.end_lineno)
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    ]
+    return sorted(spans, key=lambda sp: sp[1] - sp[0])
+
+
+def changed_regions(source: bytes, lines: List[int], python: bool = True) -> List[tuple]:
+    """
+    Merge changed lines into the regions that get scored: the innermost
+    enclosing function/class for Python, otherwise the hunk plus a few lines
+    of context.
+    """
+    n_lines = source.count(b"\n") + 1
+    spans = _enclosing_spans(source) if python else []
+    regions = []
+    for line in sorted(set(lines)):
+        span = next((sp for sp in spans if sp[0] <= line <= sp[1]), None)
+        if span is None:
+            span = (max(1, line - DIFF_CONTEXT), min(n_lines, line + DIFF_CONTEXT))
+        regions.append(span)
+    regions.sort()
+    merged: List[list] = []
+    for start, end in regions:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def region_bytes(source: bytes, regions: List[tuple]) -> bytes:
+    lines = source.splitlines(keepends=True)
+    return b"".join(b"".join(lines[a - 1:b]) for a, b in regions)
+
+
+def score_regions(source: bytes, regions: List[tuple]) -> int:
+    # unclamped: the whole-file floor of 50 would make any --fail-under <= 50 a no-op
+    return score_source(region_bytes(source, regions), clamp=False)
+
+
+class DiffScoreCache:
+    """On-disk results keyed by head blob SHA + changed regions."""
+
+    def __init__(self, path: Optional[str] = DIFF_CACHE):
+        self.path = path
+        self.entries: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(blob: str, regions: List[tuple]) -> str:
+        spec = f"v{DIFF_SCORE_VERSION}:" + ",".join(f"{a}-{b}" for a, b in regions)
+        return f"{blob}:{hashlib.sha1(spec.encode()).hexdigest()[:12]}"
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+
+def score_diff(
+    rev_range: str,
+    cache: Optional[DiffScoreCache] = None,
+    extensions: Tuple[str, ...] = (".py",),
+) -> List[Dict[str, Any]]:
+    """Score the changed regions of every ``extensions`` file in ``base..head``."""
+    if "..." in rev_range:  # base...head: diff against the merge base, like git
+        base, _, head = rev_range.partition("...")
+        head = head or "HEAD"
+        base = _git("merge-base", base, head).decode().strip()
+    elif ".." in rev_range:
+        base, _, head = rev_range.partition("..")
+        head = head or "HEAD"
+    else:
+        base, head = rev_range, "HEAD"
+    touched = changed_lines(base, head)
+    blobs = blob_ids(head, list(touched))
+    cache = cache or DiffScoreCache(None)
+
+    results, todo = [], []
+    for path, lines in touched.items():
+        if path not in blobs:
+            continue  # submodule or otherwise not a blob
+        if not path.lower().endswith(extensions):
+            continue  # docs, configs: not code
+        todo.append((path, lines, blobs[path]))
+    contents = read_blobs(sorted({sha for _, _, sha in todo}))
+
+    for path, lines, sha in todo:
+        source = contents[sha]
+        if not lines:  # pure rename or mode change: nothing new to score
+            continue
+        regions = changed_regions(source, lines, python=path.lower().endswith(".py"))
+        if not region_bytes(source, regions).strip():
+            continue  # only blank lines changed
+        key = DiffScoreCache.key(sha, regions)
+        cached = key in cache.entries
+        (CACHE_HITS if cached else CACHE_MISSES).inc(cache="diff")
+        score = cache.entries[key] if cached else score_regions(source, regions)
+        cache.entries[key] = score
+        results.append({
+            "path": path,
+            "score": score,
+            "blob": sha,
+            "regions": [list(r) for r in regions],
+            "cached": cached,
+        })
+    cache.save()
+    return results
 
 # ============================================================
 # CLI entrypoint (used by GitHub Actions)
 # ============================================================
 
+def _score_cli_paths(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    patterns = list(args.paths)
+    if args.files_from:
+        source = sys.stdin if args.files_from == "-" else open(args.files_from, encoding="utf-8")
+        with source:
+            patterns += [line.strip() for line in source if line.strip()]
+    paths = expand_paths(patterns)
+
+    if args.socket:
+        try:
+            return score_via_daemon(args.socket, paths)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"WARN: daemon unavailable ({e}); scoring in-process", file=sys.stderr)
+    return score_paths(paths)
+
+
 def main() -> None:
     if len(sys.argv) < 2:
-        print("Usage: vatahumanizer.py <file>")
+        print("Usage: vatahumanizer.py <file> [<file|glob> ...]")
         sys.exit(0)
 
-    path = sys.argv[1]
-
+    parser = argparse.ArgumentParser(description="VATA soul score")
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--files-from", help="Read paths (one per line) from a file, or - for stdin")
+    parser.add_argument("--socket", help="Score through a running --serve daemon")
+    parser.add_argument("--serve", metavar="SOCKET", help="Run the scorer daemon on a Unix socket")
+    parser.add_argument("--fail-under", type=int, default=None, help="Exit 1 if any file scores below this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--diff", metavar="BASE..HEAD", help="Score only regions changed in a git range")
+    parser.add_argument("--diff-cache", default=DIFF_CACHE, help="Blob-SHA result cache for --diff")
     # Ignore extra flags like --level, --target
-    score = compute_soul_score(path)
-
-    print(f"FILE: {path}")
-    print(f"SOUL SCORE: {score}")
+    parser.add_argument("--level", help=argparse.SUPPRESS)
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    args, _ = parser.parse_known_args(sys.argv[1:])
+
+    if args.serve:
+        with ScoreDaemon(args.serve) as daemon:
+            print(f"VATA scorer listening on {args.serve}")
+            try:
+                daemon.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return
+
+    if args.diff:
+        try:
+            results = score_diff(args.diff, DiffScoreCache(args.diff_cache or None))
+        except subprocess.CalledProcessError as e:
+            print(f"git failed: {e.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+            sys.exit(2)
+    else:
+        results = _score_cli_paths(args)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"FILE: {r['path']}")
+            print(f"SOUL SCORE: {r['score']}")
+
+    if args.fail_under is not None:
+        low = [r for r in results if r["score"] < args.fail_under]
+        for r in low:
+            print(f"LOW SOUL: {r['path']} ({r['score']})", file=sys.stderr)
+        if low:
+            sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-# src/vata/humanizer.py
-import os
-import requests
-import random
-
-QUIRKY_COMMENTS = [
-    "# TODO: fix this before prod lol",
-    "# 3AM special – don't @ me",
-    "# send help this works but why",
-    "# cursed but functional 💀",
-    "# debug print – remove me later",
-    "# yeah... this is fine (copium)",
-    "# soul damage from last night",
-]
-
-def inject_rule_based_soul(code: str, intensity: float = 0.8) -> str:
-    lines = code.splitlines()
-    new_lines = []
-    for line in lines:
-        new_lines.append(line)
-        if random.random() < intensity * 0.2 and line.strip() and not line.strip().startswith('#'):
-            if random.random() < 0.5:
-                new_lines.append("    " + random.choice(QUIRKY_COMMENTS))
-    return "\n".join(new_lines)
-
-def humanize_with_grok(code: str) -> str:
-    api_key = os.getenv("GROK_API_KEY")
-    if not api_key:
-        return inject_rule_based_soul(code)  # fallback
-
-    url = "https://api.x.ai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": "grok-3",
-        "messages": [
-            {"role": "system", "content": "You are a chaotic, sarcastic, 3AM human developer. Rewrite the code to add personality, messy comments, debug prints, quirky names, TODOs – make it feel authentically human without breaking functionality."},
-            {"role": "user", "content": f"Humanize this code:\n\n{code}"}
-        ],
-        "temperature": 0.9,
-        "max_tokens": 4096
-    }
-
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
-        resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"].strip("```python\n").strip("```")
-    except Exception as e:
-        print(f"Grok error: {e}")
-        return inject_rule_based_soul(code)
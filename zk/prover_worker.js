@@ -0,0 +1,72 @@
+// Long-lived Groth16 prover worker (driven by vata_prover.py).
+//
+// Loads the zkey, the circuit wasm (through its witness_calculator.js) and
+// optionally the verification key once, then answers newline-delimited JSON
+// jobs on stdin:
+//
+//   {"id": "...", "op": "prove",  "input": {...}}
+//   {"id": "...", "op": "verify", "proof": {...}, "public": [...]}
+//
+// Every reply is one JSON line on stdout with per-stage timings in ms.
+// Runs fully offline; snarkjs must be installed locally.
+const fs = require("fs");
+const readline = require("readline");
+const snarkjs = require("snarkjs");
+
+function arg(name) {
+  const i = process.argv.indexOf("--" + name);
+  return i >= 0 ? process.argv[i + 1] : undefined;
+}
+
+function reply(msg) {
+  process.stdout.write(JSON.stringify(msg) + "\n");
+}
+
+async function main() {
+  const t0 = Date.now();
+  const zkey = { type: "mem", data: new Uint8Array(fs.readFileSync(arg("zkey"))) };
+  const builder = require(fs.realpathSync(arg("wc")));
+  const wc = await builder(fs.readFileSync(arg("wasm")));
+  const vkeyPath = arg("vkey");
+  const vkey = vkeyPath ? JSON.parse(fs.readFileSync(vkeyPath, "utf8")) : null;
+  const options = { singleThread: arg("single-thread") === "1" };
+  reply({ ready: true, load_ms: Date.now() - t0 });
+
+  const rl = readline.createInterface({ input: process.stdin, terminal: false });
+  for await (const line of rl) {
+    if (!line.trim()) continue;
+    let job;
+    try {
+      job = JSON.parse(line);
+      if (job.op === "verify") {
+        if (!vkey) throw new Error("worker started without --vkey");
+        const t1 = Date.now();
+        const ok = await snarkjs.groth16.verify(vkey, job.public, job.proof);
+        reply({ id: job.id, ok: true, valid: ok, timings: { verify_ms: Date.now() - t1 } });
+        continue;
+      }
+      const t1 = Date.now();
+      const wtns = await wc.calculateWTNSBin(job.input, 0);
+      const t2 = Date.now();
+      const { proof, publicSignals } = await snarkjs.groth16.prove(
+        zkey, { type: "mem", data: wtns }, undefined, options
+      );
+      const t3 = Date.now();
+      reply({
+        id: job.id,
+        ok: true,
+        proof: proof,
+        public: publicSignals,
+        timings: { witness_ms: t2 - t1, prove_ms: t3 - t2 },
+      });
+    } catch (e) {
+      reply({ id: job && job.id, ok: false, error: String(e && e.message ? e.message : e) });
+    }
+  }
+  process.exit(0);
+}
+
+main().catch((e) => {
+  reply({ ready: false, error: String(e && e.message ? e.message : e) });
+  process.exit(1);
+});
@@ -0,0 +1,32 @@
+# zk_utils.py - Groth16 helpers used by agent.py
+#
+# Proofs go through a persistent ProverPool per circuit (see vata_prover.py),
+# so the zkey and witness calculator are loaded once per process instead of
+# once per proof.
+import atexit
+
+from vata_prover import ProverPool
+
+_pools = {}
+
+
+def get_pool(circuit: str, workers: int = None) -> ProverPool:
+    if circuit not in _pools:
+        _pools[circuit] = ProverPool.for_circuit(circuit, workers=workers)
+    return _pools[circuit]
+
+
+def generate_groth16_proof(circuit: str, private_inputs: dict, public_inputs: dict):
+    result = get_pool(circuit).prove({**private_inputs, **public_inputs})
+    return result["proof"], result["public"]
+
+
+def verify_groth16_proof(proof: dict, public: list, circuit: str = "ethical_action_verifier") -> bool:
+    return get_pool(circuit).verify(proof, public)
+
+
+@atexit.register
+def _shutdown():
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()